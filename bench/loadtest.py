@@ -0,0 +1,112 @@
+"""
+Minimal closed-loop HTTP load harness (stdlib only).
+
+    python bench/loadtest.py --url http://localhost:8000 --concurrency 1,8,32,64 --duration 15 \
+        --customers 1-300 --loans 1-700
+
+Each client thread keeps one keep-alive connection and issues a mix of
+/check-eligibility (POST), /view-loans and /view-loan (GET) requests for
+random ids. One result row is printed per concurrency level.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def _id_range(spec):
+    lo, _, hi = spec.partition('-')
+    return int(lo), int(hi or lo)
+
+
+def _request(customers, loans):
+    kind = random.random()
+    if kind < 0.5:
+        body = json.dumps({
+            'customer_id': random.randint(*customers),
+            'loan_amount': random.choice([50_000, 100_000, 500_000]),
+            'interest_rate': random.choice([8, 12, 14, 18]),
+            'tenure': random.choice([6, 12, 24, 36]),
+        })
+        return 'POST', '/check-eligibility', body
+    if kind < 0.8:
+        return 'GET', f'/view-loans/{random.randint(*customers)}', None
+    return 'GET', f'/view-loan/{random.randint(*loans)}', None
+
+
+def _client(target, customers, loans, deadline, latencies, errors):
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    while time.perf_counter() < deadline:
+        method, path, body = _request(customers, loans)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 500
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        elapsed = time.perf_counter() - start
+        (latencies if ok else errors).append(elapsed)
+    conn.close()
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_level(target, concurrency, duration, customers, loans):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(target, customers, loans, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / wall,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--concurrency', default='1,8,32,64', help='comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds per concurrency level')
+    parser.add_argument('--customers', default='1-300', help='customer id range, e.g. 1-300')
+    parser.add_argument('--loans', default='1-700', help='loan id range, e.g. 1-700')
+    args = parser.parse_args()
+
+    target = urlparse(args.url)
+    customers, loans = _id_range(args.customers), _id_range(args.loans)
+    print(f"{'conc':>5} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for level in (int(c) for c in args.concurrency.split(',')):
+        r = run_level(target, level, args.duration, customers, loans)
+        print(
+            f"{r['concurrency']:>5} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
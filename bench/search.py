@@ -0,0 +1,130 @@
+"""
+Customer search latency at scale (runs against DATABASE_URL through Django).
+
+    python bench/search.py --seed 1000000 --queries 200
+
+--seed tops the customer table up to that many rows with synthetic names and
+phone numbers (generate_series on PostgreSQL, bulk_create elsewhere). Each
+query kind is then timed as the endpoint runs it: the first page of 20
+results. One row is printed per kind. The header says whether pg_trgm indexes
+are in use; without them name queries measure the substring fallback, not the
+trigram path.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from credit_app.models import Customer  # noqa: E402
+from credit_app.services.search import search_customers, trigram_available  # noqa: E402
+
+SYLLABLES = [
+    'ra', 'hul', 'pri', 'ya', 'an', 'ita', 'vik', 'ram', 'sha', 'rma', 'ver', 'ma', 'gup', 'ta', 'ku',
+    'mar', 'sin', 'gh', 'de', 'sai', 'red', 'dy', 'na', 'ir', 'ch', 'aud', 'hary', 'jo', 'shi', 'pa',
+]
+PAGE = 20
+
+
+def seed(target):
+    missing = target - Customer.objects.count()
+    if missing <= 0:
+        return 0
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO credit_app_customer (
+                    first_name, last_name, phone_number, phone_normalized, monthly_salary,
+                    approved_limit, current_debt, active_emi_total, age, updated_at
+                )
+                SELECT initcap(s[1 + (random() * (n - 1))::int] || s[1 + (random() * (n - 1))::int]),
+                       initcap(s[1 + (random() * (n - 1))::int] || s[1 + (random() * (n - 1))::int]
+                               || s[1 + (random() * (n - 1))::int]),
+                       p, p, 50000, 1800000, 0, 0, 30, now()
+                FROM (SELECT %s::text[] AS s, cardinality(%s::text[]) AS n) names,
+                     LATERAL (SELECT (6000000000 + (random() * 3999999999)::bigint)::text AS p
+                              FROM generate_series(1, %s)) phones
+                """,
+                [SYLLABLES, SYLLABLES, missing],
+            )
+            cursor.execute('ANALYZE credit_app_customer')
+        return missing
+    batch = []
+    for _ in range(missing):
+        phone = str(random.randint(6_000_000_000, 9_999_999_999))
+        batch.append(Customer(
+            first_name=''.join(random.choices(SYLLABLES, k=2)).title(),
+            last_name=''.join(random.choices(SYLLABLES, k=3)).title(),
+            phone_number=phone, phone_normalized=phone, monthly_salary=50_000, approved_limit=1_800_000, age=30,
+        ))
+        if len(batch) == 10_000:
+            Customer.objects.bulk_create(batch)
+            batch = []
+    Customer.objects.bulk_create(batch)
+    return missing
+
+
+def _typo(word):
+    i = random.randrange(1, len(word))
+    return word[:i] + random.choice('aeiou') + word[i + 1:]
+
+
+def queries(sample):
+    return {
+        'phone exact': [c.phone_normalized for c in sample],
+        'phone prefix (6)': [c.phone_normalized[:6] for c in sample],
+        'last name': [c.last_name for c in sample],
+        'first prefix + last': [f'{c.first_name[:3]} {c.last_name}' for c in sample],
+        'last name typo': [_typo(c.last_name) for c in sample],
+    }
+
+
+def _percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=0, help='top the customer table up to this many rows')
+    parser.add_argument('--queries', type=int, default=200, help='queries per kind')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    added = seed(args.seed)
+    if added:
+        print(f'seeded {added} customers in {time.perf_counter() - started:.1f}s')
+    total = Customer.objects.count()
+    max_id = Customer.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    ids = random.sample(range(1, max_id + 1), min(args.queries * 2, max_id))
+    sample = list(Customer.objects.filter(pk__in=ids)[:args.queries])
+
+    trigram = trigram_available()
+    print(f'{total} customers, {connection.vendor}, trigram indexes: {"yes" if trigram else "no"}')
+    if not trigram:
+        print('name queries use the substring fallback; the pg_trgm path is not measured by this run')
+    print(f"{'query':22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'avg hits':>9}")
+    for kind, terms in queries(sample).items():
+        latencies, hits = [], 0
+        for term in terms:
+            start = time.perf_counter()
+            hits += len(list(search_customers(term)[:PAGE + 1]))
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(
+            f'{kind:22} {_percentile(latencies, 50) * 1000:>8.2f} {_percentile(latencies, 95) * 1000:>8.2f} '
+            f'{_percentile(latencies, 99) * 1000:>8.2f} {hits / len(terms):>9.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Gunicorn serving profile: gunicorn -c config/gunicorn.py config.wsgi:application
+
+All knobs can be overridden through GUNICORN_* environment variables. The
+defaults are gunicorn's conservative ones (sync workers, no preload): gthread,
+gevent and preload have only been measured on a single CPU against SQLite, so
+they are opt-in until PostgreSQL/pgbouncer numbers back them.
+Worker classes:
+  sync (default) - 2 * CPU + 1 single-threaded processes.
+  gthread        - CPU-count processes x GUNICORN_THREADS threads.
+  gevent         - CPU-count processes with cooperative greenlets; needs `pip install gevent psycogreen`.
+"""
+import gc
+import importlib
+import multiprocessing
+import os
+
+_cpus = multiprocessing.cpu_count()
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+workers = _env_int('GUNICORN_WORKERS', 2 * _cpus + 1 if worker_class == 'sync' else _cpus)
+threads = _env_int('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1)
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 200)
+
+# Opt-in: import Django once in the master so workers share loaded modules copy-on-write.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0').lower() in ('1', 'true', 'yes')
+# Lazily imported libraries worth loading in the master anyway when preloading (comma-separated).
+_preload_modules = [m.strip() for m in os.environ.get('GUNICORN_PRELOAD_MODULES', 'numpy').split(',') if m.strip()]
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+# Recycle workers periodically to bound memory growth; jitter avoids restarting all at once.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Django builds the URLconf (importing views and services) on the first
+    # request; do it here so workers inherit it instead of each importing it.
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    for name in _preload_modules:
+        importlib.import_module(name)
+    # Keep the garbage collector from touching, and so copying, the shared objects in workers.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Connections opened in the master during preload must not be shared across processes.
+        # Without preload, Django is not configured yet at this point.
+        from django.db import connections
+        connections.close_all()
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
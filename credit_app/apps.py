@@ -5,3 +5,6 @@ class CreditAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'credit_app'
     verbose_name = 'Credit Approval'
+
+    def ready(self):
+        from . import signals  # noqa: F401
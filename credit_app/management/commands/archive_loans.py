@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from credit_app.services.analytics import refresh_portfolio_views
+from credit_app.services.archival import archive_loan_batch
+
+
+class Command(BaseCommand):
+    help = 'Move fully repaid loans (started before the current year) to the loan archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Loans moved per transaction')
+
+    def handle(self, *args, **options):
+        archived = 0
+        while True:
+            moved = archive_loan_batch(options['batch_size'])
+            if not moved:
+                break
+            archived += moved
+            self.stdout.write(f'Archived {archived} loans...')
+        if archived:
+            refresh_portfolio_views()
+        self.stdout.write(self.style.SUCCESS(f'Done. {archived} loans archived.'))
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from credit_app.services.policy import active_policy, publish_policy
+
+
+class Command(BaseCommand):
+    help = 'Show the active credit policy, or publish a new version from a JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--load', metavar='PATH', help='Validate this JSON policy and publish it as the next version')
+        parser.add_argument('--note', default='', help='Short description stored with the new version')
+
+    def handle(self, *args, **options):
+        if options['load']:
+            try:
+                with open(options['load']) as f:
+                    rules = json.load(f)
+                policy = publish_policy(rules, note=options['note'])
+            except (OSError, ValueError) as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f'Published credit policy version {policy.version}.'))
+            return
+        policy = active_policy()
+        self.stdout.write(f'Credit policy version {policy.version}' + (' (settings)' if not policy.version else ''))
+        self.stdout.write(json.dumps(policy.rules, indent=2))
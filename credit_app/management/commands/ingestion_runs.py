@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from credit_app.models import IngestionRun
+
+
+class Command(BaseCommand):
+    help = 'List recent Excel ingestion runs, or show one run\'s stage timings and rejected rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('run_id', nargs='?', type=int, help='Show this run in detail')
+        parser.add_argument('--kind', choices=[IngestionRun.CUSTOMERS, IngestionRun.LOANS], help='Only runs of this kind')
+        parser.add_argument('--limit', type=int, default=20, help='Number of runs to list')
+
+    def handle(self, *args, **options):
+        if options['run_id']:
+            try:
+                run = IngestionRun.objects.get(pk=options['run_id'])
+            except IngestionRun.DoesNotExist:
+                raise CommandError(f"No ingestion run {options['run_id']}")
+            self._detail(run)
+            return
+
+        runs = IngestionRun.objects.all()
+        if options['kind']:
+            runs = runs.filter(kind=options['kind'])
+        self.stdout.write(
+            f"{'id':>6}  {'started':19}  {'kind':9} {'status':9}{'seconds':>9}{'rows':>8}{'created':>9}"
+            f"{'updated':>9}{'rejected':>9}{'write rows/s':>13}"
+        )
+        for run in runs[:options['limit']]:
+            write = next((stage for stage in run.stages if stage['name'] == 'write'), {})
+            self.stdout.write(
+                f"{run.pk:>6}  {run.started_at:%Y-%m-%d %H:%M:%S}  {run.kind:9} {run.status:9}"
+                f"{run.duration_seconds if run.duration_seconds is not None else '-':>9}{run.rows_read:>8}"
+                f"{run.created:>9}{run.updated:>9}{run.rejected:>9}{write.get('rows_per_second') or '-':>13}"
+            )
+
+    def _detail(self, run):
+        self.stdout.write(f'Run {run.pk}: {run.kind} from {run.file_path}, {run.status}')
+        if run.task_id:
+            self.stdout.write(f'Celery task {run.task_id}')
+        if run.error:
+            self.stdout.write(f'Error: {run.error}')
+        self.stdout.write(f"\n{'stage':16}{'seconds':>10}{'rows':>8}{'rows/s':>12}")
+        for stage in run.stages:
+            rows = '-' if stage['rows'] is None else stage['rows']
+            self.stdout.write(f"{stage['name']:16}{stage['seconds']:>10.3f}{rows:>8}{stage['rows_per_second'] or '-':>12}")
+        if run.rejected_by_reason:
+            self.stdout.write('\nRejected rows:')
+            for reason, count in sorted(run.rejected_by_reason.items(), key=lambda item: -item[1]):
+                self.stdout.write(f'{reason:20}{count:>8}')
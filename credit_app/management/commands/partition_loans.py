@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from credit_app.services.partitioning import (
+    ensure_loan_partitions,
+    is_loan_table_partitioned,
+    partition_loan_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert credit_app_loan to a table partitioned by start_date year (PostgreSQL), '
+        'or create upcoming yearly partitions if it already is.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years-ahead',
+            type=int,
+            default=None,
+            help='Create partitions up to this many years after the current one (default: LOAN_PARTITION_YEARS_AHEAD)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Loan table partitioning requires PostgreSQL.')
+        if is_loan_table_partitioned():
+            years = ensure_loan_partitions(options['years_ahead'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Loan table already partitioned. New partitions: {years or "none"}'
+            ))
+            return
+        self.stdout.write('Partitioning credit_app_loan (table is locked for the duration)...')
+        years = partition_loan_table(options['years_ahead'])
+        self.stdout.write(self.style.SUCCESS(f'Done. Year partitions: {years[0]}-{years[-1]} plus default.'))
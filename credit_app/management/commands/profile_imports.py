@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a web worker or Celery worker imports before serving anything.
+STARTUP_CODE = """
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import credit_app.tasks
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """(self_us, cumulative_us, module) rows from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Profile the imports done at web/Celery worker startup (python -X importtime) and report the heaviest packages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Number of packages to list')
+        parser.add_argument('--module', action='append', default=[], help='Also import this module (repeatable)')
+        parser.add_argument(
+            '--forbid', default='',
+            help='Comma-separated top-level packages that must not be imported at startup (exit with an error if they are)',
+        )
+
+    def handle(self, *args, **options):
+        code = STARTUP_CODE + ''.join(f'import {name}\n' for name in options['module'])
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed')
+
+        rows = parse_importtime(proc.stderr)
+        packages = defaultdict(lambda: [0, 0])
+        for self_us, _, name in rows:
+            package = packages[name.lstrip().split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        total_ms = sum(self_us for self_us, _, _ in rows) / 1000
+
+        self.stdout.write(f'{len(rows)} modules imported in {total_ms:.0f} ms')
+        self.stdout.write(f"{'package':24}{'ms':>10}{'modules':>10}")
+        for name, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:options['top']]:
+            self.stdout.write(f'{name:24}{self_us / 1000:>10.1f}{count:>10}')
+
+        forbidden = {p.strip() for p in options['forbid'].split(',') if p.strip()}
+        loaded = sorted(forbidden & set(packages))
+        if loaded:
+            raise CommandError(f"Imported at startup: {', '.join(loaded)}")
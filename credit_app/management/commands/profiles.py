@@ -0,0 +1,65 @@
+import io
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from credit_app.services import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'List request profiles collected by ProfilingMiddleware, summarize their hottest functions and '
+        'queries, or print a token for the X-Profile header.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--token', action='store_true', help='Print a signed X-Profile header value and exit')
+        parser.add_argument('--summary', action='store_true', help='Aggregate the selected profiles instead of listing them')
+        parser.add_argument('--path', default='', help='Only profiles of request paths starting with this prefix')
+        parser.add_argument('--id', action='append', default=[], help='Only this profile id (repeatable)')
+        parser.add_argument('--limit', type=int, default=50, help='Newest profiles to include')
+        parser.add_argument('--top', type=int, default=15, help='Functions and queries to show in the summary')
+        parser.add_argument('--sort', choices=['cumulative', 'tottime'], default='cumulative', help='Function sort order')
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(profiling.make_token())
+            return
+        if not settings.PROFILE_DIR:
+            raise CommandError('PROFILE_DIR is not set')
+
+        selected = profiling.load_profiles(options['path'])
+        if options['id']:
+            selected = [meta for meta in selected if meta['id'] in options['id']]
+        selected = selected[:options['limit']]
+        if not selected:
+            self.stdout.write('No profiles')
+            return
+
+        if not options['summary']:
+            self.stdout.write(f"{'id':33}{'trigger':>8}{'status':>7}{'ms':>10}{'queries':>9}{'sql ms':>9}  request")
+            for meta in selected:
+                sql_ms = sum(query['ms'] for query in meta['queries'])
+                self.stdout.write(
+                    f"{meta['id']:33}{meta['trigger']:>8}{meta['status'] or '-':>7}{meta['duration_ms']:>10.1f}"
+                    f"{len(meta['queries']):>9}{sql_ms:>9.1f}  {meta['method']} {meta['path']}"
+                )
+            return
+
+        total_ms = sum(meta['duration_ms'] for meta in selected)
+        self.stdout.write(f'{len(selected)} profiles, {total_ms:.0f} ms in total')
+
+        self.stdout.write(f"\nHottest functions (by {options['sort']}):")
+        out = io.StringIO()
+        stats = pstats.Stats(*(profiling.stats_path(meta) for meta in selected), stream=out)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+        # Drop pstats' own preamble (file names, totals) and keep the table.
+        lines = out.getvalue().splitlines()
+        start = next((i for i, line in enumerate(lines) if line.lstrip().startswith('ncalls')), 0)
+        self.stdout.write('\n'.join(line for line in lines[start:] if line.strip()))
+
+        self.stdout.write('\nHottest queries (by total time):')
+        self.stdout.write(f"{'count':>7}{'total ms':>10}{'max ms':>9}  statement")
+        for sql, count, total, longest in profiling.query_summary(selected)[:options['top']]:
+            self.stdout.write(f'{count:>7}{total:>10.1f}{longest:>9.1f}  {sql}')
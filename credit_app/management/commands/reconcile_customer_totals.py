@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from credit_app.services.debt import reconcile_customer_totals
+
+
+class Command(BaseCommand):
+    help = 'Recompute Customer.current_debt and active_emi_total from active loans and fix any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('customer_ids', nargs='*', type=int, help='Limit to these customers (default: all)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted customers without writing')
+
+    def handle(self, *args, **options):
+        changed = reconcile_customer_totals(options['customer_ids'] or None, dry_run=options['dry_run'])
+        verb = 'would be corrected' if options['dry_run'] else 'corrected'
+        self.stdout.write(self.style.SUCCESS(f'{changed} customers {verb}.'))
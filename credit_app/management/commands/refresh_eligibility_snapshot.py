@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from credit_app.services.snapshot import refresh_snapshot, snapshot_enabled
+
+
+class Command(BaseCommand):
+    help = 'Write or update the memory-mapped eligibility snapshot at ELIGIBILITY_SNAPSHOT_PATH.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every customer instead of applying the change log')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep refreshing every ELIGIBILITY_SNAPSHOT_REFRESH_SECONDS (sidecar on hosts without a shared volume)',
+        )
+
+    def handle(self, *args, **options):
+        if not snapshot_enabled():
+            raise CommandError('ELIGIBILITY_SNAPSHOT_PATH is not set')
+        full = options['full']
+        while True:
+            meta = refresh_snapshot(full=full)
+            kind = 'Rebuilt' if meta['full'] else 'Updated'
+            self.stdout.write(f"{kind} snapshot: {meta['customers']} customers, {meta['changed']} changed.")
+            if not options['loop']:
+                break
+            full = False
+            time.sleep(settings.ELIGIBILITY_SNAPSHOT_REFRESH_SECONDS)
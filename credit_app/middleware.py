@@ -0,0 +1,191 @@
+"""
+Priority-aware load shedding and opt-in request profiling.
+
+LoadSheddingMiddleware counts requests in flight across the whole deployment.
+Once LOAD_SHED_CONCURRENCY are in flight, low-priority reads (loan listings,
+schedules, analytics, exports) get 429 with Retry-After. Normal-priority requests
+(eligibility checks, repayments) are shed above LOAD_SHED_CONCURRENCY +
+LOAD_SHED_RESERVED. The reserved slots stay free for high-priority requests
+(/create-loan, /register, health checks), which are never shed but still count.
+LOAD_SHED_CONCURRENCY = 0 disables shedding.
+
+With LOAD_SHED_BACKEND = 'redis' every request holds a lease in one Redis
+sorted set shared by all workers (one Lua script call to admit, one ZREM to
+release). Leases expire after LOAD_SHED_LEASE_SECONDS, so a worker killed
+mid-request cannot leak slots; a response streaming for longer than that stops
+counting. A Redis failure lets the request through. The 'memory' backend
+counts per process (tests, single-process runs). Streaming responses (exports,
+schedules) release their lease when the body has been sent and the server
+closes the response, not when the view returns.
+"""
+import logging
+import secrets
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from credit_app.services import profiling
+
+logger = logging.getLogger(__name__)
+
+LOW, NORMAL, HIGH = 0, 1, 2
+
+LOW_PRIORITY_PREFIXES = ('/view-loans', '/view-loan', '/analytics', '/export')
+HIGH_PRIORITY_PREFIXES = ('/create-loan', '/register', '/health')
+
+IN_FLIGHT_KEY = 'loadshed:in-flight'
+
+# Drop expired leases, then add one unless the set already holds `cap` (-1: no cap).
+ACQUIRE_LUA = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local cap = tonumber(ARGV[1])
+if cap >= 0 and redis.call('ZCARD', KEYS[1]) >= cap then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+
+def request_priority(path: str) -> int:
+    if path.startswith(HIGH_PRIORITY_PREFIXES):
+        return HIGH
+    if path.startswith(LOW_PRIORITY_PREFIXES):
+        return LOW
+    return NORMAL
+
+
+class MemoryInFlight:
+    """Per-process count; stands in for Redis in tests and single-process runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def acquire(self, cap: Optional[int]) -> Optional[str]:
+        """A lease to pass to release(), or None if `cap` requests are already in flight."""
+        with self._lock:
+            if cap is not None and self.count >= cap:
+                return None
+            self.count += 1
+            return 'lease'
+
+    def release(self, lease: str) -> None:
+        with self._lock:
+            self.count -= 1
+
+
+class RedisInFlight:
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._acquire = self._client.register_script(ACQUIRE_LUA)
+
+    def acquire(self, cap: Optional[int]) -> Optional[str]:
+        lease = secrets.token_hex(8)
+        try:
+            admitted = self._acquire(
+                keys=[IN_FLIGHT_KEY],
+                args=[-1 if cap is None else cap, settings.LOAD_SHED_LEASE_SECONDS * 1000, lease],
+            )
+        except Exception:
+            logger.warning('Load shedding check failed; admitting request', exc_info=True)
+            return ''
+        return lease if admitted else None
+
+    def release(self, lease: str) -> None:
+        if not lease:
+            return
+        try:
+            self._client.zrem(IN_FLIGHT_KEY, lease)
+        except Exception:
+            logger.warning('Could not release load shedding lease; it expires on its own', exc_info=True)
+
+
+_in_flight = None
+_in_flight_lock = threading.Lock()
+
+
+def get_in_flight():
+    global _in_flight
+    if _in_flight is None:
+        with _in_flight_lock:
+            if _in_flight is None:
+                if settings.LOAD_SHED_BACKEND == 'redis':
+                    _in_flight = RedisInFlight(settings.REDIS_URL)
+                else:
+                    _in_flight = MemoryInFlight()
+    return _in_flight
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = get_in_flight()
+
+    def _cap(self, priority: int) -> Optional[int]:
+        limit = settings.LOAD_SHED_CONCURRENCY
+        if priority == HIGH:
+            return None
+        return limit if priority == LOW else limit + settings.LOAD_SHED_RESERVED
+
+    def __call__(self, request):
+        if not settings.LOAD_SHED_CONCURRENCY:
+            return self.get_response(request)
+        lease = self.in_flight.acquire(self._cap(request_priority(request.path)))
+        if lease is None:
+            response = JsonResponse({'detail': 'Server busy, please retry.'}, status=429)
+            response['Retry-After'] = str(settings.LOAD_SHED_RETRY_AFTER)
+            return response
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.in_flight.release(lease)
+            raise
+        if not response.streaming:
+            self.in_flight.release(lease)
+            return response
+        # The body is still to be sent; the WSGI server calls close() once it has been.
+        close = response.close
+        released = []
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.in_flight.release(lease)
+
+        response.close = close_and_release
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling. A request is profiled when PROFILE_DIR is set
+    and either it carries a valid X-Profile header (a signed token from
+    `manage.py profiles --token`, valid for PROFILE_TOKEN_MAX_AGE seconds) or it
+    falls in the PROFILE_SAMPLE_RATE sample. The view runs under cProfile and
+    every SQL statement is logged with its duration; both are written to
+    PROFILE_DIR (see services/profiling.py) and the response gets X-Profile-Id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = profiling.trigger(request) if settings.PROFILE_DIR else None
+        if trigger is None:
+            return self.get_response(request)
+        with profiling.capture(request, trigger) as profile:
+            response = self.get_response(request)
+            profile.response = response
+        response['X-Profile-Id'] = profile.profile_id
+        return response
@@ -0,0 +1,128 @@
+# Portfolio exposure views backing the analytics endpoint.
+# PostgreSQL gets materialized views (refreshed CONCURRENTLY, hence the unique
+# indexes); other backends (SQLite in tests) get equivalent plain views.
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CURRENT_YEAR_SQL = {
+    'postgresql': (
+        "start_date >= date_trunc('year', CURRENT_DATE)::date "
+        "AND start_date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date"
+    ),
+    'sqlite': "strftime('%%Y', start_date) = strftime('%%Y', 'now')",
+}
+
+CUSTOMER_EXPOSURE_SQL = """
+SELECT
+    c.id AS customer_id,
+    c.monthly_salary AS monthly_salary,
+    c.approved_limit AS approved_limit,
+    COALESCE(l.loan_count, 0) AS loan_count,
+    COALESCE(l.active_loan_count, 0) AS active_loan_count,
+    COALESCE(l.active_principal, 0) AS active_principal,
+    COALESCE(l.active_emi, 0) AS active_emi,
+    COALESCE(l.emis_due, 0) AS emis_due,
+    COALESCE(l.emis_on_time, 0) AS emis_on_time,
+    COALESCE(l.current_year_count, 0) AS current_year_count,
+    COALESCE(l.current_year_volume, 0) AS current_year_volume,
+    COALESCE(l.total_volume, 0) AS total_volume
+FROM credit_app_customer c
+LEFT JOIN (
+    SELECT
+        customer_id,
+        COUNT(*) AS loan_count,
+        SUM(CASE WHEN emis_paid < tenure THEN 1 ELSE 0 END) AS active_loan_count,
+        SUM(CASE WHEN emis_paid < tenure THEN loan_amount ELSE 0 END) AS active_principal,
+        SUM(CASE WHEN emis_paid < tenure THEN monthly_repayment ELSE 0 END) AS active_emi,
+        SUM(CASE WHEN tenure > 0 THEN tenure ELSE 0 END) AS emis_due,
+        SUM(emis_paid_on_time) AS emis_on_time,
+        SUM(CASE WHEN {current_year} THEN 1 ELSE 0 END) AS current_year_count,
+        SUM(CASE WHEN {current_year} THEN loan_amount ELSE 0 END) AS current_year_volume,
+        SUM(loan_amount) AS total_volume
+    FROM credit_app_loan
+    GROUP BY customer_id
+) l ON l.customer_id = c.id
+"""
+
+RATE_EXPOSURE_SQL = """
+SELECT
+    interest_rate,
+    COUNT(*) AS loan_count,
+    SUM(loan_amount) AS active_principal,
+    SUM(monthly_repayment) AS active_emi
+FROM credit_app_loan
+WHERE emis_paid < tenure
+GROUP BY interest_rate
+"""
+
+
+def create_views(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    customer_sql = CUSTOMER_EXPOSURE_SQL.format(current_year=CURRENT_YEAR_SQL.get(vendor, CURRENT_YEAR_SQL['sqlite']))
+    if vendor == 'postgresql':
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW credit_app_customer_exposure_mv AS {customer_sql}')
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX credit_app_customer_exposure_mv_pk '
+            'ON credit_app_customer_exposure_mv (customer_id)'
+        )
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW credit_app_rate_exposure_mv AS {RATE_EXPOSURE_SQL}')
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX credit_app_rate_exposure_mv_pk '
+            'ON credit_app_rate_exposure_mv (interest_rate)'
+        )
+    else:
+        schema_editor.execute(f'CREATE VIEW credit_app_customer_exposure_mv AS {customer_sql}')
+        schema_editor.execute(f'CREATE VIEW credit_app_rate_exposure_mv AS {RATE_EXPOSURE_SQL}')
+
+
+def drop_views(apps, schema_editor):
+    kind = 'MATERIALIZED VIEW' if schema_editor.connection.vendor == 'postgresql' else 'VIEW'
+    schema_editor.execute(f'DROP {kind} IF EXISTS credit_app_rate_exposure_mv')
+    schema_editor.execute(f'DROP {kind} IF EXISTS credit_app_customer_exposure_mv')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerExposure',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='credit_app.customer')),
+                ('monthly_salary', models.IntegerField()),
+                ('approved_limit', models.IntegerField()),
+                ('loan_count', models.IntegerField()),
+                ('active_loan_count', models.IntegerField()),
+                ('active_principal', models.DecimalField(decimal_places=2, max_digits=17)),
+                ('active_emi', models.DecimalField(decimal_places=2, max_digits=17)),
+                ('emis_due', models.IntegerField()),
+                ('emis_on_time', models.IntegerField()),
+                ('current_year_count', models.IntegerField()),
+                ('current_year_volume', models.DecimalField(decimal_places=2, max_digits=17)),
+                ('total_volume', models.DecimalField(decimal_places=2, max_digits=17)),
+            ],
+            options={
+                'db_table': 'credit_app_customer_exposure_mv',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RateExposure',
+            fields=[
+                ('interest_rate', models.DecimalField(decimal_places=2, max_digits=6, primary_key=True, serialize=False)),
+                ('loan_count', models.IntegerField()),
+                ('active_principal', models.DecimalField(decimal_places=2, max_digits=17)),
+                ('active_emi', models.DecimalField(decimal_places=2, max_digits=17)),
+            ],
+            options={
+                'db_table': 'credit_app_rate_exposure_mv',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_views, drop_views),
+    ]
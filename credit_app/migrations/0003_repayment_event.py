@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0002_portfolio_exposure_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=64, unique=True)),
+                ('loan_id', models.IntegerField(db_index=True)),
+                ('paid_on', models.DateField()),
+                ('on_time', models.BooleanField(default=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('applied_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'db_table': 'credit_app_repayment_event',
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:17
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CURRENT_YEAR_SQL = {
+    'postgresql': (
+        "start_date >= date_trunc('year', CURRENT_DATE)::date "
+        "AND start_date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date"
+    ),
+    'sqlite': "strftime('%%Y', start_date) = strftime('%%Y', 'now')",
+}
+
+# Same shape as 0002, with archived loans folded in from the per-customer rollup.
+CUSTOMER_EXPOSURE_SQL = """
+SELECT
+    c.id AS customer_id,
+    c.monthly_salary AS monthly_salary,
+    c.approved_limit AS approved_limit,
+    COALESCE(l.loan_count, 0) + COALESCE(r.loan_count, 0) AS loan_count,
+    COALESCE(l.active_loan_count, 0) AS active_loan_count,
+    COALESCE(l.active_principal, 0) AS active_principal,
+    COALESCE(l.active_emi, 0) AS active_emi,
+    COALESCE(l.emis_due, 0) + COALESCE(r.emis_due, 0) AS emis_due,
+    COALESCE(l.emis_on_time, 0) + COALESCE(r.emis_on_time, 0) AS emis_on_time,
+    COALESCE(l.current_year_count, 0) AS current_year_count,
+    COALESCE(l.current_year_volume, 0) AS current_year_volume,
+    COALESCE(l.total_volume, 0) + COALESCE(r.total_volume, 0) AS total_volume
+FROM credit_app_customer c
+LEFT JOIN (
+    SELECT
+        customer_id,
+        COUNT(*) AS loan_count,
+        SUM(CASE WHEN emis_paid < tenure THEN 1 ELSE 0 END) AS active_loan_count,
+        SUM(CASE WHEN emis_paid < tenure THEN loan_amount ELSE 0 END) AS active_principal,
+        SUM(CASE WHEN emis_paid < tenure THEN monthly_repayment ELSE 0 END) AS active_emi,
+        SUM(CASE WHEN tenure > 0 THEN tenure ELSE 0 END) AS emis_due,
+        SUM(emis_paid_on_time) AS emis_on_time,
+        SUM(CASE WHEN {current_year} THEN 1 ELSE 0 END) AS current_year_count,
+        SUM(CASE WHEN {current_year} THEN loan_amount ELSE 0 END) AS current_year_volume,
+        SUM(loan_amount) AS total_volume
+    FROM credit_app_loan
+    GROUP BY customer_id
+) l ON l.customer_id = c.id
+LEFT JOIN credit_app_customer_loan_rollup r ON r.customer_id = c.id
+"""
+
+
+def _create_customer_view(schema_editor, sql):
+    vendor = schema_editor.connection.vendor
+    sql = sql.format(current_year=CURRENT_YEAR_SQL.get(vendor, CURRENT_YEAR_SQL['sqlite']))
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP MATERIALIZED VIEW IF EXISTS credit_app_customer_exposure_mv')
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW credit_app_customer_exposure_mv AS {sql}')
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX credit_app_customer_exposure_mv_pk '
+            'ON credit_app_customer_exposure_mv (customer_id)'
+        )
+    else:
+        schema_editor.execute('DROP VIEW IF EXISTS credit_app_customer_exposure_mv')
+        schema_editor.execute(f'CREATE VIEW credit_app_customer_exposure_mv AS {sql}')
+
+
+def include_rollups(apps, schema_editor):
+    _create_customer_view(schema_editor, CUSTOMER_EXPOSURE_SQL)
+
+
+def exclude_rollups(apps, schema_editor):
+    previous = import_module('credit_app.migrations.0002_portfolio_exposure_views')
+    _create_customer_view(schema_editor, previous.CUSTOMER_EXPOSURE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0003_repayment_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerLoanRollup',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='loan_rollup', serialize=False, to='credit_app.customer')),
+                ('loan_count', models.IntegerField(default=0)),
+                ('emis_due', models.IntegerField(default=0)),
+                ('emis_on_time', models.IntegerField(default=0)),
+                ('total_volume', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+            ],
+            options={
+                'db_table': 'credit_app_customer_loan_rollup',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedLoan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('loan_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('loan_amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('tenure', models.IntegerField()),
+                ('interest_rate', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('monthly_repayment', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('emis_paid_on_time', models.IntegerField(default=0)),
+                ('emis_paid', models.IntegerField(default=0)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_loans', to='credit_app.customer')),
+            ],
+            options={
+                'db_table': 'credit_app_loan_archive',
+            },
+        ),
+        migrations.RunPython(include_rollups, exclude_rollups),
+    ]
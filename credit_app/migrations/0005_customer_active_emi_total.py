@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:19
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F
+
+from credit_app.migrations._sqlite_views import create_views, drop_views
+from credit_app.services.emi import outstanding_principal
+
+
+def backfill_customer_totals(apps, schema_editor):
+    Customer = apps.get_model('credit_app', 'Customer')
+    Loan = apps.get_model('credit_app', 'Loan')
+    totals = defaultdict(lambda: [0, Decimal('0')])
+    rows = Loan.objects.filter(emis_paid__lt=F('tenure')).values_list(
+        'customer_id', 'loan_amount', 'interest_rate', 'tenure', 'emis_paid', 'monthly_repayment',
+    )
+    for customer_id, amount, rate, tenure, emis_paid, emi in rows.iterator(chunk_size=2000):
+        totals[customer_id][0] += round(outstanding_principal(amount, rate, tenure, emis_paid))
+        totals[customer_id][1] += emi
+    Customer.objects.update(current_debt=0, active_emi_total=0)
+    changed = [
+        Customer(pk=customer_id, current_debt=debt, active_emi_total=emi)
+        for customer_id, (debt, emi) in totals.items()
+    ]
+    Customer.objects.bulk_update(changed, ['current_debt', 'active_emi_total'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0004_loan_archive'),
+    ]
+
+    operations = [
+        drop_views(),
+        migrations.AddField(
+            model_name='customer',
+            name='active_emi_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=17),
+        ),
+        create_views(),
+        migrations.RunPython(backfill_customer_totals, migrations.RunPython.noop),
+    ]
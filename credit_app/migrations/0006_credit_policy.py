@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0005_customer_active_emi_total'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('rules', models.JSONField()),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'credit_app_credit_policy',
+                'ordering': ['-version'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0006_credit_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_id', models.IntegerField()),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'credit_app_loan_change_log',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:38
+
+from django.db import migrations, models
+
+from credit_app.migrations._sqlite_views import create_views, drop_views
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0007_loan_change_log'),
+    ]
+
+    operations = [
+        drop_views(),
+        migrations.AddField(
+            model_name='customer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        create_views(),
+        migrations.AlterField(
+            model_name='archivedloan',
+            name='archived_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
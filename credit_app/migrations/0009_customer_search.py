@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:43
+
+import re
+
+from django.db import migrations, models
+
+from credit_app.migrations._sqlite_views import create_views, drop_views
+
+
+def normalize_phone(value):
+    # Frozen copy of credit_app.services.search.normalize_phone as of this migration.
+    return re.sub(r'\D', '', str(value or ''))[-10:]
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # Same rule as normalize_phone(): the last 10 digits.
+        schema_editor.execute(
+            "UPDATE credit_app_customer SET phone_normalized = RIGHT(REGEXP_REPLACE(phone_number, '\\D', '', 'g'), 10)"
+        )
+        return
+    Customer = apps.get_model('credit_app', 'Customer')
+    changed = []
+    for customer in Customer.objects.only('pk', 'phone_number').iterator(chunk_size=2000):
+        customer.phone_normalized = normalize_phone(customer.phone_number)
+        changed.append(customer)
+    Customer.objects.bulk_update(changed, ['phone_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0008_export_watermarks'),
+    ]
+
+    operations = [
+        drop_views(),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        create_views(),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+"""
+PostgreSQL only: GIN trigram indexes on customer names for services/search.py.
+pg_trgm ships with PostgreSQL's contrib modules; if the database user may not
+create it, the migration leaves the indexes out and search falls back to
+substring matching. The indexes are built CONCURRENTLY, so this migration runs
+outside a transaction and does not block writes.
+"""
+import logging
+
+from django.db import DatabaseError, migrations
+
+logger = logging.getLogger(__name__)
+
+NAME_COLUMNS = ('first_name', 'last_name')
+
+
+def _create(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError as exc:
+        logger.warning('pg_trgm unavailable, customer name search will not use trigram indexes: %s', exc)
+        return
+    for column in NAME_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS credit_app_customer_{column}_trgm '
+            f'ON credit_app_customer USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def _drop(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in NAME_COLUMNS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS credit_app_customer_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('credit_app', '0009_customer_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(_create, _drop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0010_customer_name_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_id', models.IntegerField(db_index=True)),
+                ('loan_amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('interest_rate', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('tenure', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], db_index=True, default='pending', max_length=10)),
+                ('loan_id', models.IntegerField(blank=True, null=True)),
+                ('corrected_interest_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('monthly_installment', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('message', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('decided_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'credit_app_loan_application',
+            },
+        ),
+    ]
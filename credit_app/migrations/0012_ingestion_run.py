@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0011_loan_application'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customers', 'Customers'), ('loans', 'Loans')], max_length=10)),
+                ('file_path', models.CharField(max_length=500)),
+                ('task_id', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('started_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('rows_read', models.IntegerField(default=0)),
+                ('created', models.IntegerField(default=0)),
+                ('updated', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('rejected_by_reason', models.JSONField(default=dict)),
+                ('stages', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'credit_app_ingestion_run',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:24
+
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+
+from credit_app.migrations._sqlite_views import create_views, drop_views
+
+
+def backfill_start_date(apps, schema_editor):
+    """
+    Derive a start date for undated loans before the column becomes NOT NULL:
+    end_date minus the tenure when the end date is known, otherwise one month
+    back per EMI paid.
+    """
+    Loan = apps.get_model('credit_app', 'Loan')
+    today = datetime.date.today()
+    changed = []
+    for loan in Loan.objects.filter(start_date=None).only('pk', 'tenure', 'emis_paid', 'end_date').iterator():
+        if loan.end_date is not None:
+            loan.start_date = loan.end_date - relativedelta(months=loan.tenure)
+        else:
+            loan.start_date = today - relativedelta(months=loan.emis_paid)
+        changed.append(loan)
+    Loan.objects.bulk_update(changed, ['start_date'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_app', '0012_ingestion_run'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_start_date, migrations.RunPython.noop),
+        drop_views(),
+        migrations.AlterField(
+            model_name='loan',
+            name='start_date',
+            field=models.DateField(default=datetime.date.today),
+        ),
+        create_views(),
+    ]
@@ -0,0 +1,35 @@
+"""
+SQLite rebuilds a table on most ALTERs, which fails while a view references it.
+Migrations that alter credit_app_customer or credit_app_loan wrap their
+operations in these (PostgreSQL materialized views are left untouched).
+"""
+from importlib import import_module
+
+from django.db import migrations
+
+VIEWS = ('credit_app_customer_exposure_mv', 'credit_app_rate_exposure_mv')
+
+
+def _drop(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    for view in VIEWS:
+        schema_editor.execute(f'DROP VIEW IF EXISTS {view}')
+
+
+def _create(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    initial = import_module('credit_app.migrations.0002_portfolio_exposure_views')
+    current = import_module('credit_app.migrations.0004_loan_archive')
+    _drop(apps, schema_editor)
+    current.include_rollups(apps, schema_editor)
+    schema_editor.execute(f'CREATE VIEW credit_app_rate_exposure_mv AS {initial.RATE_EXPOSURE_SQL}')
+
+
+def drop_views():
+    return migrations.RunPython(_drop, _create)
+
+
+def create_views():
+    return migrations.RunPython(_create, _drop)
@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.db import models
 
 
@@ -5,10 +7,16 @@ class Customer(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     phone_number = models.CharField(max_length=20)
+    # Last 10 digits of phone_number, set on save (services/search.py); indexed for lookups by phone.
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
     monthly_salary = models.IntegerField()
     approved_limit = models.IntegerField()
     current_debt = models.IntegerField(default=0)
+    # Sum of monthly_repayment over active loans; kept in step with current_debt by services/debt.py.
+    active_emi_total = models.DecimalField(max_digits=17, decimal_places=2, default=0)
     age = models.IntegerField(null=True, blank=True)
+    # Export watermark (services/export.py); bulk updates must set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'credit_app_customer'
@@ -27,8 +35,11 @@ class Loan(models.Model):
     monthly_repayment = models.DecimalField(max_digits=15, decimal_places=2)
     emis_paid_on_time = models.IntegerField(default=0)
     emis_paid = models.IntegerField(default=0)
-    start_date = models.DateField(null=True, blank=True)
+    # Partition key of the partitioned loan table (services/partitioning.py), so never NULL.
+    start_date = models.DateField(default=date.today)
     end_date = models.DateField(null=True, blank=True)
+    # Export watermark (services/export.py); bulk updates must set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'credit_app_loan'
@@ -36,3 +47,185 @@ class Loan(models.Model):
     @property
     def repayments_left(self):
         return max(0, self.tenure - self.emis_paid)
+
+
+class ArchivedLoan(models.Model):
+    """
+    Fully repaid loan moved out of credit_app_loan by the archival job.
+    Its score contributions live on in CustomerLoanRollup.
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_loans')
+    original_id = models.BigIntegerField(unique=True)
+    loan_id = models.IntegerField(null=True, blank=True, db_index=True)
+    loan_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    tenure = models.IntegerField()
+    interest_rate = models.DecimalField(max_digits=6, decimal_places=2)
+    monthly_repayment = models.DecimalField(max_digits=15, decimal_places=2)
+    emis_paid_on_time = models.IntegerField(default=0)
+    emis_paid = models.IntegerField(default=0)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'credit_app_loan_archive'
+
+    @property
+    def repayments_left(self):
+        return max(0, self.tenure - self.emis_paid)
+
+
+class CustomerLoanRollup(models.Model):
+    """Per-customer totals of archived loans, folded into the credit score inputs."""
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, primary_key=True, related_name='loan_rollup',
+    )
+    loan_count = models.IntegerField(default=0)
+    emis_due = models.IntegerField(default=0)
+    emis_on_time = models.IntegerField(default=0)
+    total_volume = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'credit_app_customer_loan_rollup'
+
+
+class CustomerExposure(models.Model):
+    """
+    Per-customer exposure rollup backed by a database view.
+    PostgreSQL: materialized view refreshed out of band (see services/analytics.py).
+    Other backends: plain view, always current.
+    """
+    customer = models.OneToOneField(
+        Customer, on_delete=models.DO_NOTHING, primary_key=True, related_name='+',
+    )
+    monthly_salary = models.IntegerField()
+    approved_limit = models.IntegerField()
+    loan_count = models.IntegerField()
+    active_loan_count = models.IntegerField()
+    active_principal = models.DecimalField(max_digits=17, decimal_places=2)
+    active_emi = models.DecimalField(max_digits=17, decimal_places=2)
+    emis_due = models.IntegerField()
+    emis_on_time = models.IntegerField()
+    current_year_count = models.IntegerField()
+    current_year_volume = models.DecimalField(max_digits=17, decimal_places=2)
+    total_volume = models.DecimalField(max_digits=17, decimal_places=2)
+
+    class Meta:
+        managed = False
+        db_table = 'credit_app_customer_exposure_mv'
+
+
+class RateExposure(models.Model):
+    """Active loans grouped by interest rate, backed by a database view."""
+    interest_rate = models.DecimalField(max_digits=6, decimal_places=2, primary_key=True)
+    loan_count = models.IntegerField()
+    active_principal = models.DecimalField(max_digits=17, decimal_places=2)
+    active_emi = models.DecimalField(max_digits=17, decimal_places=2)
+
+    class Meta:
+        managed = False
+        db_table = 'credit_app_rate_exposure_mv'
+
+
+class RepaymentEvent(models.Model):
+    """
+    One EMI payment reported by an upstream system. event_id makes ingestion
+    idempotent; applied_at is set once the event has been folded into its loan.
+    """
+    event_id = models.CharField(max_length=64, unique=True)
+    loan_id = models.IntegerField(db_index=True)
+    paid_on = models.DateField()
+    on_time = models.BooleanField(default=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    applied_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        db_table = 'credit_app_repayment_event'
+
+
+class CreditPolicy(models.Model):
+    """
+    One published version of the credit policy (see services/policy.py).
+    The highest version is active; rows are never edited, only superseded.
+    """
+    version = models.PositiveIntegerField(unique=True)
+    rules = models.JSONField()
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'credit_app_credit_policy'
+        ordering = ['-version']
+
+
+class LoanChangeLog(models.Model):
+    """
+    A customer whose loans, limits or EMI totals changed, appended on write
+    while the eligibility snapshot is enabled (see services/snapshot.py).
+    """
+    customer_id = models.IntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'credit_app_loan_change_log'
+
+
+class LoanApplication(models.Model):
+    """
+    A /create-loan request accepted in async origination mode and decided later
+    by services/origination.py. loan_id is the created loan's loan_id rather than
+    a foreign key, since credit_app_loan may be partitioned.
+    """
+    PENDING = 'pending'
+    APPROVED = 'approved'
+    REJECTED = 'rejected'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (APPROVED, 'Approved'), (REJECTED, 'Rejected')]
+
+    customer_id = models.IntegerField(db_index=True)
+    loan_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    interest_rate = models.DecimalField(max_digits=6, decimal_places=2)
+    tenure = models.IntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    loan_id = models.IntegerField(null=True, blank=True)
+    corrected_interest_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    monthly_installment = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    message = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    decided_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'credit_app_loan_application'
+
+
+class IngestionRun(models.Model):
+    """
+    One Excel ingestion run with its telemetry (see services/ingestion.py).
+    stages lists the stages in run order, each with its name, seconds, rows and
+    rows_per_second; rejected_by_reason counts skipped rows by reason.
+    """
+    CUSTOMERS = 'customers'
+    LOANS = 'loans'
+    KIND_CHOICES = [(CUSTOMERS, 'Customers'), (LOANS, 'Loans')]
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    file_path = models.CharField(max_length=500)
+    task_id = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    started_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    rows_read = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    rejected_by_reason = models.JSONField(default=dict)
+    stages = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'credit_app_ingestion_run'
+        ordering = ['-started_at']
@@ -0,0 +1,22 @@
+"""
+Access control for endpoints that return more than one customer's data.
+
+The warehouse export streams every customer's name, phone number, salary and
+debt, so it is closed unless EXPORT_API_TOKEN is set, and then only open to
+requests carrying `Authorization: Bearer <EXPORT_API_TOKEN>`.
+"""
+import hmac
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class WarehouseTokenPermission(BasePermission):
+    message = 'A valid warehouse export token is required.'
+
+    def has_permission(self, request, view):
+        token = settings.EXPORT_API_TOKEN
+        scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+        return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(
+            supplied.strip().encode(), token.encode(),
+        )
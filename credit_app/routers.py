@@ -0,0 +1,69 @@
+"""
+Primary/replica database routing.
+Reads go to the 'replica' alias only inside read_from_replica() blocks, which
+wrap the read-only endpoints; everything else (writes, create-loan's
+eligibility check, Celery tasks) stays on 'default'. A write touching a
+customer pins that customer's reads to the primary for REPLICA_PIN_SECONDS so
+/create-loan followed by /view-loans sees the new loan despite replica lag.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = 'replica'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def _pin_key(customer_id) -> str:
+    return f'db-pin:customer:{customer_id}'
+
+
+def pin_customer(customer_id) -> None:
+    """Keep this customer's reads on the primary for REPLICA_PIN_SECONDS."""
+    cache.set(_pin_key(customer_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def pin_customers(customer_ids) -> None:
+    cache.set_many({_pin_key(cid): 1 for cid in customer_ids}, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(customer_id) -> bool:
+    return cache.get(_pin_key(customer_id)) is not None
+
+
+@contextmanager
+def read_from_replica(customer_id=None):
+    """Route reads in this block to the replica, unless replicas are disabled or the customer is pinned."""
+    use_replica = settings.READ_REPLICA_ENABLED and (customer_id is None or not is_pinned(customer_id))
+    token = _read_alias.set(REPLICA_ALIAS if use_replica else None)
+    try:
+        yield use_replica
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Force reads in this block back to the primary (e.g. retry after a replica miss)."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from .models import Customer, Loan
@@ -43,6 +44,12 @@ class CreateLoanSerializer(serializers.Serializer):
     tenure = serializers.IntegerField(min_value=1)
 
 
+class CustomerSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=100)
+    page = serializers.IntegerField(min_value=1, max_value=100, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
 class CustomerNestedSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source='pk', read_only=True)
 
@@ -51,6 +58,18 @@ class CustomerNestedSerializer(serializers.ModelSerializer):
         fields = ['id', 'first_name', 'last_name', 'phone_number', 'age']
 
 
+class CustomerProfileSerializer(serializers.ModelSerializer):
+    customer_id = serializers.IntegerField(source='pk', read_only=True)
+    monthly_income = serializers.IntegerField(source='monthly_salary', read_only=True)
+
+    class Meta:
+        model = Customer
+        fields = [
+            'customer_id', 'first_name', 'last_name', 'phone_number', 'age',
+            'monthly_income', 'approved_limit', 'current_debt',
+        ]
+
+
 class LoanDetailSerializer(serializers.ModelSerializer):
     loan_id = serializers.SerializerMethodField()
     customer = CustomerNestedSerializer(read_only=True)
@@ -85,3 +104,23 @@ class LoanListItemSerializer(serializers.ModelSerializer):
 
     def get_loan_id(self, obj):
         return obj.loan_id if obj.loan_id is not None else obj.pk
+
+
+class RepaymentEventSerializer(serializers.Serializer):
+    event_id = serializers.CharField(max_length=64)
+    loan_id = serializers.IntegerField()
+    paid_on = serializers.DateField()
+    on_time = serializers.BooleanField(default=True)
+
+
+class RepaymentBatchSerializer(serializers.Serializer):
+    # Bounds the loan_id lookup and insert per request; larger feeds must be split into several POSTs.
+    events = RepaymentEventSerializer(many=True, allow_empty=False, max_length=settings.REPAYMENT_MAX_BATCH)
+
+    def validate_events(self, events):
+        loan_ids = {e['loan_id'] for e in events}
+        found = set(Loan.objects.filter(loan_id__in=loan_ids).values_list('loan_id', flat=True))
+        missing = sorted(loan_ids - found)
+        if missing:
+            raise serializers.ValidationError(f'Loans not found: {missing}')
+        return events
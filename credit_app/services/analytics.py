@@ -0,0 +1,151 @@
+"""
+Portfolio exposure analytics.
+Reads only from the exposure views (credit_app_customer_exposure_mv,
+credit_app_rate_exposure_mv) so dashboards never scan credit_app_loan on the
+request path. On PostgreSQL the views are materialized and refreshed by
+refresh_portfolio_views() (Celery beat and after ingestion).
+"""
+from datetime import date
+
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Least
+
+from credit_app.models import CustomerExposure, RateExposure
+from credit_app.services.policy import CompiledPolicy, active_policy
+
+
+EXPOSURE_VIEWS = ('credit_app_customer_exposure_mv', 'credit_app_rate_exposure_mv')
+
+
+def refresh_portfolio_views() -> bool:
+    """REFRESH MATERIALIZED VIEW CONCURRENTLY on PostgreSQL; no-op elsewhere."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        for view in EXPOSURE_VIEWS:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+    return True
+
+
+def _emi_burden_bands(policy: CompiledPolicy):
+    """EMI burden (sum of active EMIs / monthly salary) buckets around the affordability cut-off."""
+    ratio = policy.affordability_ratio
+    half, full = f'{ratio * 50:g}', f'{ratio * 100:g}'
+    return ((f'0-{half}%', ratio / 2), (f'{half}-{full}%', ratio), (f'{full}%+', None))
+
+
+def _credit_score_expression(policy: CompiledPolicy):
+    """compute_credit_score expressed over CustomerExposure columns."""
+    on_time = Case(
+        When(emis_due__gt=0, then=Cast('emis_on_time', FloatField()) * 100 / Cast('emis_due', FloatField())),
+        default=Value(100.0),
+        output_field=FloatField(),
+    )
+    loans = Cast('loan_count', FloatField()) * policy.points_per_loan
+    activity = Cast('current_year_count', FloatField()) * policy.points_per_current_year_loan
+    volume = Cast('total_volume', FloatField()) / policy.volume_per_point
+    weighted = (
+        policy.w_on_time * Least(on_time, Value(100.0))
+        + policy.w_loan_count * Least(loans, Value(100.0))
+        + policy.w_current_year * Least(activity, Value(100.0))
+        + policy.w_volume * Least(volume, Value(100.0))
+    )
+    return Case(
+        When(active_principal__gt=F('approved_limit'), then=Value(0.0)),
+        default=weighted,
+        output_field=FloatField(),
+    )
+
+
+def _band_expression(field: str, bands):
+    whens = [When(**{f'{field}__lte': upper}, then=Value(label)) for label, upper in bands if upper is not None]
+    return Case(*whens, default=Value(bands[-1][0]))
+
+
+def _rate_slabs(policy: CompiledPolicy):
+    """Rate ranges split at the policy's slab minimum rates."""
+    cutoffs = policy.rate_cutoffs()
+    if not cutoffs:
+        return (('all', Q()),)
+    slabs = [(f'<={cutoffs[0]:g}', Q(interest_rate__lte=cutoffs[0]))]
+    for low, high in zip(cutoffs, cutoffs[1:]):
+        slabs.append((f'{low:g}-{high:g}', Q(interest_rate__gt=low, interest_rate__lte=high)))
+    slabs.append((f'>{cutoffs[-1]:g}', Q(interest_rate__gt=cutoffs[-1])))
+    return tuple(slabs)
+
+
+def _as_float(value) -> float:
+    return round(float(value or 0), 2)
+
+
+def portfolio_exposure() -> dict:
+    """Totals and distributions for the whole book, read from the exposure views."""
+    policy = active_policy()
+    score_bands_spec = policy.score_bands()
+    burden_bands = _emi_burden_bands(policy)
+    rate_slabs = _rate_slabs(policy)
+    totals = CustomerExposure.objects.aggregate(
+        customers=Count('pk'),
+        active_loans=Sum('active_loan_count'),
+        active_principal=Sum('active_principal'),
+        active_emi=Sum('active_emi'),
+        monthly_salary=Sum('monthly_salary'),
+        current_year_loans=Sum('current_year_count'),
+        current_year_volume=Sum('current_year_volume'),
+    )
+
+    score_bands = {label: {'band': label, 'customers': 0, 'active_principal': 0.0} for label, _ in score_bands_spec}
+    rows = (
+        CustomerExposure.objects
+        .annotate(credit_score=_credit_score_expression(policy))
+        .annotate(band=_band_expression('credit_score', score_bands_spec))
+        .values('band')
+        .annotate(customers=Count('pk'), principal=Sum('active_principal'))
+    )
+    for row in rows:
+        score_bands[row['band']].update(customers=row['customers'], active_principal=_as_float(row['principal']))
+
+    burden = {label: 0 for label, _ in burden_bands}
+    rows = (
+        CustomerExposure.objects
+        .filter(active_loan_count__gt=0, monthly_salary__gt=0)
+        .annotate(burden=Cast('active_emi', FloatField()) / Cast('monthly_salary', FloatField()))
+        .annotate(band=_band_expression('burden', burden_bands))
+        .values('band')
+        .annotate(customers=Count('pk'))
+    )
+    for row in rows:
+        burden[row['band']] = row['customers']
+
+    slab_aggregates = {}
+    for i, (_, condition) in enumerate(rate_slabs):
+        slab_aggregates[f'loans_{i}'] = Sum('loan_count', filter=condition)
+        slab_aggregates[f'principal_{i}'] = Sum('active_principal', filter=condition)
+    agg = RateExposure.objects.aggregate(**slab_aggregates)
+    slabs = [
+        {
+            'slab': label,
+            'loans': agg[f'loans_{i}'] or 0,
+            'active_principal': _as_float(agg[f'principal_{i}']),
+        }
+        for i, (label, _) in enumerate(rate_slabs)
+    ]
+
+    active_emi = _as_float(totals['active_emi'])
+    salary = float(totals['monthly_salary'] or 0)
+    return {
+        'customers': totals['customers'],
+        'active_loans': totals['active_loans'] or 0,
+        'total_active_principal': _as_float(totals['active_principal']),
+        'total_active_emi': active_emi,
+        'emi_to_salary_ratio': round(active_emi / salary, 4) if salary else 0.0,
+        'emi_burden_distribution': burden,
+        'score_bands': list(score_bands.values()),
+        'rate_slabs': slabs,
+        'current_year': {
+            'year': date.today().year,
+            'loans': totals['current_year_loans'] or 0,
+            'volume': _as_float(totals['current_year_volume']),
+        },
+    }
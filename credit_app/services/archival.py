@@ -0,0 +1,101 @@
+"""
+Archival of fully repaid loans into credit_app_loan_archive.
+A loan is archived once emis_paid >= tenure and it started before the current
+year (current-year activity is still read from credit_app_loan). Its score
+contributions (count, EMIs due / on time, volume) are folded into
+CustomerLoanRollup in the same transaction as the move.
+
+The moved rows are deleted without Loan signals: a closed loan no longer adds
+to current_debt, so the batch only needs one change-log insert and one
+replica pin for its customers.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from credit_app.models import ArchivedLoan, CustomerLoanRollup, Loan
+from credit_app.routers import pin_customers
+from credit_app.services.snapshot import record_customer_changes
+
+ARCHIVED_FIELDS = (
+    'loan_id', 'loan_amount', 'tenure', 'interest_rate', 'monthly_repayment',
+    'emis_paid_on_time', 'emis_paid', 'start_date', 'end_date',
+)
+
+# Parameter lists stay well under SQLite's bound-variable limit.
+DELETE_CHUNK_SIZE = 1000
+
+
+def archivable_loans():
+    year_start = date(date.today().year, 1, 1)
+    return Loan.objects.filter(emis_paid__gte=F('tenure'), start_date__lt=year_start)
+
+
+def _delete_loans(ids) -> None:
+    """
+    Plain DELETE by id. Nothing references Loan, so QuerySet.delete() would only
+    add per-row post_delete signals, each pinning and logging the same customers.
+    """
+    with connections[router.db_for_write(Loan)].cursor() as cursor:
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+            cursor.execute(
+                f'DELETE FROM {Loan._meta.db_table} WHERE id IN ({", ".join(["%s"] * len(chunk))})', chunk,
+            )
+
+
+def archive_loan_batch(batch_size: int = None) -> int:
+    """Move up to batch_size closed loans to the archive. Returns the number moved."""
+    batch_size = batch_size or settings.LOAN_ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        loans = list(archivable_loans().select_for_update(skip_locked=True).order_by('pk')[:batch_size])
+        if not loans:
+            return 0
+
+        ArchivedLoan.objects.bulk_create(
+            [
+                ArchivedLoan(
+                    original_id=loan.pk,
+                    customer_id=loan.customer_id,
+                    **{f: getattr(loan, f) for f in ARCHIVED_FIELDS},
+                )
+                for loan in loans
+            ],
+            batch_size=1000,
+        )
+
+        totals = defaultdict(lambda: [0, 0, 0, Decimal('0')])
+        for loan in loans:
+            t = totals[loan.customer_id]
+            t[0] += 1
+            t[1] += max(0, loan.tenure)
+            t[2] += loan.emis_paid_on_time
+            t[3] += loan.loan_amount
+        rollups = CustomerLoanRollup.objects.select_for_update().in_bulk(list(totals))
+        created, changed = [], []
+        for customer_id, (count, due, on_time, volume) in totals.items():
+            rollup = rollups.get(customer_id)
+            if rollup is None:
+                created.append(CustomerLoanRollup(
+                    customer_id=customer_id, loan_count=count, emis_due=due,
+                    emis_on_time=on_time, total_volume=volume,
+                ))
+                continue
+            rollup.loan_count += count
+            rollup.emis_due += due
+            rollup.emis_on_time += on_time
+            rollup.total_volume += volume
+            changed.append(rollup)
+        CustomerLoanRollup.objects.bulk_create(created)
+        CustomerLoanRollup.objects.bulk_update(
+            changed, ['loan_count', 'emis_due', 'emis_on_time', 'total_volume'], batch_size=1000,
+        )
+
+        _delete_loans([loan.pk for loan in loans])
+        record_customer_changes(list(totals))
+    pin_customers(totals)
+    return len(loans)
@@ -0,0 +1,76 @@
+"""
+Offline policy backtest.
+
+Every loan in the book (hot and archived) is replayed as an application by its
+customer under a baseline and a candidate policy, with both evaluated by
+CompiledPolicy.evaluate_batch() over a LoanBook snapshot. Scores and other
+active EMIs reflect the book as it is today (the replayed loan's own EMI is
+excluded), so the result answers "which of these applications would flip if
+the candidate policy were live now", not a point-in-time reconstruction.
+"""
+from credit_app.services.loan_book import LoanBook, load_loan_book
+from credit_app.services.policy import (
+    APPROVED, OVER_AFFORDABILITY, RATE_TOO_LOW, SCORE_TOO_LOW, BatchDecision, CompiledPolicy,
+)
+
+REASON_LABELS = {
+    OVER_AFFORDABILITY: 'affordability',
+    SCORE_TOO_LOW: 'score_too_low',
+    RATE_TOO_LOW: 'rate_too_low',
+}
+
+
+def replay(book: LoanBook, policy: CompiledPolicy) -> BatchDecision:
+    """Evaluate every application in the book under policy."""
+    import numpy as np
+
+    apps = book.applications
+    scores = policy.score_batch(*book.score_inputs, approved_limit=book.approved_limit)
+    other_emi = np.maximum(book.active_emi_total[apps.customer] - apps.active_emi, 0.0)
+    return policy.evaluate_batch(
+        scores[apps.customer], apps.loan_amount, apps.interest_rate, apps.tenure,
+        other_emi, book.monthly_salary[apps.customer],
+    )
+
+
+def _summary(policy: CompiledPolicy, decision: BatchDecision, requested) -> dict:
+    import numpy as np
+
+    n = len(decision.reason)
+    approved = int(decision.approval.sum())
+    return {
+        'version': policy.version,
+        'approved': approved,
+        'approval_rate': round(approved / n, 4) if n else 0.0,
+        'rate_corrected': int((decision.approval & (decision.corrected_interest_rate != requested)).sum()),
+        'rejections': {
+            label: int(np.count_nonzero(decision.reason == reason)) for reason, label in REASON_LABELS.items()
+        },
+    }
+
+
+def backtest(baseline: CompiledPolicy, candidate: CompiledPolicy, book: LoanBook = None) -> dict:
+    """Approval-rate and rate-correction deltas of candidate against baseline over the whole book."""
+    import numpy as np
+
+    book = book if book is not None else load_loan_book()
+    requested = book.applications.interest_rate
+    before = replay(book, baseline)
+    after = replay(book, candidate)
+    both = before.approval & after.approval
+    rate_change = after.corrected_interest_rate[both] - before.corrected_interest_rate[both]
+    base, cand = _summary(baseline, before, requested), _summary(candidate, after, requested)
+    return {
+        'customers': len(book),
+        'applications': len(requested),
+        'baseline': base,
+        'candidate': cand,
+        'approval_rate_delta': round(cand['approval_rate'] - base['approval_rate'], 4),
+        'newly_approved': int((after.approval & ~before.approval).sum()),
+        'newly_rejected': int((before.approval & ~after.approval).sum()),
+        'rate_corrected_delta': cand['rate_corrected'] - base['rate_corrected'],
+        'mean_rate_change': round(float(rate_change.mean()), 4) if rate_change.size else 0.0,
+        'rejection_reason_changed': int(np.count_nonzero(
+            (before.reason != after.reason) & (before.reason != APPROVED) & (after.reason != APPROVED)
+        )),
+    }
@@ -0,0 +1,119 @@
+"""
+Customer.current_debt and Customer.active_emi_total, maintained on write.
+
+current_debt is the outstanding principal over active loans (emis_paid < tenure)
+following the calculate_emi schedule; active_emi_total is the sum of their
+monthly_repayment. Writes adjust both with F-expression UPDATEs so concurrent
+changes never overwrite each other, which lets check_eligibility read the
+affordability figure from the customer row instead of aggregating loans.
+reconcile_customer_totals() recomputes both from scratch.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db.models import Case, DecimalField, F, IntegerField, When
+from django.utils import timezone
+
+from credit_app.models import Customer, Loan
+from credit_app.services.emi import outstanding_principal
+from credit_app.services.snapshot import record_customer_changes
+
+Delta = Tuple[int, Decimal]
+CENTS = Decimal('0.01')
+
+
+def loan_contribution(loan_amount, interest_rate, tenure: int, emis_paid: int, monthly_repayment) -> Delta:
+    """(current_debt, active_emi_total) contributed by one loan in its current state."""
+    if emis_paid >= tenure:
+        return 0, Decimal('0')
+    debt = outstanding_principal(loan_amount, interest_rate, tenure, emis_paid)
+    return round(debt), Decimal(str(monthly_repayment)).quantize(CENTS)
+
+
+def apply_customer_deltas(deltas: Dict[int, Delta]) -> None:
+    """Add per-customer (debt, emi) deltas in a single UPDATE."""
+    deltas = {cid: d for cid, d in deltas.items() if d[0] or d[1]}
+    if not deltas:
+        return
+    if len(deltas) == 1:
+        (customer_id, (debt, emi)), = deltas.items()
+        Customer.objects.filter(pk=customer_id).update(
+            current_debt=F('current_debt') + debt,
+            active_emi_total=F('active_emi_total') + emi,
+            updated_at=timezone.now(),
+        )
+        return
+    Customer.objects.filter(pk__in=deltas.keys()).update(
+        current_debt=Case(
+            *[When(pk=cid, then=F('current_debt') + debt) for cid, (debt, _) in deltas.items()],
+            default=F('current_debt'),
+            output_field=IntegerField(),
+        ),
+        active_emi_total=Case(
+            *[When(pk=cid, then=F('active_emi_total') + emi) for cid, (_, emi) in deltas.items()],
+            default=F('active_emi_total'),
+            output_field=DecimalField(max_digits=17, decimal_places=2),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def record_loan_created(loan: Loan) -> None:
+    debt, emi = loan_contribution(
+        loan.loan_amount, loan.interest_rate, loan.tenure, loan.emis_paid, loan.monthly_repayment,
+    )
+    apply_customer_deltas({loan.customer_id: (debt, emi)})
+
+
+def record_loan_deleted(loan: Loan) -> None:
+    debt, emi = loan_contribution(
+        loan.loan_amount, loan.interest_rate, loan.tenure, loan.emis_paid, loan.monthly_repayment,
+    )
+    apply_customer_deltas({loan.customer_id: (-debt, -emi)})
+
+
+def repayment_deltas(loans: Iterable[tuple], paid: Dict[int, int]) -> Dict[int, Delta]:
+    """
+    Per-customer deltas for applying paid[loan_id] more installments.
+    loans: (loan_id, customer_id, loan_amount, interest_rate, tenure, emis_paid, monthly_repayment)
+    as read before the repayment UPDATE.
+    """
+    deltas = defaultdict(lambda: (0, Decimal('0')))
+    for loan_id, customer_id, amount, rate, tenure, emis_paid, emi in loans:
+        before = loan_contribution(amount, rate, tenure, emis_paid, emi)
+        after = loan_contribution(amount, rate, tenure, min(tenure, emis_paid + paid[loan_id]), emi)
+        debt, total = deltas[customer_id]
+        deltas[customer_id] = (debt + after[0] - before[0], total + after[1] - before[1])
+    return dict(deltas)
+
+
+def reconcile_customer_totals(customer_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> int:
+    """Recompute current_debt / active_emi_total from loans. Returns the number of customers corrected."""
+    loans = Loan.objects.filter(emis_paid__lt=F('tenure'))
+    customers = Customer.objects.only('pk', 'current_debt', 'active_emi_total', 'updated_at')
+    if customer_ids is not None:
+        customer_ids = list(customer_ids)
+        loans = loans.filter(customer_id__in=customer_ids)
+        customers = customers.filter(pk__in=customer_ids)
+
+    expected = defaultdict(lambda: (0, Decimal('0')))
+    rows = loans.values_list(
+        'customer_id', 'loan_amount', 'interest_rate', 'tenure', 'emis_paid', 'monthly_repayment',
+    ).iterator(chunk_size=2000)
+    for customer_id, amount, rate, tenure, emis_paid, emi in rows:
+        debt, total = loan_contribution(amount, rate, tenure, emis_paid, emi)
+        current = expected[customer_id]
+        expected[customer_id] = (current[0] + debt, current[1] + total)
+
+    changed = []
+    now = timezone.now()
+    for customer in customers.iterator(chunk_size=2000):
+        debt, total = expected.get(customer.pk, (0, Decimal('0')))
+        if customer.current_debt != debt or customer.active_emi_total != total:
+            customer.current_debt, customer.active_emi_total, customer.updated_at = debt, total, now
+            changed.append(customer)
+    if not dry_run:
+        Customer.objects.bulk_update(changed, ['current_debt', 'active_emi_total', 'updated_at'], batch_size=1000)
+        record_customer_changes(c.pk for c in changed)
+    return len(changed)
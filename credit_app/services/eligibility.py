@@ -1,20 +1,23 @@
 """
 Credit score (0-100) and loan approval logic.
-Weights: 40% on-time, 20% number of loans, 20% current-year activity, 20% volume.
+Score weights, the affordability ratio and the interest-rate slabs come from the
+active credit policy (services/policy.py); by default 40% on-time, 20% number of
+loans, 20% current-year activity, 20% volume.
+check_eligibility(read_only=True) reads the customer from the memory-mapped
+snapshot (services/snapshot.py) when it is fresh. Otherwise concurrent read-only
+checks for the same customer share one database computation (services/singleflight.py).
 """
 from datetime import date
-from decimal import Decimal
 from typing import NamedTuple
 
-from django.db.models import F, Sum
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest
 
-from credit_app.models import Customer, Loan
-from credit_app.services.emi import calculate_emi
-
-
-# Slab minimum rates by credit score band (lowest rate that can be approved)
-SLAB_MIN_RATE_30_50 = Decimal('12')
-SLAB_MIN_RATE_10_30 = Decimal('16')
+from credit_app.models import Customer, CustomerLoanRollup, Loan
+from credit_app.routers import is_pinned
+from credit_app.services import snapshot
+from credit_app.services.policy import CompiledPolicy, active_policy
+from credit_app.services.singleflight import single_flight
 
 
 class EligibilityResult(NamedTuple):
@@ -29,39 +32,96 @@ def get_current_loans_queryset(customer_id: int):
     return Loan.objects.filter(customer_id=customer_id).filter(emis_paid__lt=F('tenure'))
 
 
-def compute_credit_score(customer: Customer) -> float:
+class ScoreInputs(NamedTuple):
+    """Loan-history aggregates the credit score is computed from (hot loans plus archived rollup)."""
+    loan_count: int
+    emis_due: int
+    emis_on_time: int
+    current_year_count: int
+    total_volume: float
+    current_principal: float
+
+
+def credit_score_inputs(customer: Customer, rollup: CustomerLoanRollup = None) -> ScoreInputs:
+    """One aggregate over the customer's loans plus their archived-loan rollup (fetched unless given)."""
+    current_year = date.today().year
+    agg = Loan.objects.filter(customer=customer).aggregate(
+        loan_count=Count('pk'),
+        emis_due=Sum(Greatest('tenure', Value(0))),
+        emis_on_time=Sum('emis_paid_on_time'),
+        current_year_count=Count('pk', filter=Q(start_date__year=current_year)),
+        total_volume=Sum('loan_amount'),
+        current_principal=Sum('loan_amount', filter=Q(emis_paid__lt=F('tenure'))),
+    )
+    if rollup is None:
+        rollup = CustomerLoanRollup.objects.filter(customer=customer).first() or CustomerLoanRollup()
+    return ScoreInputs(
+        loan_count=agg['loan_count'] + rollup.loan_count,
+        emis_due=(agg['emis_due'] or 0) + rollup.emis_due,
+        emis_on_time=(agg['emis_on_time'] or 0) + rollup.emis_on_time,
+        current_year_count=agg['current_year_count'],
+        total_volume=float(agg['total_volume'] or 0) + float(rollup.total_volume),
+        current_principal=float(agg['current_principal'] or 0),
+    )
+
+
+def score_from_inputs(inputs: ScoreInputs, approved_limit: int, policy: CompiledPolicy = None) -> float:
     """
     Credit score 0-100 from:
-    1. Past loans paid on time (40%)
-    2. Number of loans in past (20%)
-    3. Loan activity in current year (20%)
-    4. Loan approved volume (20%)
-    5. If sum of current loan principals > approved_limit -> 0
+    1. Past loans paid on time
+    2. Number of loans in past
+    3. Loan activity in current year
+    4. Loan approved volume
+    weighted per the credit policy. If sum of current loan principals > approved_limit -> 0
     """
-    current_loans = Loan.objects.filter(customer=customer).filter(emis_paid__lt=F('tenure'))
-    total_current_principal = current_loans.aggregate(s=Sum('loan_amount'))['s']
-    if total_current_principal is not None and float(total_current_principal) > customer.approved_limit:
-        return 0.0
+    return (policy or active_policy()).score(inputs, approved_limit)
 
-    all_loans = Loan.objects.filter(customer=customer)
-    total_emis_due = sum(max(0, loan.tenure) for loan in all_loans)
-    total_emis_on_time = sum(loan.emis_paid_on_time for loan in all_loans)
-    on_time_ratio = (total_emis_on_time / total_emis_due) if total_emis_due else 1.0
-    on_time_score = min(100, on_time_ratio * 100)
 
-    num_loans = all_loans.count()
-    loans_score = min(100, num_loans * 10)
+def compute_credit_score(customer: Customer, policy: CompiledPolicy = None) -> float:
+    """Credit score 0-100 for the customer; see score_from_inputs for the formula."""
+    return score_from_inputs(credit_score_inputs(customer), customer.approved_limit, policy)
 
-    current_year = date.today().year
-    current_year_loans = all_loans.filter(start_date__year=current_year)
-    cy_count = current_year_loans.count()
-    activity_score = min(100, cy_count * 25)
 
-    total_volume = all_loans.aggregate(s=Sum('loan_amount'))['s']
-    volume_score = min(100, float(total_volume or 0) / 100000)
+def _from_snapshot(record) -> tuple:
+    """(monthly_salary, approved_limit, active_emi_total, ScoreInputs) from a snapshot record."""
+    inputs = ScoreInputs(
+        loan_count=int(record['loan_count']),
+        emis_due=int(record['emis_due']),
+        emis_on_time=int(record['emis_on_time']),
+        current_year_count=int(record['current_year_count']),
+        total_volume=float(record['total_volume']),
+        current_principal=float(record['current_principal']),
+    )
+    return (
+        float(record['monthly_salary']), float(record['approved_limit']),
+        float(record['active_emi_total']), inputs,
+    )
 
-    score = 0.4 * on_time_score + 0.2 * loans_score + 0.2 * activity_score + 0.2 * volume_score
-    return min(100.0, max(0.0, score))
+
+def _from_database(customer_id: int):
+    """Same tuple as _from_snapshot, read from the database; None if the customer does not exist."""
+    try:
+        customer = Customer.objects.get(pk=customer_id)
+    except Customer.DoesNotExist:
+        return None
+    return (
+        customer.monthly_salary, customer.approved_limit,
+        customer.active_emi_total, credit_score_inputs(customer),
+    )
+
+
+def _load_shared(customer_id: int):
+    """
+    Database read shared with concurrent read-only checks for the same customer.
+    Customers written in the last few seconds (pinned to the primary) still
+    coalesce in-process but skip the cross-worker computation, which may have
+    started before the write.
+    """
+    return single_flight(
+        f'eligibility:{customer_id}',
+        lambda: _from_database(customer_id),
+        share_across_processes=not is_pinned(customer_id),
+    )
 
 
 def check_eligibility(
@@ -69,52 +129,29 @@ def check_eligibility(
     loan_amount: float,
     interest_rate: float,
     tenure: int,
+    read_only: bool = False,
 ) -> EligibilityResult:
     """
     Returns approval, corrected_interest_rate, monthly_installment, and optional message.
+    read_only callers may be served from the eligibility snapshot or a concurrent computation.
     """
-    try:
-        customer = Customer.objects.get(pk=customer_id)
-    except Customer.DoesNotExist:
+    record = snapshot.lookup(customer_id) if read_only else None
+    if record is not None:
+        loaded = _from_snapshot(record)
+    else:
+        loaded = _load_shared(customer_id) if read_only else _from_database(customer_id)
+    if loaded is None:
         return EligibilityResult(False, interest_rate, 0.0, 'Customer not found')
-
-    credit_score = compute_credit_score(customer)
-
-    current_loans = get_current_loans_queryset(customer_id)
-    current_emis_sum = current_loans.aggregate(s=Sum('monthly_repayment'))['s'] or 0
-    new_emi = calculate_emi(loan_amount, interest_rate, tenure)
-    total_emi_after = float(current_emis_sum) + new_emi
-    if total_emi_after > 0.5 * customer.monthly_salary:
+    monthly_salary, approved_limit, active_emi_total, inputs = loaded
+
+    policy = active_policy()
+    credit_score = policy.score(inputs, approved_limit)
+    decision = policy.evaluate(
+        credit_score, loan_amount, interest_rate, tenure, active_emi_total, monthly_salary,
+    )
+    if not decision.approval:
         return EligibilityResult(
-            False, interest_rate,
-            round(new_emi, 2),
-            'Sum of current EMIs and new EMI exceeds 50% of monthly salary'
+            False, interest_rate, decision.monthly_installment,
+            policy.message(decision.reason, decision.band),
         )
-
-    if credit_score <= 10:
-        return EligibilityResult(
-            False, interest_rate, round(new_emi, 2),
-            'Credit score too low (<=10)'
-        )
-
-    rate_decimal = Decimal(str(interest_rate))
-    corrected = float(rate_decimal)
-
-    if credit_score <= 30:
-        if rate_decimal <= SLAB_MIN_RATE_10_30:
-            return EligibilityResult(
-                False, interest_rate, round(new_emi, 2),
-                'Interest rate must be > 16% for this credit score'
-            )
-        corrected = max(float(rate_decimal), float(SLAB_MIN_RATE_10_30))
-    elif credit_score <= 50:
-        if rate_decimal <= SLAB_MIN_RATE_30_50:
-            return EligibilityResult(
-                False, interest_rate, round(new_emi, 2),
-                'Interest rate must be > 12% for this credit score'
-            )
-        corrected = max(float(rate_decimal), float(SLAB_MIN_RATE_30_50))
-    # else credit_score > 50: any rate, corrected = interest_rate
-
-    monthly = calculate_emi(loan_amount, corrected, tenure)
-    return EligibilityResult(True, corrected, round(monthly, 2))
+    return EligibilityResult(True, decision.corrected_interest_rate, decision.monthly_installment)
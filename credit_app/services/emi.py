@@ -4,6 +4,19 @@ EMI = P * r * (1+r)^n / ((1+r)^n - 1)
 where r = annual_rate / (12 * 100), P = principal, n = tenure in months.
 """
 from decimal import Decimal
+from functools import lru_cache
+from typing import Iterator, NamedTuple
+
+# Distinct (amount, rate, tenure) schedules kept in memory per process.
+SCHEDULE_CACHE_SIZE = 1024
+
+
+class ScheduleRow(NamedTuple):
+    month: int
+    emi: float
+    principal: float
+    interest: float
+    balance: float
 
 
 def calculate_emi(loan_amount: float, annual_interest_rate: float, tenure_months: int) -> float:
@@ -18,3 +31,56 @@ def calculate_emi(loan_amount: float, annual_interest_rate: float, tenure_months
     factor = (1 + r) ** n
     emi = p * r * factor / (factor - 1)
     return round(emi, 2)
+
+
+def calculate_emi_batch(loan_amounts, annual_interest_rates, tenures_months):
+    """calculate_emi over NumPy arrays (or scalars broadcast against them), rounded to the cent."""
+    import numpy as np
+
+    p = np.asarray(loan_amounts, dtype=float)
+    annual = np.asarray(annual_interest_rates, dtype=float)
+    n = np.asarray(tenures_months, dtype=float)
+    r = annual / (12 * 100)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        factor = (1 + r) ** n
+        emi = np.where(annual > 0, p * r * factor / (factor - 1), p / n)
+    return np.round(np.where(n > 0, emi, 0.0), 2)
+
+
+def amortization_schedule(loan_amount: float, annual_interest_rate: float, tenure_months: int) -> Iterator[ScheduleRow]:
+    """
+    Yield month-by-month rows at the calculate_emi installment.
+    The last installment absorbs rounding so the balance ends at exactly 0.
+    """
+    n = int(tenure_months)
+    emi = calculate_emi(loan_amount, annual_interest_rate, n)
+    r = max(0.0, float(annual_interest_rate)) / (12 * 100)
+    balance = float(loan_amount)
+    for month in range(1, n + 1):
+        interest = round(balance * r, 2)
+        principal = round(emi - interest, 2) if month < n else round(balance, 2)
+        balance = round(balance - principal, 2)
+        yield ScheduleRow(month, round(principal + interest, 2), principal, interest, balance)
+
+
+def outstanding_principal(loan_amount: float, annual_interest_rate: float, tenure_months: int, emis_paid: int) -> float:
+    """Principal still owed after emis_paid installments of the calculate_emi schedule (closed form)."""
+    n = int(tenure_months)
+    k = int(emis_paid)
+    if k >= n or n <= 0:
+        return 0.0
+    p = float(loan_amount)
+    if k <= 0:
+        return p
+    emi = calculate_emi(loan_amount, annual_interest_rate, n)
+    r = float(annual_interest_rate) / (12 * 100)
+    if r <= 0:
+        return max(0.0, round(p - emi * k, 2))
+    factor = (1 + r) ** k
+    return max(0.0, round(p * factor - emi * (factor - 1) / r, 2))
+
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def cached_schedule(loan_amount: Decimal, annual_interest_rate: Decimal, tenure_months: int) -> tuple:
+    """amortization_schedule materialized once per distinct loan terms."""
+    return tuple(amortization_schedule(loan_amount, annual_interest_rate, tenure_months))
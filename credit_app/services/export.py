@@ -0,0 +1,217 @@
+"""
+Streaming export of customers and loans for the data warehouse.
+
+Rows are read with values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+inside a transaction, which on PostgreSQL fetches through a server-side cursor
+(and gives the export one consistent snapshot), so memory stays flat whatever
+the table size. That needs a connection with server-side cursors enabled and
+held for the whole stream: the 'export' alias when DATABASE_EXPORT_URL (or, behind
+a transaction pooler, DIRECT_DATABASE_URL) is set, otherwise the usual read
+alias. A pooled connection with server-side cursors disabled would buffer the
+whole result set, so exports refuse to run on one. The writers encode each chunk as CSV, NDJSON or Parquet (one
+row group per chunk). copy_csv() is the PostgreSQL fast path for files: COPY
+... TO STDOUT straight into the file.
+
+Incremental exports take rows whose watermark column (updated_at; archived_at
+for archived loans) is after `since` and at or before `until`. `until`
+defaults to now minus EXPORT_WATERMARK_LAG_SECONDS, so rows saved by
+transactions still in flight land in the next window; callers store `until`
+and pass it as the next `since`. Archived loans leave the loans dataset, so
+pull archived_loans with the same watermark to see them.
+"""
+import csv
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from credit_app.models import ArchivedLoan, Customer, Loan
+
+
+class Dataset(NamedTuple):
+    model: type
+    fields: Tuple[str, ...]
+    watermark: str
+
+
+LOAN_FIELDS = (
+    'loan_id', 'customer_id', 'loan_amount', 'tenure', 'interest_rate', 'monthly_repayment',
+    'emis_paid_on_time', 'emis_paid', 'start_date', 'end_date',
+)
+
+DATASETS = {
+    'customers': Dataset(
+        Customer,
+        ('id', 'first_name', 'last_name', 'phone_number', 'age', 'monthly_salary',
+         'approved_limit', 'current_debt', 'active_emi_total', 'updated_at'),
+        'updated_at',
+    ),
+    'loans': Dataset(Loan, ('id',) + LOAN_FIELDS + ('updated_at',), 'updated_at'),
+    'archived_loans': Dataset(ArchivedLoan, ('original_id',) + LOAN_FIELDS + ('archived_at',), 'archived_at'),
+}
+
+EXPORT_ALIAS = 'export'
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def export_window(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """(since, until) with until defaulting to now minus the watermark lag."""
+    if until is None:
+        until = timezone.now() - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since, dt_timezone.utc)
+    if timezone.is_naive(until):
+        until = timezone.make_aware(until, dt_timezone.utc)
+    return since, until
+
+
+def export_queryset(dataset: str, since: Optional[datetime], until: datetime):
+    spec = DATASETS[dataset]
+    rows = spec.model.objects.filter(**{f'{spec.watermark}__lte': until})
+    if since is not None:
+        rows = rows.filter(**{f'{spec.watermark}__gt': since}).order_by(spec.watermark, 'pk')
+    else:
+        rows = rows.order_by('pk')
+    return rows.values_list(*spec.fields)
+
+
+def export_alias(model) -> str:
+    """Database alias exports read from; raises if it cannot stream with a server-side cursor."""
+    alias = EXPORT_ALIAS if EXPORT_ALIAS in settings.DATABASES else router.db_for_read(model)
+    if connections[alias].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        raise ImproperlyConfigured(
+            'Exports need a direct or session-pooled connection; set DATABASE_EXPORT_URL or DIRECT_DATABASE_URL.'
+        )
+    return alias
+
+
+def export_rows(dataset: str, since: Optional[datetime], until: datetime) -> Iterator[tuple]:
+    rows = export_queryset(dataset, since, until)
+    alias = export_alias(rows.model)
+    with transaction.atomic(using=alias):
+        yield from rows.using(alias).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_chunks(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for chunk in _chunks(rows, settings.EXPORT_CHUNK_SIZE):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(fields, rows):
+    encoder = DjangoJSONEncoder()
+    for chunk in _chunks(rows, settings.EXPORT_CHUNK_SIZE):
+        yield ''.join(encoder.encode(dict(zip(fields, row))) + '\n' for row in chunk)
+
+
+class _ByteSink:
+    """Write-only file object collecting ParquetWriter output until drained."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_type(field):
+    import pyarrow as pa
+
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.CharField):
+        return pa.string()
+    return pa.int64()
+
+
+def _parquet_chunks(model, fields, rows):
+    # pyarrow is only needed here; keep it out of worker startup.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, _arrow_type(model._meta.get_field(name))) for name in fields])
+    sink = _ByteSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(rows, settings.EXPORT_CHUNK_SIZE):
+            columns = zip(*chunk)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=arrow.type) for column, arrow in zip(columns, schema)], schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(dataset: str, output: str, since: Optional[datetime], until: datetime):
+    """Encoded chunks (str for csv/ndjson, bytes for parquet) of one dataset window."""
+    spec = DATASETS[dataset]
+    rows = export_rows(dataset, since, until)
+    if output == 'csv':
+        return _csv_chunks(spec.fields, rows)
+    if output == 'ndjson':
+        return _ndjson_chunks(spec.fields, rows)
+    if output == 'parquet':
+        return _parquet_chunks(spec.model, spec.fields, rows)
+    raise ValueError(f'Unknown export format: {output}')
+
+
+def copy_csv(dataset: str, file, since: Optional[datetime], until: datetime) -> None:
+    """PostgreSQL only: COPY the dataset window to a file as CSV with a header row."""
+    rows = export_queryset(dataset, since, until)
+    connection = connections[export_alias(rows.model)]
+    sql, params = rows.query.sql_with_params()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        query = cursor.mogrify(sql, params).decode()
+        cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)', file)
@@ -0,0 +1,351 @@
+"""
+Excel ingestion of customers and loans, with per-run telemetry.
+
+A run goes through timed stages: read (pandas.read_excel), parse (normalize and
+validate rows), write (bulk insert/update, without model signals), then
+sequence_reset (customers, PostgreSQL only), reconcile, refresh_views and
+snapshot. Each run is stored as an
+IngestionRun with every stage's seconds, rows and rows/sec, and rejected rows
+are counted by reason; rejected rows are logged at debug level and summarized
+in one warning. Progress ({run_id, stage, done, total}) goes to an optional
+callback every INGESTION_PROGRESS_EVERY rows; the Celery tasks publish it as
+PROGRESS task state.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from credit_app.models import ArchivedLoan, Customer, IngestionRun, Loan
+from credit_app.routers import pin_customers
+from credit_app.services.analytics import refresh_portfolio_views
+from credit_app.services.debt import reconcile_customer_totals
+from credit_app.services.search import normalize_phone
+from credit_app.services.snapshot import refresh_snapshot, snapshot_enabled
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 1000
+
+
+class Stage:
+    def __init__(self, recorder, name, rows):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+
+    def progress(self, done):
+        self.recorder.report(self.name, done, self.rows)
+
+
+class IngestionRecorder:
+    """Times stages and counts rejections for one IngestionRun; marks it failed if the block raises."""
+
+    def __init__(self, kind, file_path, task_id='', progress=None):
+        self.run = IngestionRun.objects.create(kind=kind, file_path=file_path, task_id=task_id or '')
+        self._progress = progress
+        self._started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.run.status == IngestionRun.RUNNING:
+            self.finish(error=f'{exc_type.__name__}: {exc}')
+        return False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time the block as stage `name`; set .rows on the yielded Stage if not known up front."""
+        stage = Stage(self, name, rows)
+        stage.progress(0)
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            seconds = time.perf_counter() - started
+            self.run.stages.append({
+                'name': name,
+                'seconds': round(seconds, 4),
+                'rows': stage.rows,
+                'rows_per_second': round(stage.rows / seconds, 1) if stage.rows and seconds else None,
+            })
+        if stage.rows is not None:
+            stage.progress(stage.rows)
+        self.run.save(update_fields=['stages', 'rows_read', 'rejected', 'rejected_by_reason'])
+
+    def reject(self, reason, row_number, detail=''):
+        self.run.rejected += 1
+        self.run.rejected_by_reason[reason] = self.run.rejected_by_reason.get(reason, 0) + 1
+        logger.debug('%s ingestion: rejected row %s (%s) %s', self.run.kind, row_number, reason, detail)
+
+    def report(self, stage, done, total):
+        if self._progress is None:
+            return
+        if done == 0 or done == total or done % settings.INGESTION_PROGRESS_EVERY == 0:
+            self._progress({'run_id': self.run.pk, 'stage': stage, 'done': done, 'total': total})
+
+    def finish(self, error=''):
+        run = self.run
+        run.status = IngestionRun.FAILED if error else IngestionRun.SUCCEEDED
+        run.error = error
+        run.finished_at = timezone.now()
+        run.duration_seconds = round(time.perf_counter() - self._started, 4)
+        run.save()
+        if run.rejected:
+            logger.warning(
+                '%s ingestion run %s rejected %s rows: %s', run.kind, run.pk, run.rejected, run.rejected_by_reason,
+            )
+        return self.result()
+
+    def result(self) -> dict:
+        run = self.run
+        result = {
+            'ok': run.status == IngestionRun.SUCCEEDED, 'run_id': run.pk, 'created': run.created,
+            'updated': run.updated, 'rejected': run.rejected_by_reason, 'stages': run.stages,
+        }
+        if run.error:
+            result['error'] = run.error
+        return result
+
+
+def _read_rows(file_path: str) -> list:
+    # pandas is imported here rather than at module level: this module is loaded
+    # by Celery autodiscovery, the web app and every management command.
+    import pandas as pd
+
+    df = pd.read_excel(file_path)
+    df.columns = [str(c).strip().lower().replace(' ', '_') if isinstance(c, str) else c for c in df.columns]
+    return df.to_dict('records')
+
+
+def _is_missing(value) -> bool:
+    import pandas as pd
+
+    return value is None or (not isinstance(value, str) and pd.isna(value))
+
+
+def _parse_date(val):
+    if _is_missing(val):
+        return None
+    if isinstance(val, datetime):
+        return val.date()
+    if hasattr(val, 'date'):
+        return val.date()
+    if isinstance(val, str):
+        try:
+            return datetime.strptime(val[:10], '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return None
+
+
+def _decimal(value) -> Decimal:
+    try:
+        result = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'not a number: {value!r}')
+    if not result.is_finite():
+        raise ValueError(f'not a number: {value!r}')
+    return result
+
+
+def _phone(value) -> str:
+    if _is_missing(value):
+        return '0'
+    return str(int(value)) if str(value).replace('.', '').isdigit() else str(value)
+
+
+def _normalize_phone(customer):
+    # Normally set by the pre_save signal, which bulk writes skip.
+    customer.phone_normalized = normalize_phone(customer.phone_number)
+
+
+def _reset_customer_sequence():
+    """Reset Customer id sequence so new registrations don't conflict with ingested IDs."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence('credit_app_customer', 'id'), "
+            "(SELECT COALESCE(MAX(id), 1) FROM credit_app_customer));"
+        )
+
+
+def _refresh_derived(recorder):
+    with recorder.stage('reconcile'):
+        reconcile_customer_totals()
+    with recorder.stage('refresh_views'):
+        refresh_portfolio_views()
+    if snapshot_enabled():
+        with recorder.stage('snapshot'):
+            refresh_snapshot(full=True)
+
+
+def _write_batch(recorder, model, fields, created, changed):
+    """Insert and update one batch; if it fails, retry row by row so only the bad rows are rejected."""
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create([obj for _, obj in created])
+            model.objects.bulk_update([obj for _, obj in changed], fields)
+    except DatabaseError:
+        pass
+    else:
+        recorder.run.created += len(created)
+        recorder.run.updated += len(changed)
+        return
+    for counter, entries in (('created', created), ('updated', changed)):
+        for row_number, obj in entries:
+            try:
+                with transaction.atomic():
+                    if counter == 'created':
+                        model.objects.bulk_create([obj])
+                    else:
+                        model.objects.bulk_update([obj], fields)
+            except DatabaseError as e:
+                recorder.reject('write_error', row_number, e)
+            else:
+                setattr(recorder.run, counter, getattr(recorder.run, counter) + 1)
+
+
+def _upsert(recorder, stage, rows, model, key_field, prepare=None, prepared_fields=()):
+    """
+    Insert or update (row_number, key, defaults) rows by key_field with bulk
+    queries, WRITE_BATCH_SIZE rows at a time. Model signals do not fire: the
+    debt totals and snapshot are rebuilt by _refresh_derived(), and the touched
+    customers are pinned to the primary once at the end.
+    """
+    # Later rows for the same key win, as they did with one update_or_create per row.
+    latest = {key: (row_number, defaults) for row_number, key, defaults in rows}
+    recorder.run.updated += len(rows) - len(latest)
+    items = list(latest.items())
+    fields = list(items[0][1][1]) + ['updated_at', *prepared_fields] if items else []
+    now = timezone.now()
+    customer_ids = set()
+    for start in range(0, len(items), WRITE_BATCH_SIZE):
+        batch = items[start:start + WRITE_BATCH_SIZE]
+        existing = dict(
+            model.objects.filter(**{f'{key_field}__in': [key for key, _ in batch]}).values_list(key_field, 'pk')
+        )
+        created, changed = [], []
+        for key, (row_number, defaults) in batch:
+            obj = model(**{key_field: key}, **defaults, updated_at=now)
+            if prepare is not None:
+                prepare(obj)
+            customer_ids.add(obj.customer_id if model is Loan else obj.pk)
+            if key in existing:
+                obj.pk = existing[key]
+                changed.append((row_number, obj))
+            else:
+                created.append((row_number, obj))
+        _write_batch(recorder, model, fields, created, changed)
+        stage.progress(start + len(batch))
+    pin_customers(customer_ids)
+
+
+def _read(recorder, file_path):
+    """Read stage; returns the rows, or None after recording the run as failed."""
+    try:
+        with recorder.stage('read') as stage:
+            rows = _read_rows(file_path)
+            stage.rows = recorder.run.rows_read = len(rows)
+    except Exception as e:
+        logger.exception('Failed to read %s Excel: %s', recorder.run.kind, file_path)
+        recorder.finish(error=str(e))
+        return None
+    return rows
+
+
+def ingest_customers(file_path: str, task_id: str = '', progress=None) -> dict:
+    """Upsert customer_data.xlsx into Customer."""
+    with IngestionRecorder(IngestionRun.CUSTOMERS, file_path, task_id, progress) as recorder:
+        rows = _read(recorder, file_path)
+        if rows is None:
+            return recorder.result()
+
+        parsed = []
+        with recorder.stage('parse', len(rows)) as stage:
+            for i, row in enumerate(rows, 1):
+                row_number = i + 1  # spreadsheet row, after the heading
+                stage.progress(i)
+                first_name = str(row.get('first_name', '')).strip()
+                last_name = str(row.get('last_name', '')).strip()
+                if not first_name and not last_name:
+                    recorder.reject('missing_name', row_number)
+                    continue
+                try:
+                    parsed.append((row_number, int(row.get('customer_id', 0)), {
+                        'first_name': first_name or 'Unknown',
+                        'last_name': last_name or 'Unknown',
+                        'phone_number': _phone(row.get('phone_number')),
+                        'monthly_salary': int(row.get('monthly_salary', 0)),
+                        'approved_limit': int(row.get('approved_limit', 0)),
+                        'current_debt': int(row.get('current_debt', 0)),
+                    }))
+                except (TypeError, ValueError) as e:
+                    recorder.reject('invalid_value', row_number, e)
+
+        with recorder.stage('write', len(parsed)) as stage:
+            _upsert(recorder, stage, parsed, Customer, 'pk', _normalize_phone, ['phone_normalized'])
+        if connection.vendor == 'postgresql':
+            with recorder.stage('sequence_reset'):
+                _reset_customer_sequence()
+        _refresh_derived(recorder)
+        return recorder.finish()
+
+
+def ingest_loans(file_path: str, task_id: str = '', progress=None) -> dict:
+    """Upsert loan_data.xlsx into Loan, skipping archived loan_ids and unknown customers."""
+    with IngestionRecorder(IngestionRun.LOANS, file_path, task_id, progress) as recorder:
+        rows = _read(recorder, file_path)
+        if rows is None:
+            return recorder.result()
+
+        parsed = []
+        with recorder.stage('parse', len(rows)) as stage:
+            for i, row in enumerate(rows, 1):
+                row_number = i + 1
+                stage.progress(i)
+                start_date = _parse_date(row.get('start_date'))
+                if start_date is None:
+                    recorder.reject('missing_start_date', row_number)
+                    continue
+                try:
+                    tenure = int(row.get('tenure', 0))
+                    emis_paid_on_time = int(row.get('emis_paid_on_time', 0))
+                    parsed.append((row_number, int(row.get('loan_id', 0)), {
+                        'customer_id': int(row.get('customer_id', 0)),
+                        'loan_amount': _decimal(row.get('loan_amount', 0)),
+                        'tenure': tenure,
+                        'interest_rate': _decimal(row.get('interest_rate', 0)),
+                        'monthly_repayment': _decimal(row.get('monthly_repayment', row.get('emi', 0))),
+                        'emis_paid_on_time': emis_paid_on_time,
+                        'emis_paid': min(tenure, int(row.get('emis_paid', emis_paid_on_time))),
+                        'start_date': start_date,
+                        'end_date': _parse_date(row.get('end_date')),
+                    }))
+                except (TypeError, ValueError) as e:
+                    recorder.reject('invalid_value', row_number, e)
+
+        with recorder.stage('write') as stage:
+            archived_ids = set(ArchivedLoan.objects.exclude(loan_id=None).values_list('loan_id', flat=True))
+            customer_ids = set(
+                Customer.objects.filter(pk__in={defaults['customer_id'] for _, _, defaults in parsed})
+                .values_list('pk', flat=True)
+            )
+            writable = []
+            for row_number, loan_id, defaults in parsed:
+                if loan_id in archived_ids:
+                    # Already repaid and archived; its contributions live in CustomerLoanRollup.
+                    recorder.reject('archived', row_number)
+                elif defaults['customer_id'] not in customer_ids:
+                    recorder.reject('unknown_customer', row_number, f"customer {defaults['customer_id']}")
+                else:
+                    writable.append((row_number, loan_id, defaults))
+            stage.rows = len(writable)
+            _upsert(recorder, stage, writable, Loan, 'loan_id')
+        _refresh_derived(recorder)
+        return recorder.finish()
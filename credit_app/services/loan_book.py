@@ -0,0 +1,132 @@
+"""
+Columnar in-memory snapshot of the loan book for whole-book computations.
+
+load_loan_book() streams Customer, Loan, ArchivedLoan and CustomerLoanRollup
+through one values_list() query each into NumPy arrays. Per-customer score
+inputs are np.bincount sums over the loan rows: the same aggregates
+credit_score_inputs() runs in SQL for one customer, for every customer at once.
+Every loan (hot or archived) is also kept as an application (amount, rate,
+tenure) so policies can be replayed against the book.
+"""
+from datetime import date
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.db.models import IntegerField, Value
+from django.db.models.functions import Coalesce, ExtractYear
+
+from credit_app.models import ArchivedLoan, Customer, CustomerLoanRollup, Loan
+from credit_app.services.eligibility import ScoreInputs
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CHUNK_SIZE = 10000
+
+
+class Applications(NamedTuple):
+    """One row per historical loan; customer is an index into LoanBook.customer_ids."""
+    customer: 'np.ndarray'
+    loan_amount: 'np.ndarray'
+    interest_rate: 'np.ndarray'
+    tenure: 'np.ndarray'
+    # The loan's own EMI while it is active, 0 once repaid; excluded from the
+    # customer's other EMIs when the loan is replayed as a new application.
+    active_emi: 'np.ndarray'
+
+
+class LoanBook(NamedTuple):
+    customer_ids: 'np.ndarray'
+    monthly_salary: 'np.ndarray'
+    approved_limit: 'np.ndarray'
+    active_emi_total: 'np.ndarray'
+    score_inputs: ScoreInputs
+    applications: Applications
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+
+def _columns(queryset, fields, dtypes):
+    import numpy as np
+
+    rows = list(queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE))
+    if not rows:
+        return [np.zeros(0, dtype=dtype) for dtype in dtypes]
+    return [np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes)]
+
+
+def _loan_columns(queryset, customer_ids, current_year):
+    import numpy as np
+
+    customer_id, amount, rate, tenure, emis_paid, on_time, emi, year = _columns(
+        queryset.annotate(year=Coalesce(ExtractYear('start_date'), Value(0), output_field=IntegerField())),
+        ('customer_id', 'loan_amount', 'interest_rate', 'tenure', 'emis_paid', 'emis_paid_on_time',
+         'monthly_repayment', 'year'),
+        (np.int64, float, float, np.int64, np.int64, np.int64, float, np.int64),
+    )
+    index = np.searchsorted(customer_ids, customer_id)
+    active = emis_paid < tenure
+    return {
+        'index': index,
+        'amount': amount,
+        'rate': rate,
+        'tenure': tenure,
+        'on_time': on_time,
+        'active': active,
+        'active_emi': np.where(active, emi, 0.0),
+        'current_year': year == current_year,
+    }
+
+
+def load_loan_book(only_customers=None) -> LoanBook:
+    """
+    Snapshot the whole book, or only_customers, into NumPy arrays (four
+    streamed queries). Customers are ordered by id.
+    """
+    import numpy as np
+
+    customers = Customer.objects.order_by('pk')
+    loans, archived_loans = Loan.objects.all(), ArchivedLoan.objects.all()
+    rollups = CustomerLoanRollup.objects.all()
+    if only_customers is not None:
+        only_customers = list(only_customers)
+        customers = customers.filter(pk__in=only_customers)
+        loans = loans.filter(customer_id__in=only_customers)
+        archived_loans = archived_loans.filter(customer_id__in=only_customers)
+        rollups = rollups.filter(customer_id__in=only_customers)
+
+    customer_ids, salary, limit, active_emi_total = _columns(
+        customers,
+        ('pk', 'monthly_salary', 'approved_limit', 'active_emi_total'),
+        (np.int64, float, float, float),
+    )
+    n = len(customer_ids)
+    current_year = date.today().year
+    hot = _loan_columns(loans, customer_ids, current_year)
+    archived = _loan_columns(archived_loans, customer_ids, current_year)
+
+    def per_customer(values):
+        return np.bincount(hot['index'], weights=values, minlength=n)
+
+    rollup_ids, rollup_count, rollup_due, rollup_on_time, rollup_volume = _columns(
+        rollups,
+        ('customer_id', 'loan_count', 'emis_due', 'emis_on_time', 'total_volume'),
+        (np.int64, float, float, float, float),
+    )
+    rollup_index = np.searchsorted(customer_ids, rollup_ids)
+
+    def rollup(values):
+        return np.bincount(rollup_index, weights=values, minlength=n)
+
+    inputs = ScoreInputs(
+        loan_count=np.bincount(hot['index'], minlength=n) + rollup(rollup_count),
+        emis_due=per_customer(np.maximum(hot['tenure'], 0)) + rollup(rollup_due),
+        emis_on_time=per_customer(hot['on_time']) + rollup(rollup_on_time),
+        current_year_count=per_customer(hot['current_year']),
+        total_volume=per_customer(hot['amount']) + rollup(rollup_volume),
+        current_principal=per_customer(np.where(hot['active'], hot['amount'], 0.0)),
+    )
+    applications = Applications(*(
+        np.concatenate([hot[key], archived[key]]) for key in ('index', 'amount', 'rate', 'tenure', 'active_emi')
+    ))
+    return LoanBook(customer_ids, salary, limit, active_emi_total, inputs, applications)
@@ -0,0 +1,153 @@
+"""
+Asynchronous (write-behind) loan origination.
+
+With LOAN_ORIGINATION_ASYNC on, /create-loan only validates the request and
+stores a pending LoanApplication; the process_loan_applications Celery task
+decides them in batches of LOAN_APPLICATION_BATCH_SIZE. Each batch:
+- takes pending applications with SKIP LOCKED, so workers share the queue;
+- locks the batch's customers (in id order) so no other worker decides for
+  the same customer concurrently, and loads their score inputs in one pass
+  (load_loan_book);
+- decides each customer's applications in arrival order, adding every approved
+  loan to the EMI total and score inputs seen by the next one, exactly as
+  consecutive synchronous /create-loan calls would;
+- bulk-inserts the approved loans. bulk_create skips the post_save signals,
+  so the customer debt totals and the snapshot change log are updated here.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from credit_app.models import Customer, Loan, LoanApplication
+from credit_app.services.debt import apply_customer_deltas, loan_contribution
+from credit_app.services.eligibility import ScoreInputs
+from credit_app.services.loan_book import load_loan_book
+from credit_app.services.policy import active_policy
+from credit_app.services.snapshot import record_customer_changes
+
+CENTS = Decimal('0.01')
+
+
+class BatchResult(NamedTuple):
+    applications: int
+    approved: int
+    customer_ids: frozenset
+
+
+def submit_application(customer_id: int, loan_amount, interest_rate, tenure: int) -> LoanApplication:
+    return LoanApplication.objects.create(
+        customer_id=customer_id, loan_amount=loan_amount, interest_rate=interest_rate, tenure=tenure,
+    )
+
+
+def _with_new_loan(inputs: ScoreInputs, loan_amount: float, tenure: int) -> ScoreInputs:
+    """Score inputs after adding a new active, current-year loan."""
+    return inputs._replace(
+        loan_count=inputs.loan_count + 1,
+        emis_due=inputs.emis_due + max(0, tenure),
+        current_year_count=inputs.current_year_count + 1,
+        total_volume=inputs.total_volume + loan_amount,
+        current_principal=inputs.current_principal + loan_amount,
+    )
+
+
+def _reject(application, message, monthly_installment=0.0):
+    application.status = LoanApplication.REJECTED
+    application.message = message
+    application.monthly_installment = Decimal(str(monthly_installment)).quantize(CENTS)
+
+
+def process_application_batch(batch_size: int = None) -> BatchResult:
+    """Decide up to batch_size pending applications. Returns counts and the customers given new loans."""
+    batch_size = batch_size or settings.LOAN_APPLICATION_BATCH_SIZE
+    with transaction.atomic():
+        applications = list(
+            LoanApplication.objects.select_for_update(skip_locked=True)
+            .filter(status=LoanApplication.PENDING)
+            .order_by('id')[:batch_size]
+        )
+        if not applications:
+            return BatchResult(0, 0, frozenset())
+
+        by_customer = defaultdict(list)
+        for application in applications:
+            by_customer[application.customer_id].append(application)
+        locked = set(
+            Customer.objects.select_for_update().filter(pk__in=by_customer).order_by('pk').values_list('pk', flat=True)
+        )
+        book = load_loan_book(only_customers=locked)
+        policy = active_policy()
+        start_date = date.today()
+
+        approved = []
+        for customer_id, pending in by_customer.items():
+            if customer_id not in locked:
+                for application in pending:
+                    _reject(application, 'Customer not found')
+                continue
+            i = int(book.customer_ids.searchsorted(customer_id))
+            salary, limit = float(book.monthly_salary[i]), float(book.approved_limit[i])
+            emi_total = float(book.active_emi_total[i])
+            inputs = ScoreInputs(*(float(column[i]) for column in book.score_inputs))
+            for application in pending:
+                loan_amount = float(application.loan_amount)
+                decision = policy.evaluate(
+                    policy.score(inputs, limit), loan_amount, float(application.interest_rate),
+                    application.tenure, emi_total, salary,
+                )
+                if not decision.approval:
+                    _reject(application, policy.message(decision.reason, decision.band), decision.monthly_installment)
+                    continue
+                emi_total += decision.monthly_installment
+                inputs = _with_new_loan(inputs, loan_amount, application.tenure)
+                application.status = LoanApplication.APPROVED
+                application.message = 'Loan approved'
+                application.corrected_interest_rate = Decimal(str(decision.corrected_interest_rate))
+                application.monthly_installment = Decimal(str(decision.monthly_installment)).quantize(CENTS)
+                approved.append(application)
+
+        loans = Loan.objects.bulk_create([
+            Loan(
+                customer_id=application.customer_id,
+                loan_amount=application.loan_amount,
+                tenure=application.tenure,
+                interest_rate=application.corrected_interest_rate,
+                monthly_repayment=application.monthly_installment,
+                emis_paid_on_time=0,
+                emis_paid=0,
+                start_date=start_date,
+                end_date=start_date + relativedelta(months=application.tenure),
+            )
+            for application in approved
+        ], batch_size=1000)
+        # Same numbering as the synchronous path: loan_id = pk.
+        Loan.objects.filter(pk__in=[loan.pk for loan in loans]).update(loan_id=F('pk'))
+
+        deltas = defaultdict(lambda: (0, Decimal('0')))
+        for loan, application in zip(loans, approved):
+            application.loan_id = loan.pk
+            debt, emi = loan_contribution(
+                loan.loan_amount, loan.interest_rate, loan.tenure, loan.emis_paid, loan.monthly_repayment,
+            )
+            current = deltas[loan.customer_id]
+            deltas[loan.customer_id] = (current[0] + debt, current[1] + emi)
+        apply_customer_deltas(deltas)
+        customer_ids = frozenset(deltas)
+        record_customer_changes(customer_ids)
+
+        now = timezone.now()
+        for application in applications:
+            application.decided_at = now
+        LoanApplication.objects.bulk_update(
+            applications,
+            ['status', 'loan_id', 'corrected_interest_rate', 'monthly_installment', 'message', 'decided_at'],
+            batch_size=1000,
+        )
+    return BatchResult(len(applications), len(approved), customer_ids)
@@ -0,0 +1,199 @@
+"""
+PostgreSQL declarative partitioning of credit_app_loan by start_date year.
+
+partition_loan_table() converts the regular table in one transaction:
+credit_app_loan becomes PARTITION BY RANGE (start_date) with one partition per
+year (credit_app_loan_y2024, ...) plus a DEFAULT partition for start dates
+outside those years. start_date is NOT NULL (migration 0013), so every loan
+has a partition key. Year-scoped filters such as start_date__year=2024 (Django compiles them
+to a BETWEEN on start_date) then only touch that year's partition.
+
+PostgreSQL requires unique constraints on a partitioned table to include the
+partition key, so:
+- the primary key becomes UNIQUE (id, start_date); ids still come from a sequence;
+- global uniqueness of id and loan_id moves to credit_app_loan_key, kept in
+  sync by a row trigger, so a duplicate id or loan_id still raises
+  IntegrityError and the Loan model (id primary key, unique loan_id) stays
+  accurate without a state change. ensure_loan_partitions() creates upcoming years
+ahead of time (Celery beat), so new loans rarely land in the DEFAULT partition;
+loans that already did (start dates beyond the years created) are moved into
+the new year's partition when it is created.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from credit_app.services.analytics import EXPOSURE_VIEWS
+
+LOAN_TABLE = 'credit_app_loan'
+LEGACY_TABLE = 'credit_app_loan_unpartitioned'
+KEY_TABLE = 'credit_app_loan_key'
+DEFAULT_PARTITION = f'{LOAN_TABLE}_default'
+
+KEY_SYNC_SQL = f"""
+CREATE OR REPLACE FUNCTION {KEY_TABLE}_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM {KEY_TABLE} WHERE id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {KEY_TABLE} (id, loan_id) VALUES (NEW.id, NEW.loan_id);
+    END IF;
+    RETURN NULL;
+END $$;
+CREATE TRIGGER {KEY_TABLE}_sync
+    AFTER INSERT OR DELETE OR UPDATE OF id, loan_id ON {LOAN_TABLE}
+    FOR EACH ROW EXECUTE FUNCTION {KEY_TABLE}_sync();
+"""
+
+
+def partition_name(year: int) -> str:
+    return f'{LOAN_TABLE}_y{year}'
+
+
+def year_partition_sql(year: int) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF {LOAN_TABLE} '
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    )
+
+
+def _year_range(year: int) -> str:
+    return f"start_date >= '{year}-01-01' AND start_date < '{year + 1}-01-01'"
+
+
+def _create_year_partition(cursor, year: int) -> None:
+    """
+    Add the partition for year. PostgreSQL refuses to create it while the
+    DEFAULT partition holds rows in its range, so those rows are moved: detach
+    DEFAULT, create the partition, move the rows, reattach.
+    """
+    cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {_year_range(year)})')
+    if not cursor.fetchone()[0]:
+        cursor.execute(year_partition_sql(year))
+        return
+    # ALTER TABLE refuses tables with pending deferred FK checks from earlier writes in this transaction.
+    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    cursor.execute(f'ALTER TABLE {LOAN_TABLE} DETACH PARTITION {DEFAULT_PARTITION}')
+    cursor.execute(year_partition_sql(year))
+    # Re-inserting through the parent fires the key trigger again for these loans.
+    cursor.execute(
+        f'DELETE FROM {KEY_TABLE} WHERE id IN (SELECT id FROM {DEFAULT_PARTITION} WHERE {_year_range(year)})'
+    )
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {_year_range(year)} RETURNING *) '
+        f'INSERT INTO {LOAN_TABLE} SELECT * FROM moved'
+    )
+    cursor.execute(f'ALTER TABLE {LOAN_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT')
+
+
+def is_loan_table_partitioned() -> bool:
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s AND relkind IN ('r', 'p')", [LOAN_TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def ensure_loan_partitions(years_ahead: int = None) -> list:
+    """Create yearly partitions from the current year through years_ahead. Returns the years created."""
+    if not is_loan_table_partitioned():
+        return []
+    years_ahead = settings.LOAN_PARTITION_YEARS_AHEAD if years_ahead is None else years_ahead
+    current = date.today().year
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [LOAN_TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        created = []
+        for year in range(current, current + years_ahead + 1):
+            if partition_name(year) not in existing:
+                _create_year_partition(cursor, year)
+                created.append(year)
+    return created
+
+
+def _capture_views(cursor):
+    """Definitions of exposure materialized views and their indexes, which must be rebuilt around the swap."""
+    cursor.execute(
+        'SELECT matviewname, definition FROM pg_matviews WHERE matviewname = ANY(%s)',
+        [list(EXPOSURE_VIEWS)],
+    )
+    views = cursor.fetchall()
+    cursor.execute('SELECT indexdef FROM pg_indexes WHERE tablename = ANY(%s)', [list(EXPOSURE_VIEWS)])
+    return views, [row[0] for row in cursor.fetchall()]
+
+
+def partition_loan_table(years_ahead: int = None) -> list:
+    """Convert credit_app_loan into a partitioned table. Returns the year partitions created."""
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('Loan table partitioning requires PostgreSQL')
+    if is_loan_table_partitioned():
+        return ensure_loan_partitions(years_ahead)
+    years_ahead = settings.LOAN_PARTITION_YEARS_AHEAD if years_ahead is None else years_ahead
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {LOAN_TABLE} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            'SELECT is_nullable FROM information_schema.columns WHERE table_name = %s AND column_name = %s',
+            [LOAN_TABLE, 'start_date'],
+        )
+        if cursor.fetchone()[0] == 'YES':
+            raise RuntimeError('credit_app_loan.start_date must be NOT NULL before partitioning; run migrate first')
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        views, view_indexes = _capture_views(cursor)
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE%%'",
+            [LOAN_TABLE],
+        )
+        loan_indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            f'SELECT EXTRACT(YEAR FROM MIN(start_date))::int, COALESCE(MAX(id), 0) FROM {LOAN_TABLE}'
+        )
+        first_year, max_id = cursor.fetchone()
+
+        for name, _ in views:
+            cursor.execute(f'DROP MATERIALIZED VIEW {name}')
+        cursor.execute(f'ALTER TABLE {LOAN_TABLE} RENAME TO {LEGACY_TABLE}')
+        cursor.execute(
+            f'CREATE TABLE {LOAN_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (start_date)'
+        )
+        cursor.execute(f'CREATE SEQUENCE {LOAN_TABLE}_pid_seq OWNED BY {LOAN_TABLE}.id')
+        cursor.execute(f"ALTER TABLE {LOAN_TABLE} ALTER COLUMN id SET DEFAULT nextval('{LOAN_TABLE}_pid_seq')")
+        cursor.execute('SELECT setval(%s, %s)', [f'{LOAN_TABLE}_pid_seq', max(max_id, 1)])
+
+        current = date.today().year
+        years = list(range(min(first_year or current, current), current + years_ahead + 1))
+        for year in years:
+            cursor.execute(year_partition_sql(year))
+        cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {LOAN_TABLE} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {LOAN_TABLE} SELECT * FROM {LEGACY_TABLE}')
+        cursor.execute(f'DROP TABLE {LEGACY_TABLE}')
+        cursor.execute(f'ALTER SEQUENCE {LOAN_TABLE}_pid_seq RENAME TO {LOAN_TABLE}_id_seq')
+
+        cursor.execute(
+            f'ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {LOAN_TABLE}_id_start_date_uniq UNIQUE (id, start_date)'
+        )
+        cursor.execute(
+            f'ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {LOAN_TABLE}_customer_id_fk '
+            'FOREIGN KEY (customer_id) REFERENCES credit_app_customer (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        for indexdef in loan_indexes:
+            cursor.execute(indexdef)
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {LOAN_TABLE}_loan_id_idx ON {LOAN_TABLE} (loan_id)')
+
+        cursor.execute(f'CREATE TABLE {KEY_TABLE} (id bigint PRIMARY KEY, loan_id integer UNIQUE)')
+        cursor.execute(f'INSERT INTO {KEY_TABLE} SELECT id, loan_id FROM {LOAN_TABLE}')
+        cursor.execute(KEY_SYNC_SQL)
+
+        for name, definition in views:
+            cursor.execute(f'CREATE MATERIALIZED VIEW {name} AS {definition}')
+        for indexdef in view_indexes:
+            cursor.execute(indexdef)
+    return years
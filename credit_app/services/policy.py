@@ -0,0 +1,220 @@
+"""
+Credit policy as data.
+
+A policy is a plain dict: the affordability ratio, the score cut-off, the
+interest-rate slabs and the credit score weights. The active policy is the
+latest CreditPolicy row (versioned, written by publish_policy() or
+`manage.py credit_policy --load`); with no rows, settings.CREDIT_POLICY.
+
+compile_policy() validates a policy and turns the slabs into a sorted tuple of
+score bounds, so the slab for a score is one bisect, or one np.searchsorted for
+an array of applicants. CompiledPolicy.evaluate() serves check_eligibility;
+evaluate_batch() / score_batch() take NumPy arrays (backtests, bulk re-scoring).
+"""
+from bisect import bisect_left
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from credit_app.models import CreditPolicy
+from credit_app.services.emi import calculate_emi, calculate_emi_batch
+
+if TYPE_CHECKING:
+    import numpy as np
+
+VERSION_CACHE_KEY = 'credit-policy:version'
+
+# Decision reasons, in the order check_eligibility applies the rules.
+APPROVED = 0
+OVER_AFFORDABILITY = 1
+SCORE_TOO_LOW = 2
+RATE_TOO_LOW = 3
+
+
+class Decision(NamedTuple):
+    approval: bool
+    corrected_interest_rate: float
+    monthly_installment: float
+    reason: int
+    band: int
+
+
+class BatchDecision(NamedTuple):
+    """evaluate_batch() result; every field is an array aligned with the inputs."""
+    approval: 'np.ndarray'
+    corrected_interest_rate: 'np.ndarray'
+    monthly_installment: 'np.ndarray'
+    reason: 'np.ndarray'
+    band: 'np.ndarray'
+
+
+class CompiledPolicy:
+    """
+    A validated policy ready for evaluation. Score band i covers
+    (bounds[i-1], bounds[i]]; band 0 is rejected, the last band has no minimum rate.
+    """
+
+    def __init__(self, rules: dict, version: int = 0):
+        self.rules = rules
+        self.version = version
+        self.affordability_ratio = float(rules['affordability_ratio'])
+        self.min_score = float(rules['min_score'])
+        slabs = rules['slabs']
+        self.bounds = (self.min_score,) + tuple(float(s['max_score']) for s in slabs)
+        # Minimum rate per band; None for the rejected band, -inf for "any rate".
+        self.min_rates = (None,) + tuple(float(s['min_rate']) for s in slabs) + (float('-inf'),)
+        score = rules['score']
+        weights = score['weights']
+        self.w_on_time = float(weights['on_time'])
+        self.w_loan_count = float(weights['loan_count'])
+        self.w_current_year = float(weights['current_year'])
+        self.w_volume = float(weights['volume'])
+        self.points_per_loan = float(score['points_per_loan'])
+        self.points_per_current_year_loan = float(score['points_per_current_year_loan'])
+        self.volume_per_point = float(score['volume_per_point'])
+
+    def score(self, inputs, approved_limit) -> float:
+        """Credit score 0-100 from ScoreInputs; 0 when current principal exceeds the approved limit."""
+        if inputs.current_principal > approved_limit:
+            return 0.0
+        on_time_ratio = (inputs.emis_on_time / inputs.emis_due) if inputs.emis_due else 1.0
+        on_time_score = min(100, on_time_ratio * 100)
+        loans_score = min(100, inputs.loan_count * self.points_per_loan)
+        activity_score = min(100, inputs.current_year_count * self.points_per_current_year_loan)
+        volume_score = min(100, inputs.total_volume / self.volume_per_point)
+        score = (
+            self.w_on_time * on_time_score
+            + self.w_loan_count * loans_score
+            + self.w_current_year * activity_score
+            + self.w_volume * volume_score
+        )
+        return min(100.0, max(0.0, score))
+
+    def score_batch(self, loan_count, emis_due, emis_on_time, current_year_count,
+                    total_volume, current_principal, approved_limit):
+        """score() over arrays of ScoreInputs fields."""
+        import numpy as np
+
+        due = np.asarray(emis_due, dtype=float)
+        on_time = np.asarray(emis_on_time, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            on_time_score = np.where(due > 0, on_time / due * 100, 100.0)
+        score = (
+            self.w_on_time * np.minimum(100, on_time_score)
+            + self.w_loan_count * np.minimum(100, np.asarray(loan_count, dtype=float) * self.points_per_loan)
+            + self.w_current_year * np.minimum(
+                100, np.asarray(current_year_count, dtype=float) * self.points_per_current_year_loan
+            )
+            + self.w_volume * np.minimum(100, np.asarray(total_volume, dtype=float) / self.volume_per_point)
+        )
+        score = np.clip(score, 0.0, 100.0)
+        over_limit = np.asarray(current_principal, dtype=float) > np.asarray(approved_limit, dtype=float)
+        return np.where(over_limit, 0.0, score)
+
+    def evaluate(self, credit_score: float, loan_amount, interest_rate, tenure: int,
+                 active_emi_total, monthly_salary) -> Decision:
+        """Apply affordability, score cut-off and rate slab to one applicant."""
+        rate = float(interest_rate)
+        new_emi = calculate_emi(loan_amount, rate, tenure)
+        band = bisect_left(self.bounds, credit_score)
+        if float(active_emi_total) + new_emi > self.affordability_ratio * monthly_salary:
+            return Decision(False, rate, round(new_emi, 2), OVER_AFFORDABILITY, band)
+        if band == 0:
+            return Decision(False, rate, round(new_emi, 2), SCORE_TOO_LOW, band)
+        min_rate = self.min_rates[band]
+        if rate <= min_rate:
+            return Decision(False, rate, round(new_emi, 2), RATE_TOO_LOW, band)
+        corrected = max(rate, min_rate)
+        monthly = calculate_emi(loan_amount, corrected, tenure)
+        return Decision(True, corrected, round(monthly, 2), APPROVED, band)
+
+    def evaluate_batch(self, credit_scores, loan_amounts, interest_rates, tenures,
+                       active_emi_totals, monthly_salaries) -> BatchDecision:
+        """evaluate() for arrays of applicants in one vectorized pass."""
+        import numpy as np
+
+        scores = np.asarray(credit_scores, dtype=float)
+        rates = np.asarray(interest_rates, dtype=float)
+        new_emi = calculate_emi_batch(loan_amounts, rates, tenures)
+        bands = np.searchsorted(np.asarray(self.bounds), scores, side='left')
+        min_rates = np.array([np.nan if r is None else r for r in self.min_rates])[bands]
+
+        reason = np.full(scores.shape, APPROVED, dtype=np.int8)
+        reason[rates <= min_rates] = RATE_TOO_LOW
+        reason[bands == 0] = SCORE_TOO_LOW
+        over = (np.asarray(active_emi_totals, dtype=float) + new_emi
+                > self.affordability_ratio * np.asarray(monthly_salaries, dtype=float))
+        reason[over] = OVER_AFFORDABILITY
+
+        approval = reason == APPROVED
+        corrected = np.where(approval, np.fmax(rates, min_rates), rates)
+        monthly = np.where(approval, calculate_emi_batch(loan_amounts, corrected, tenures), new_emi)
+        return BatchDecision(approval, corrected, monthly, reason, bands)
+
+    def message(self, reason: int, band: int) -> str:
+        if reason == OVER_AFFORDABILITY:
+            return f'Sum of current EMIs and new EMI exceeds {self.affordability_ratio * 100:g}% of monthly salary'
+        if reason == SCORE_TOO_LOW:
+            return f'Credit score too low (<={self.min_score:g})'
+        if reason == RATE_TOO_LOW:
+            return f'Interest rate must be > {self.min_rates[band]:g}% for this credit score'
+        return ''
+
+    def score_bands(self) -> tuple:
+        """(label, upper bound) per band, e.g. ('10-30', 30); the last band's bound is None."""
+        lows = (0.0,) + self.bounds
+        bands = tuple((f'{lo:g}-{hi:g}', hi) for lo, hi in zip(lows, self.bounds))
+        return bands + ((f'{self.bounds[-1]:g}-100', None),)
+
+    def rate_cutoffs(self) -> tuple:
+        """Distinct slab minimum rates, ascending."""
+        return tuple(sorted({r for r in self.min_rates[1:-1]}))
+
+
+def compile_policy(rules: dict, version: int = 0) -> CompiledPolicy:
+    """Validate a policy dict; raises ValueError with the first problem found."""
+    try:
+        policy = CompiledPolicy(rules, version)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f'Invalid credit policy: {exc!r}') from exc
+    if not 0 < policy.affordability_ratio <= 1:
+        raise ValueError('affordability_ratio must be in (0, 1]')
+    if list(policy.bounds) != sorted(set(policy.bounds)):
+        raise ValueError('slab max_score values must be increasing and above min_score')
+    weights = (policy.w_on_time, policy.w_loan_count, policy.w_current_year, policy.w_volume)
+    if min(weights) < 0:
+        raise ValueError('score weights must be non-negative')
+    if min(policy.points_per_loan, policy.points_per_current_year_loan, policy.volume_per_point) <= 0:
+        raise ValueError('score scale factors must be positive')
+    return policy
+
+
+_compiled = {}
+
+
+def active_policy() -> CompiledPolicy:
+    """
+    Latest published policy. The current version number is shared through the
+    cache, so a publish is picked up by every process within CREDIT_POLICY_CACHE_SECONDS;
+    compiled policies are kept per process by version.
+    """
+    version = cache.get(VERSION_CACHE_KEY)
+    if version in _compiled:
+        return _compiled[version]
+    row = CreditPolicy.objects.order_by('-version').values_list('version', 'rules').first()
+    version, rules = row or (0, settings.CREDIT_POLICY)
+    if version not in _compiled:
+        _compiled[version] = compile_policy(rules, version)
+    cache.set(VERSION_CACHE_KEY, version, settings.CREDIT_POLICY_CACHE_SECONDS)
+    return _compiled[version]
+
+
+def publish_policy(rules: dict, note: str = '') -> CreditPolicy:
+    """Validate and store rules as the next policy version, making it active."""
+    compile_policy(rules)
+    latest = CreditPolicy.objects.order_by('-version').values_list('version', flat=True).first() or 0
+    policy = CreditPolicy.objects.create(version=latest + 1, rules=rules, note=note)
+    _compiled.pop(policy.version, None)
+    cache.delete(VERSION_CACHE_KEY)
+    return policy
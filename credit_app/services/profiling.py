@@ -0,0 +1,159 @@
+"""
+Per-request profiles for ProfilingMiddleware and `manage.py profiles`.
+
+Each profiled request leaves two files in PROFILE_DIR named by its profile id
+(UTC timestamp to the microsecond plus a random suffix): <id>.prof holds the
+cProfile stats (pstats format) and <id>.json holds the method, path, status,
+duration, trigger and the SQL log (alias, statement, milliseconds; parameters
+are not recorded). Only the newest PROFILE_KEEP profiles are kept.
+"""
+import cProfile
+import json
+import os
+import random
+import re
+import secrets
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+HEADER = 'X-Profile'
+SALT = 'credit_app.profiling'
+
+# The SQL seen by execute_wrapper uses %s placeholders; literals are inlined only by hand-written SQL.
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r'(?:%s|\?)'
+_IN_LISTS = re.compile(rf'\bIN\s*\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)', re.IGNORECASE)
+_LISTS = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)')
+
+
+def make_token() -> str:
+    """Value for the X-Profile header; valid for PROFILE_TOKEN_MAX_AGE seconds."""
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def trigger(request) -> Optional[str]:
+    """'header' or 'sample' if this request should be profiled, else None."""
+    token = request.headers.get(HEADER)
+    if token:
+        try:
+            signing.TimestampSigner(salt=SALT).unsign(token, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+            return 'header'
+        except signing.BadSignature:
+            pass
+    if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+class Profile:
+    def __init__(self, request, trigger: str):
+        self.profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{secrets.token_hex(4)}"
+        self.method = request.method
+        self.path = request.path
+        self.trigger = trigger
+        self.queries = []
+        self.response = None
+
+    def log_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+@contextmanager
+def capture(request, trigger: str):
+    """Profile the block and log its SQL on every database alias; writes the profile on exit."""
+    profile = Profile(request, trigger)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile.log_query))
+            profiler.enable()
+            try:
+                yield profile
+            finally:
+                profiler.disable()
+    finally:
+        _write(profile, profiler, (time.perf_counter() - started) * 1000)
+
+
+def _write(profile: Profile, profiler: cProfile.Profile, duration_ms: float) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILE_DIR, profile.profile_id)
+    profiler.dump_stats(base + '.prof')
+    meta = {
+        'id': profile.profile_id,
+        'method': profile.method,
+        'path': profile.path,
+        'status': getattr(profile.response, 'status_code', None),
+        'trigger': profile.trigger,
+        'duration_ms': round(duration_ms, 3),
+        'queries': profile.queries,
+    }
+    with open(base + '.json', 'w') as f:
+        json.dump(meta, f)
+    _prune()
+
+
+def _prune() -> None:
+    for meta in load_profiles()[settings.PROFILE_KEEP:]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, meta['id'] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def load_profiles(path_prefix: str = '') -> list:
+    """Profile metadata, newest first, optionally only for paths starting with path_prefix."""
+    try:
+        names = os.listdir(settings.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in sorted((n for n in names if n.endswith('.json')), reverse=True):
+        try:
+            with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if meta['path'].startswith(path_prefix):
+            profiles.append(meta)
+    return profiles
+
+
+def stats_path(meta: dict) -> str:
+    return os.path.join(settings.PROFILE_DIR, meta['id'] + '.prof')
+
+
+def normalize_sql(sql: str) -> str:
+    """Statement shape: literals become ?, IN lists and other placeholder lists collapse to (...)."""
+    sql = _LITERALS.sub('?', sql)
+    return _LISTS.sub('(...)', _IN_LISTS.sub('IN (...)', sql))
+
+
+def query_summary(profiles: list) -> list:
+    """(statement shape, count, total ms, max ms) across profiles, by total time descending."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for meta in profiles:
+        for query in meta['queries']:
+            entry = totals[normalize_sql(query['sql'])]
+            entry[0] += 1
+            entry[1] += query['ms']
+            entry[2] = max(entry[2], query['ms'])
+    return sorted(((sql, *entry) for sql, entry in totals.items()), key=lambda row: -row[2])
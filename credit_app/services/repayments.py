@@ -0,0 +1,90 @@
+"""
+Bulk EMI repayment recording.
+Events are stored once per event_id (duplicates ignored), then folded into
+Loan.emis_paid / emis_paid_on_time in batches: increments are grouped per loan
+and applied with a single CASE-based UPDATE per batch, capped at tenure. The
+customers' current_debt / active_emi_total move in the same transaction; the
+batch's loans are locked first so concurrent batches see each other's emis_paid.
+"""
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from credit_app.models import Loan, RepaymentEvent
+from credit_app.services.debt import apply_customer_deltas, repayment_deltas
+from credit_app.services.snapshot import record_customer_changes
+
+
+class BatchResult(NamedTuple):
+    events: int
+    loans: int
+    customer_ids: frozenset
+
+
+def record_repayment_events(events: Iterable[dict]) -> int:
+    """Insert validated events; already-known event_ids are skipped. Returns the number of new events."""
+    events = list(events)
+    known = set(
+        RepaymentEvent.objects.filter(
+            event_id__in=[e['event_id'] for e in events]
+        ).values_list('event_id', flat=True)
+    )
+    new = {}
+    for e in events:
+        if e['event_id'] not in known and e['event_id'] not in new:
+            new[e['event_id']] = RepaymentEvent(
+                event_id=e['event_id'],
+                loan_id=e['loan_id'],
+                paid_on=e['paid_on'],
+                on_time=e.get('on_time', True),
+            )
+    # ignore_conflicts covers a concurrent request inserting the same event_id.
+    RepaymentEvent.objects.bulk_create(new.values(), batch_size=1000, ignore_conflicts=True)
+    return len(new)
+
+
+def _increment(field: str, increments: dict):
+    whens = [
+        When(loan_id=loan_id, then=Least(F(field) + n, F('tenure')))
+        for loan_id, n in increments.items()
+    ]
+    return Case(*whens, default=F(field), output_field=IntegerField())
+
+
+def apply_repayment_batch(batch_size: int = None) -> BatchResult:
+    """Fold up to batch_size pending events into their loans. Safe to run from several workers."""
+    batch_size = batch_size or settings.REPAYMENT_BATCH_SIZE
+    with transaction.atomic():
+        events = list(
+            RepaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(applied_at__isnull=True)
+            .order_by('id')
+            .values_list('pk', 'loan_id', 'on_time')[:batch_size]
+        )
+        if not events:
+            return BatchResult(0, 0, frozenset())
+
+        paid = Counter(loan_id for _, loan_id, _ in events)
+        on_time = Counter(loan_id for _, loan_id, was_on_time in events if was_on_time)
+        loans = Loan.objects.filter(loan_id__in=paid.keys())
+        # Lock the loans (in pk order) before reading them: a worker holding other
+        # events for the same loan must compute its deltas from emis_paid after ours.
+        before = list(loans.select_for_update().order_by('pk').values_list(
+            'loan_id', 'customer_id', 'loan_amount', 'interest_rate', 'tenure', 'emis_paid', 'monthly_repayment',
+        ))
+        now = timezone.now()
+        loans.update(
+            emis_paid=_increment('emis_paid', paid),
+            emis_paid_on_time=_increment('emis_paid_on_time', on_time),
+            updated_at=now,
+        )
+        apply_customer_deltas(repayment_deltas(before, paid))
+        customer_ids = frozenset(row[1] for row in before)
+        record_customer_changes(customer_ids)
+        RepaymentEvent.objects.filter(pk__in=[pk for pk, _, _ in events]).update(applied_at=now)
+    return BatchResult(len(events), len(paid), customer_ids)
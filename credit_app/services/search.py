@@ -0,0 +1,83 @@
+"""
+Customer search by phone number or name, for agents who do not know a customer_id.
+
+Phone queries (digits plus separators) match Customer.phone_normalized, the
+last 10 digits of phone_number: an exact match for a full number, a prefix
+match otherwise. Both use its B-tree index (on PostgreSQL Django adds a
+varchar_pattern_ops index for the prefix LIKE).
+
+Name queries must match every word against first_name or last_name. On
+PostgreSQL with pg_trgm (migration 0010 adds GIN trigram indexes) a word
+matches on trigram word similarity, which covers prefixes and substrings, or on
+trigram similarity, which tolerates typos; results are ranked by similarity.
+Elsewhere, or when the extension is unavailable, words match as
+case-insensitive substrings.
+"""
+import re
+from functools import reduce
+from operator import add, and_
+from typing import Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Greatest
+
+from credit_app.models import Customer
+
+PHONE_QUERY = re.compile(r'^[\d\s()+.-]+$')
+PHONE_DIGITS = 10
+MIN_PHONE_DIGITS = 3
+
+_trigram_available: Optional[bool] = None
+
+
+def normalize_phone(value) -> str:
+    """Digits of a phone number without country code or trunk prefix (the last 10 digits)."""
+    return re.sub(r'\D', '', str(value or ''))[-PHONE_DIGITS:]
+
+
+def trigram_available() -> bool:
+    global _trigram_available
+    if connection.vendor != 'postgresql':
+        return False
+    if _trigram_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available = cursor.fetchone() is not None
+    return _trigram_available
+
+
+def is_phone_query(query: str) -> bool:
+    return bool(PHONE_QUERY.match(query)) and len(normalize_phone(query)) >= MIN_PHONE_DIGITS
+
+
+def search_customers(query: str) -> QuerySet:
+    """Customers matching a phone number (or its leading digits) or name words, best matches first."""
+    query = query.strip()
+    customers = Customer.objects.all()
+    if is_phone_query(query):
+        digits = normalize_phone(query)
+        if len(digits) == PHONE_DIGITS:
+            return customers.filter(phone_normalized=digits).order_by('pk')
+        return customers.filter(phone_normalized__startswith=digits).order_by('phone_normalized', 'pk')
+
+    words = query.split()
+    if not words:
+        return customers.none()
+    if not trigram_available():
+        return customers.filter(reduce(and_, (
+            Q(first_name__icontains=word) | Q(last_name__icontains=word) for word in words
+        ))).order_by('last_name', 'first_name', 'pk')
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    matches = reduce(and_, (
+        Q(first_name__trigram_word_similar=word) | Q(last_name__trigram_word_similar=word)
+        | Q(first_name__trigram_similar=word) | Q(last_name__trigram_similar=word)
+        for word in words
+    ))
+    rank = reduce(add, (
+        Greatest(TrigramWordSimilarity(word, 'first_name'), TrigramWordSimilarity(word, 'last_name'))
+        for word in words
+    ))
+    return customers.filter(matches).annotate(rank=rank).order_by('-rank', 'pk')
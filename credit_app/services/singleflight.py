@@ -0,0 +1,89 @@
+"""
+Request coalescing ("single flight").
+
+single_flight(key, fn) runs fn once for callers that ask for the same key at
+the same time:
+- within a process, callers arriving while a computation is running wait on it
+  and share its result (or exception);
+- across processes, the leader holds a short cache lock (cache.add, atomic on
+  Redis) whose value is a token naming this computation, and publishes its
+  result under that token for SINGLE_FLIGHT_RESULT_SECONDS. Callers in other
+  workers that find the lock taken poll for that token's result, and run fn
+  themselves only if the lock disappears or expires without one.
+
+Only computations in flight are shared: a caller that finds no lock computes,
+even if another worker finished the same key a moment ago, so this is not a
+result cache. Callers are sync worker processes (the default), gunicorn threads
+(gthread) or greenlets (gevent patches threading), hence threading primitives
+rather than asyncio.
+"""
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POLL_INTERVAL = 0.01
+
+_MISSING = object()
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+
+def single_flight(key: str, fn, share_across_processes: bool = True):
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+    if not leader:
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+    try:
+        call.result = _run_shared(key, fn) if share_across_processes else fn()
+        return call.result
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _calls_lock:
+            del _calls[key]
+        call.event.set()
+
+
+def _run_shared(key: str, fn):
+    lock_key = f'single-flight:lock:{key}'
+    token = secrets.token_hex(8)
+    if cache.add(lock_key, token, settings.SINGLE_FLIGHT_LOCK_SECONDS):
+        try:
+            result = fn()
+            cache.set(f'single-flight:result:{key}:{token}', result, settings.SINGLE_FLIGHT_RESULT_SECONDS)
+            return result
+        finally:
+            cache.delete(lock_key)
+
+    # Follow the computation holding the lock now; an earlier one's result is never reused.
+    token = cache.get(lock_key)
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_LOCK_SECONDS
+    while token is not None and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        result = cache.get(f'single-flight:result:{key}:{token}', _MISSING)
+        if result is not _MISSING:
+            return result
+        if cache.get(lock_key) != token:
+            break
+    return fn()
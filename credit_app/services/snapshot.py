@@ -0,0 +1,219 @@
+"""
+Memory-mapped eligibility snapshot.
+
+One file at ELIGIBILITY_SNAPSHOT_PATH holds a fixed-width record per customer
+(salary, approved limit, active EMI total and the credit score inputs), sorted
+by customer id, followed by the ids as a contiguous int64 column for binary
+search. Every gunicorn worker maps the same file read-only, so the pages are
+shared through the OS page cache instead of copied per process.
+
+Layout: HEADER_SIZE bytes of JSON metadata (MAGIC-prefixed, NUL-padded), then
+the records, then the id column. Writers build a complete new file and
+os.replace() it over the old one, so readers only ever see whole snapshots and
+remap when the file's inode changes.
+
+Refresh is incremental: writes append the affected customer to LoanChangeLog
+(signals, repayment batches, reconciliation) and refresh_snapshot() rebuilds
+only those customers' records. A full rebuild runs after ingestion, on a year
+change and every ELIGIBILITY_SNAPSHOT_REBUILD_SECONDS.
+
+lookup() returns None (caller falls back to the database) when the snapshot is
+disabled, missing, older than ELIGIBILITY_SNAPSHOT_MAX_AGE_SECONDS, from a
+previous year, lacks the customer, or the customer was written since the
+snapshot's refresh started (pinned to the primary, or logged in LoanChangeLog
+after refreshed_at). A customer's record is served again only once a refresh
+has covered their write, so lookups cost one indexed LoanChangeLog query.
+"""
+import json
+import os
+import time
+from datetime import date, datetime, timezone as dt_timezone
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from django.conf import settings
+
+from credit_app.models import LoanChangeLog
+from credit_app.routers import is_pinned
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAGIC = b'CREDITSNAP1\n'
+HEADER_SIZE = 4096
+
+SNAPSHOT_FIELDS = (
+    ('customer_id', '<i8'),
+    ('monthly_salary', '<f8'),
+    ('approved_limit', '<f8'),
+    ('active_emi_total', '<f8'),
+    ('loan_count', '<i4'),
+    ('emis_due', '<i4'),
+    ('emis_on_time', '<i4'),
+    ('current_year_count', '<i4'),
+    ('total_volume', '<f8'),
+    ('current_principal', '<f8'),
+)
+
+
+class _Mapped(NamedTuple):
+    key: tuple
+    meta: dict
+    records: 'np.ndarray'
+    ids: 'np.ndarray'
+
+
+_mapped: Optional[_Mapped] = None
+
+
+def snapshot_enabled() -> bool:
+    return bool(settings.ELIGIBILITY_SNAPSHOT_PATH)
+
+
+def record_customer_changes(customer_ids) -> None:
+    """Append customers to the change log picked up by the next incremental refresh."""
+    if not snapshot_enabled():
+        return
+    LoanChangeLog.objects.bulk_create(
+        [LoanChangeLog(customer_id=cid) for cid in set(customer_ids)], batch_size=1000,
+    )
+
+
+def _open() -> Optional[_Mapped]:
+    """The current snapshot file, remapped if a writer replaced it since the last call."""
+    global _mapped
+    import numpy as np
+
+    path = settings.ELIGIBILITY_SNAPSHOT_PATH
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, st.st_ino, st.st_mtime_ns)
+    if _mapped is not None and _mapped.key == key:
+        return _mapped
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        return None
+    meta = json.loads(header[len(MAGIC):].rstrip(b'\0'))
+    dtype = np.dtype(list(SNAPSHOT_FIELDS))
+    n = meta['customers']
+    if n:
+        records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(n,))
+        ids = np.memmap(path, dtype='<i8', mode='r', offset=HEADER_SIZE + n * dtype.itemsize, shape=(n,))
+    else:
+        records, ids = np.zeros(0, dtype=dtype), np.zeros(0, dtype='<i8')
+    _mapped = _Mapped(key, meta, records, ids)
+    return _mapped
+
+
+def is_fresh(meta: dict, now: float = None) -> bool:
+    now = time.time() if now is None else now
+    return (
+        now - meta['refreshed_at'] <= settings.ELIGIBILITY_SNAPSHOT_MAX_AGE_SECONDS
+        and meta['year'] == date.today().year
+    )
+
+
+def lookup(customer_id: int):
+    """The customer's snapshot record, or None when the database must be used instead."""
+    if not snapshot_enabled():
+        return None
+    mapped = _open()
+    if mapped is None or not is_fresh(mapped.meta) or is_pinned(customer_id):
+        return None
+    # The pin expires long before the next refresh; the change log says whether one has covered the write.
+    if LoanChangeLog.objects.filter(
+        customer_id=customer_id, changed_at__gte=_as_datetime(mapped.meta['refreshed_at']),
+    ).exists():
+        return None
+    import numpy as np
+
+    i = int(np.searchsorted(mapped.ids, customer_id))
+    if i == len(mapped.ids) or mapped.ids[i] != customer_id:
+        return None
+    return mapped.records[i]
+
+
+def snapshot_info() -> Optional[dict]:
+    mapped = _open() if snapshot_enabled() else None
+    if mapped is None:
+        return None
+    return dict(mapped.meta, fresh=is_fresh(mapped.meta))
+
+
+def _records(book):
+    import numpy as np
+
+    records = np.zeros(len(book), dtype=list(SNAPSHOT_FIELDS))
+    records['customer_id'] = book.customer_ids
+    records['monthly_salary'] = book.monthly_salary
+    records['approved_limit'] = book.approved_limit
+    records['active_emi_total'] = book.active_emi_total
+    for field in book.score_inputs._fields:
+        records[field] = getattr(book.score_inputs, field)
+    return records
+
+
+def _write(records, meta: dict) -> None:
+    path = settings.ELIGIBILITY_SNAPSHOT_PATH
+    header = MAGIC + json.dumps(meta).encode()
+    if len(header) > HEADER_SIZE:
+        raise ValueError('snapshot metadata exceeds header size')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(records.tobytes())
+        f.write(records['customer_id'].astype('<i8').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def refresh_snapshot(full: bool = False) -> dict:
+    """Bring the snapshot file up to date; incremental unless full or a rebuild is due. Returns its metadata."""
+    import numpy as np
+
+    # loan_book imports eligibility, which reads the snapshot through lookup().
+    from credit_app.services.loan_book import load_loan_book
+
+    started = time.time()
+    current = _open()
+    full = (
+        full or current is None
+        or current.meta['year'] != date.today().year
+        or started - current.meta['built_at'] > settings.ELIGIBILITY_SNAPSHOT_REBUILD_SECONDS
+    )
+    if full:
+        records = _records(load_loan_book())
+        built_at, changed = started, len(records)
+        LoanChangeLog.objects.filter(
+            changed_at__lt=_as_datetime(started - settings.ELIGIBILITY_SNAPSHOT_REBUILD_SECONDS),
+        ).delete()
+    else:
+        # Overlap the previous window so changes committed late are not skipped.
+        since = current.meta['refreshed_at'] - settings.ELIGIBILITY_SNAPSHOT_OVERLAP_SECONDS
+        customer_ids = set(
+            LoanChangeLog.objects.filter(changed_at__gte=_as_datetime(since)).values_list('customer_id', flat=True)
+        )
+        records, built_at, changed = np.array(current.records), current.meta['built_at'], len(customer_ids)
+        if customer_ids:
+            keep = ~np.isin(records['customer_id'], list(customer_ids))
+            records = np.concatenate([records[keep], _records(load_loan_book(customer_ids))])
+            records = records[np.argsort(records['customer_id'], kind='stable')]
+
+    meta = {
+        'customers': len(records),
+        'refreshed_at': started,
+        'built_at': built_at,
+        'year': date.today().year,
+        'full': full,
+        'changed': changed,
+    }
+    _write(records, meta)
+    return meta
+
+
+def _as_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
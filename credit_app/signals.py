@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Customer, Loan
+from .routers import pin_customer
+from .services.debt import record_loan_created, record_loan_deleted
+from .services.search import normalize_phone
+from .services.snapshot import record_customer_changes
+
+
+@receiver(pre_save, sender=Customer)
+def normalize_customer_phone(sender, instance, **kwargs):
+    instance.phone_normalized = normalize_phone(instance.phone_number)
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def pin_customer_on_write(sender, instance, **kwargs):
+    pin_customer(instance.pk)
+    record_customer_changes([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Loan)
+def pin_loan_customer_on_write(sender, instance, **kwargs):
+    pin_customer(instance.customer_id)
+    record_customer_changes([instance.customer_id])
+
+
+@receiver(post_save, sender=Loan)
+def add_loan_to_customer_totals(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_loan_created(instance)
+
+
+@receiver(post_delete, sender=Loan)
+def remove_loan_from_customer_totals(sender, instance, **kwargs):
+    record_loan_deleted(instance)
@@ -0,0 +1,76 @@
+"""Tests for portfolio exposure analytics."""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan
+from credit_app.services.analytics import portfolio_exposure
+from credit_app.services.eligibility import compute_credit_score
+
+
+class PortfolioExposureTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Exposure",
+            last_name="User",
+            phone_number="9000000001",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            current_debt=0,
+            age=30,
+        )
+        this_year = date.today().year
+        Loan.objects.create(
+            customer=self.customer,
+            loan_id=5001,
+            loan_amount=Decimal("200000"),
+            tenure=12,
+            interest_rate=Decimal("14"),
+            monthly_repayment=Decimal("17957"),
+            emis_paid_on_time=3,
+            emis_paid=3,
+            start_date=date(this_year, 1, 1),
+        )
+        Loan.objects.create(
+            customer=self.customer,
+            loan_id=5002,
+            loan_amount=Decimal("100000"),
+            tenure=12,
+            interest_rate=Decimal("10"),
+            monthly_repayment=Decimal("8792"),
+            emis_paid_on_time=12,
+            emis_paid=12,
+            start_date=date(this_year - 3, 1, 1),
+        )
+
+    def test_totals_cover_only_active_loans(self):
+        data = portfolio_exposure()
+        self.assertEqual(data["customers"], 1)
+        self.assertEqual(data["active_loans"], 1)
+        self.assertEqual(data["total_active_principal"], 200000.0)
+        self.assertEqual(data["total_active_emi"], 17957.0)
+        self.assertEqual(data["emi_to_salary_ratio"], round(17957 / 100_000, 4))
+        self.assertEqual(data["emi_burden_distribution"]["0-25%"], 1)
+        self.assertEqual(data["current_year"], {"year": date.today().year, "loans": 1, "volume": 200000.0})
+
+    def test_score_band_matches_compute_credit_score(self):
+        score = compute_credit_score(self.customer)
+        data = portfolio_exposure()
+        expected = next(label for label, upper in (("0-10", 10), ("10-30", 30), ("30-50", 50), ("50-100", 100)) if score <= upper)
+        bands = {row["band"]: row["customers"] for row in data["score_bands"]}
+        self.assertEqual(bands[expected], 1)
+        self.assertEqual(sum(bands.values()), 1)
+
+    def test_rate_slabs(self):
+        slabs = {row["slab"]: row["loans"] for row in portfolio_exposure()["rate_slabs"]}
+        self.assertEqual(slabs, {"<=12": 0, "12-16": 1, ">16": 0})
+
+    def test_endpoint_returns_200(self):
+        response = self.client.get("/analytics/portfolio")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("score_bands", response.json())
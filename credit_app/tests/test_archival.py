@@ -0,0 +1,99 @@
+"""Tests for archival of fully repaid loans."""
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from credit_app.models import ArchivedLoan, Customer, CustomerLoanRollup, Loan, LoanChangeLog
+from credit_app.routers import is_pinned
+from credit_app.services.analytics import portfolio_exposure
+from credit_app.services.archival import archive_loan_batch
+from credit_app.services.eligibility import compute_credit_score
+
+
+class LoanArchivalTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Archive",
+            last_name="User",
+            phone_number="9000000005",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+        this_year = date.today().year
+        self.old_closed = self._loan(8001, emis_paid=12, on_time=10, start=date(this_year - 2, 3, 1))
+        self.old_closed_2 = self._loan(8002, emis_paid=12, on_time=12, start=date(this_year - 1, 3, 1))
+        self.current_year_closed = self._loan(8003, emis_paid=12, on_time=12, start=date(this_year, 1, 1))
+        self.active = self._loan(8004, emis_paid=4, on_time=4, start=date(this_year - 1, 6, 1))
+
+    def _loan(self, loan_id, emis_paid, on_time, start):
+        return Loan.objects.create(
+            customer=self.customer,
+            loan_id=loan_id,
+            loan_amount=Decimal("120000"),
+            tenure=12,
+            interest_rate=Decimal("12"),
+            monthly_repayment=Decimal("10662"),
+            emis_paid=emis_paid,
+            emis_paid_on_time=on_time,
+            start_date=start,
+        )
+
+    def test_moves_only_closed_loans_from_previous_years(self):
+        self.assertEqual(archive_loan_batch(), 2)
+        self.assertEqual(
+            set(Loan.objects.values_list('loan_id', flat=True)), {8003, 8004},
+        )
+        self.assertEqual(
+            set(ArchivedLoan.objects.values_list('loan_id', flat=True)), {8001, 8002},
+        )
+        rollup = CustomerLoanRollup.objects.get(customer=self.customer)
+        self.assertEqual(
+            (rollup.loan_count, rollup.emis_due, rollup.emis_on_time, rollup.total_volume),
+            (2, 24, 22, Decimal("240000")),
+        )
+        self.assertEqual(archive_loan_batch(), 0)
+
+    def test_rollup_accumulates_across_batches(self):
+        archive_loan_batch(batch_size=1)
+        archive_loan_batch(batch_size=1)
+        rollup = CustomerLoanRollup.objects.get(customer=self.customer)
+        self.assertEqual((rollup.loan_count, rollup.emis_on_time), (2, 22))
+
+    @override_settings(ELIGIBILITY_SNAPSHOT_PATH="/tmp/archival-test-snapshot.bin")
+    def test_batch_logs_and_pins_customers_once(self):
+        start = date(date.today().year - 2, 1, 1)
+        for loan_id in range(8100, 8148):
+            self._loan(loan_id, emis_paid=12, on_time=12, start=start)
+        LoanChangeLog.objects.all().delete()
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(archive_loan_batch(batch_size=50), 50)
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(sum('credit_app_loan_change_log' in q['sql'] for q in queries), 1)
+        self.assertEqual(list(LoanChangeLog.objects.values_list('customer_id', flat=True)), [self.customer.pk])
+        self.assertTrue(is_pinned(self.customer.pk))
+
+    def test_credit_score_and_exposure_unchanged_by_archival(self):
+        score = compute_credit_score(self.customer)
+        exposure = portfolio_exposure()
+        archive_loan_batch()
+        self.assertAlmostEqual(compute_credit_score(self.customer), score)
+        self.assertEqual(portfolio_exposure(), exposure)
+
+    def test_view_loans_includes_archived_on_request(self):
+        archive_loan_batch()
+        hot = self.client.get(f"/view-loans/{self.customer.pk}").json()
+        self.assertEqual({row["loan_id"] for row in hot}, {8003, 8004})
+        everything = self.client.get(f"/view-loans/{self.customer.pk}?include_archived=1").json()
+        self.assertEqual({row["loan_id"] for row in everything}, {8001, 8002, 8003, 8004})
+        archived_row = next(row for row in everything if row["loan_id"] == 8001)
+        self.assertEqual(archived_row["repayments_left"], 0)
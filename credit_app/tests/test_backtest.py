@@ -0,0 +1,85 @@
+"""Tests for the columnar loan-book snapshot and policy backtest."""
+import copy
+import json
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from credit_app.models import Customer, Loan
+from credit_app.services.archival import archive_loan_batch
+from credit_app.services.backtest import backtest
+from credit_app.services.eligibility import compute_credit_score
+from credit_app.services.loan_book import load_loan_book
+from credit_app.services.policy import compile_policy
+
+
+class LoanBookBacktestTests(TestCase):
+    def setUp(self):
+        this_year = date.today().year
+        self.customers = []
+        for i, (salary, loans) in enumerate([
+            (100_000, [(200_000, 14, 12, 3, date(this_year, 1, 1)), (120_000, 13, 12, 12, date(this_year - 2, 1, 1))]),
+            (40_000, [(500_000, 17, 24, 10, date(this_year - 1, 5, 1))]),
+            (60_000, []),
+        ]):
+            customer = Customer.objects.create(
+                first_name=f"Book{i}",
+                last_name="User",
+                phone_number=f"90000001{i:02d}",
+                monthly_salary=salary,
+                approved_limit=36 * salary,
+                age=30,
+            )
+            self.customers.append(customer)
+            for j, (amount, rate, tenure, paid, start) in enumerate(loans):
+                Loan.objects.create(
+                    customer=customer,
+                    loan_id=7000 + 10 * i + j,
+                    loan_amount=Decimal(amount),
+                    interest_rate=Decimal(rate),
+                    tenure=tenure,
+                    monthly_repayment=Decimal("9000"),
+                    emis_paid=paid,
+                    emis_paid_on_time=paid - 1,
+                    start_date=start,
+                )
+        self.policy = compile_policy(settings.CREDIT_POLICY)
+
+    def test_snapshot_scores_match_compute_credit_score(self):
+        archive_loan_batch()
+        book = load_loan_book()
+        scores = self.policy.score_batch(*book.score_inputs, approved_limit=book.approved_limit)
+        for customer, score in zip(self.customers, scores):
+            self.assertAlmostEqual(score, compute_credit_score(customer, self.policy))
+        self.assertEqual(len(book.applications.loan_amount), 3)
+
+    def test_identical_policies_do_not_flip(self):
+        report = backtest(self.policy, self.policy)
+        self.assertEqual(report['applications'], 3)
+        self.assertEqual((report['newly_approved'], report['newly_rejected']), (0, 0))
+        self.assertEqual(report['approval_rate_delta'], 0)
+
+    def test_stricter_slab_flips_approvals(self):
+        stricter = copy.deepcopy(settings.CREDIT_POLICY)
+        for slab in stricter['slabs']:
+            slab['min_rate'] = 20
+        stricter['slabs'].append({'max_score': 100, 'min_rate': 20})
+        report = backtest(self.policy, compile_policy(stricter))
+        self.assertEqual(report['candidate']['approved'], 0)
+        self.assertEqual(report['newly_rejected'], report['baseline']['approved'])
+        self.assertLess(report['approval_rate_delta'], 0)
+
+    def test_command_reports_json(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(settings.CREDIT_POLICY, f)
+            f.flush()
+            out = StringIO()
+            call_command('backtest_policy', f.name, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['customers'], 3)
+        self.assertIn('timings', report)
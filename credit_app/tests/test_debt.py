@@ -0,0 +1,76 @@
+"""Tests for write-maintained Customer.current_debt / active_emi_total."""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan
+from credit_app.services.debt import reconcile_customer_totals
+from credit_app.services.eligibility import check_eligibility
+from credit_app.services.emi import outstanding_principal
+from credit_app.services.repayments import apply_repayment_batch, record_repayment_events
+
+
+class CustomerTotalsTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Debt",
+            last_name="User",
+            phone_number="9000000006",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+
+    def _loan(self, loan_id, amount=120_000, tenure=12, emis_paid=0, emi="10662.00"):
+        return Loan.objects.create(
+            customer=self.customer,
+            loan_id=loan_id,
+            loan_amount=Decimal(amount),
+            tenure=tenure,
+            interest_rate=Decimal("12"),
+            monthly_repayment=Decimal(emi),
+            emis_paid=emis_paid,
+        )
+
+    def test_create_loan_endpoint_updates_totals(self):
+        response = self.client.post(
+            "/create-loan",
+            {"customer_id": self.customer.pk, "loan_amount": 50_000, "interest_rate": 14, "tenure": 12},
+            format="json",
+        )
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_debt, 50_000)
+        self.assertEqual(self.customer.active_emi_total, Decimal(str(response.json()["monthly_installment"])))
+
+    def test_repayments_reduce_debt_and_release_emi_when_closed(self):
+        self._loan(9001, tenure=2, emis_paid=0, emi="60451.00")
+        self._loan(9002)
+        record_repayment_events([
+            {"event_id": "d1", "loan_id": 9001, "paid_on": "2024-01-01"},
+            {"event_id": "d2", "loan_id": 9001, "paid_on": "2024-02-01"},
+            {"event_id": "d3", "loan_id": 9002, "paid_on": "2024-01-01"},
+        ])
+        apply_repayment_batch()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.active_emi_total, Decimal("10662.00"))
+        self.assertEqual(self.customer.current_debt, round(outstanding_principal(120_000, 12, 12, 1)))
+        self.assertEqual(reconcile_customer_totals(), 0)
+
+    def test_affordability_uses_active_emi_total(self):
+        Customer.objects.filter(pk=self.customer.pk).update(active_emi_total=Decimal("49000"))
+        result = check_eligibility(self.customer.pk, loan_amount=100_000, interest_rate=14, tenure=12)
+        self.assertFalse(result.approval)
+        self.assertIn("50%", result.message)
+
+    def test_reconcile_command_fixes_drift(self):
+        self._loan(9003)
+        Customer.objects.filter(pk=self.customer.pk).update(current_debt=1, active_emi_total=0)
+        self.assertEqual(reconcile_customer_totals(dry_run=True), 1)
+        call_command("reconcile_customer_totals", verbosity=0, stdout=StringIO())
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.current_debt, self.customer.active_emi_total), (120_000, Decimal("10662.00")))
@@ -0,0 +1,126 @@
+"""Tests for Excel ingestion and its per-run telemetry."""
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from credit_app.models import Customer, IngestionRun, Loan
+from credit_app.services.ingestion import ingest_customers, ingest_loans
+from credit_app.tasks import ingest_customers_from_excel
+
+
+class IngestionTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _excel(self, name, rows):
+        path = os.path.join(self.dir, name)
+        pd.DataFrame(rows).to_excel(path, index=False)
+        return path
+
+    def _customers(self):
+        return self._excel('customers.xlsx', [
+            {'Customer ID': 1, 'First Name': 'Ada', 'Last Name': 'L', 'Phone Number': 9000000701,
+             'Monthly Salary': 50000, 'Approved Limit': 1800000},
+            {'Customer ID': 3, 'First Name': 'Bad', 'Last Name': 'Salary', 'Phone Number': 9000000703,
+             'Monthly Salary': 'n/a', 'Approved Limit': 1400000},
+        ])
+
+    def _ingest_customers(self):
+        with self.assertLogs('credit_app.services.ingestion', 'WARNING') as logs:
+            result = ingest_customers(self._customers())
+        self.assertIn('rejected 1 rows', logs.output[0])
+        return result
+
+    def test_customer_run_records_stages_and_rejections(self):
+        result = self._ingest_customers()
+        self.assertTrue(result['ok'])
+        self.assertEqual(Customer.objects.get().first_name, 'Ada')
+
+        run = IngestionRun.objects.get(pk=result['run_id'])
+        self.assertEqual((run.kind, run.status), (IngestionRun.CUSTOMERS, IngestionRun.SUCCEEDED))
+        self.assertEqual((run.rows_read, run.created, run.updated, run.rejected), (2, 1, 0, 1))
+        self.assertEqual(run.rejected_by_reason, {'invalid_value': 1})
+        stages = ['read', 'parse', 'write'] + (['sequence_reset'] if connection.vendor == 'postgresql' else [])
+        self.assertEqual([stage['name'] for stage in run.stages], stages + ['reconcile', 'refresh_views'])
+        self.assertEqual(run.stages[2]['rows'], 1)
+        self.assertIsNotNone(run.duration_seconds)
+
+    def test_loan_run_rejects_unknown_customers(self):
+        self._ingest_customers()
+        path = self._excel('loans.xlsx', [
+            {'Customer ID': 1, 'Loan ID': 7001, 'Loan Amount': 100000, 'Tenure': 12, 'Interest Rate': 12.5,
+             'Monthly Repayment': 8909, 'EMIs paid on Time': 3, 'Start Date': pd.Timestamp('2024-01-05'),
+             'End Date': pd.Timestamp('2025-01-05')},
+            {'Customer ID': 99, 'Loan ID': 7002, 'Loan Amount': 100000, 'Tenure': 12, 'Interest Rate': 12.5,
+             'Monthly Repayment': 8909, 'EMIs paid on Time': 3, 'Start Date': pd.Timestamp('2024-01-05'),
+             'End Date': pd.Timestamp('2025-01-05')},
+        ])
+        with self.assertLogs('credit_app.services.ingestion', 'WARNING') as logs:
+            result = ingest_loans(path)
+        self.assertIn("{'unknown_customer': 1}", logs.output[0])
+        self.assertEqual((result['created'], result['rejected']), (1, {'unknown_customer': 1}))
+        loan = Loan.objects.get()
+        self.assertEqual((loan.monthly_repayment, loan.start_date), (Decimal('8909'), date(2024, 1, 5)))
+
+    def test_loan_run_rejects_rows_without_start_date(self):
+        self._ingest_customers()
+        path = self._excel('loans.xlsx', [
+            {'Customer ID': 1, 'Loan ID': 7003, 'Loan Amount': 100000, 'Tenure': 12, 'Interest Rate': 12.5,
+             'Monthly Repayment': 8909, 'EMIs paid on Time': 3, 'Start Date': None},
+        ])
+        with self.assertLogs('credit_app.services.ingestion', 'WARNING'):
+            result = ingest_loans(path)
+        self.assertEqual((result['created'], result['rejected']), (0, {'missing_start_date': 1}))
+        self.assertFalse(Loan.objects.exists())
+
+    def test_write_stage_uses_bulk_queries_and_reconciles_totals(self):
+        self._ingest_customers()
+        path = self._excel('loans.xlsx', [
+            {'Customer ID': 1, 'Loan ID': 7100 + i, 'Loan Amount': 100000, 'Tenure': 12, 'Interest Rate': 12,
+             'Monthly Repayment': 8885, 'EMIs paid on Time': 0, 'Start Date': pd.Timestamp('2024-06-01')}
+            for i in range(30)
+        ])
+        snapshot_path = os.path.join(self.dir, 'snapshot.bin')
+        with override_settings(ELIGIBILITY_SNAPSHOT_PATH=snapshot_path), CaptureQueriesContext(connection) as queries:
+            result = ingest_loans(path)
+        writes = ('INSERT INTO "credit_app_loan"', 'UPDATE "credit_app_loan"')
+        loan_writes = [q['sql'] for q in queries if q['sql'].startswith(writes)]
+        self.assertEqual((result['created'], len(loan_writes)), (30, 1))
+        # One change-log insert from the reconcile stage, none per loan.
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "credit_app_loan_change_log"') for q in queries), 1)
+        customer = Customer.objects.get()
+        self.assertEqual((customer.active_emi_total, customer.phone_normalized), (Decimal('266550'), '9000000701'))
+
+        result = ingest_loans(path)
+        self.assertEqual((result['created'], result['updated']), (0, 30))
+        self.assertEqual(Loan.objects.count(), 30)
+
+    def test_unreadable_file_recorded_as_failed_run(self):
+        with self.assertLogs('credit_app.services.ingestion', 'ERROR'):
+            result = ingest_loans(os.path.join(self.dir, 'missing.xlsx'))
+        self.assertFalse(result['ok'])
+        run = IngestionRun.objects.get(pk=result['run_id'])
+        self.assertEqual(run.status, IngestionRun.FAILED)
+        self.assertIn('missing.xlsx', run.error)
+        self.assertEqual([stage['name'] for stage in run.stages], ['read'])
+
+    @override_settings(INGESTION_PROGRESS_EVERY=1)
+    def test_task_publishes_progress_state(self):
+        path = self._customers()
+        with mock.patch.object(ingest_customers_from_excel, 'update_state') as update_state, \
+                self.assertLogs('credit_app.services.ingestion', 'WARNING'):
+            result = ingest_customers_from_excel.apply(args=[path]).get()
+        run = IngestionRun.objects.get(pk=result['run_id'])
+        self.assertTrue(run.task_id)
+        states = [call.kwargs for call in update_state.call_args_list]
+        self.assertTrue(all(state['state'] == 'PROGRESS' for state in states))
+        self.assertIn({'run_id': run.pk, 'stage': 'parse', 'done': 1, 'total': 2}, [s['meta'] for s in states])
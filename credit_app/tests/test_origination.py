@@ -0,0 +1,91 @@
+"""Tests for asynchronous (write-behind) loan origination."""
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan, LoanApplication
+from credit_app.services.debt import reconcile_customer_totals
+from credit_app.services.origination import process_application_batch, submit_application
+from credit_app.tasks import process_loan_applications
+
+
+class OriginationBatchTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Async", last_name="User", phone_number="9000000501",
+            monthly_salary=100_000, approved_limit=3_600_000, age=30,
+        )
+
+    def _submit(self, amount, rate=14, tenure=12, customer_id=None):
+        return submit_application(customer_id or self.customer.pk, Decimal(amount), Decimal(rate), tenure)
+
+    def test_matches_sequential_synchronous_decisions(self):
+        # Each ~44k EMI fits under the 50k affordability cap only once.
+        first, second = self._submit(500_000), self._submit(500_000)
+        result = process_application_batch()
+        self.assertEqual((result.applications, result.approved), (2, 1))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, LoanApplication.APPROVED)
+        self.assertEqual(second.status, LoanApplication.REJECTED)
+        self.assertIn("50%", second.message)
+
+        loan = Loan.objects.get(customer=self.customer)
+        self.assertEqual(first.loan_id, loan.pk)
+        self.assertEqual(loan.loan_id, loan.pk)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.active_emi_total, loan.monthly_repayment)
+        self.assertEqual(reconcile_customer_totals(dry_run=True), 0)
+
+    def test_unknown_customer_rejected(self):
+        application = self._submit(10_000, customer_id=999_999)
+        process_application_batch()
+        application.refresh_from_db()
+        self.assertEqual((application.status, application.message), (LoanApplication.REJECTED, "Customer not found"))
+
+    def test_task_drains_in_batches(self):
+        for _ in range(5):
+            self._submit(10_000)
+        with override_settings(LOAN_APPLICATION_BATCH_SIZE=2):
+            result = process_loan_applications()
+        self.assertEqual(result['applications'], 5)
+        self.assertFalse(LoanApplication.objects.filter(status=LoanApplication.PENDING).exists())
+        self.assertEqual(Loan.objects.filter(customer=self.customer).count(), result['approved'])
+
+
+@override_settings(LOAN_ORIGINATION_ASYNC=True)
+class AsyncCreateLoanAPITests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Async", last_name="Api", phone_number="9000000502",
+            monthly_salary=100_000, approved_limit=3_600_000, age=30,
+        )
+
+    @mock.patch("credit_app.views.process_loan_applications.delay")
+    def test_create_loan_returns_202_then_status_reports_outcome(self, delay):
+        response = self.client.post(
+            "/create-loan",
+            {"customer_id": self.customer.pk, "loan_amount": 100_000, "interest_rate": 14, "tenure": 12},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        delay.assert_called_once_with()
+        self.assertEqual(response.data["status"], "pending")
+        self.assertIsNone(response.data["loan_approved"])
+        status_url = response["Location"]
+        self.assertEqual(status_url, response.data["status_url"])
+        self.assertFalse(Loan.objects.exists())
+
+        process_application_batch()
+        decided = self.client.get(status_url)
+        self.assertEqual(decided.status_code, status.HTTP_200_OK)
+        self.assertTrue(decided.data["loan_approved"])
+        self.assertEqual(decided.data["loan_id"], Loan.objects.get().loan_id)
+
+    def test_unknown_application_returns_404(self):
+        self.assertEqual(self.client.get("/loan-applications/12345").status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,99 @@
+"""Tests for loan table partitioning (the conversion itself needs PostgreSQL)."""
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from credit_app.models import Customer, Loan
+from credit_app.services.partitioning import (
+    DEFAULT_PARTITION, ensure_loan_partitions, is_loan_table_partitioned, partition_loan_table,
+    partition_name, year_partition_sql,
+)
+
+
+class LoanPartitioningTests(TestCase):
+    def test_year_partition_covers_calendar_year(self):
+        self.assertEqual(
+            year_partition_sql(2024),
+            "CREATE TABLE IF NOT EXISTS credit_app_loan_y2024 PARTITION OF credit_app_loan "
+            "FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')",
+        )
+
+    def test_ensure_partitions_is_noop_on_unpartitioned_table(self):
+        self.assertEqual(ensure_loan_partitions(), [])
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'Checks the error on other databases')
+    def test_command_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('partition_loans')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Loan partitioning requires PostgreSQL')
+class PartitionedLoanTableTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Part", last_name="Itioned", phone_number="9000000801",
+            monthly_salary=100_000, approved_limit=3_600_000, age=30,
+        )
+        self.year = date.today().year
+        self._loan(9001, date(self.year - 1, 3, 1))
+        self._loan(9003, date(self.year + 3, 1, 1))
+
+    def _loan(self, loan_id, start_date, **fields):
+        return Loan.objects.create(
+            customer=self.customer, loan_id=loan_id, loan_amount=Decimal("120000"), tenure=12,
+            interest_rate=Decimal("12"), monthly_repayment=Decimal("10662"), start_date=start_date, **fields,
+        )
+
+    def _rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT loan_id FROM {table} ORDER BY loan_id')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_populated_table_is_partitioned_and_supports_crud(self):
+        self.assertEqual(partition_loan_table(years_ahead=1), [self.year - 1, self.year, self.year + 1])
+        self.assertTrue(is_loan_table_partitioned())
+        self.assertEqual(self._rows(partition_name(self.year - 1)), [9001])
+        self.assertEqual(self._rows(DEFAULT_PARTITION), [9003])
+
+        loan = self._loan(9004, date(self.year, 6, 1))
+        self.assertEqual(self._rows(partition_name(self.year)), [9004])
+        loan.emis_paid = 3
+        loan.save()
+        self.assertEqual(Loan.objects.get(loan_id=9004).emis_paid, 3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._loan(9004, date(self.year - 1, 1, 1))
+        loan.delete()
+        self.assertEqual(sorted(Loan.objects.values_list('loan_id', flat=True)), [9001, 9003])
+
+    def test_partitioned_table_keeps_model_constraints(self):
+        partition_loan_table(years_ahead=1)
+        existing = Loan.objects.get(loan_id=9001)
+        # id stays unique across partitions, as the model's primary key promises.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._loan(9005, date(self.year, 1, 1), id=existing.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('UPDATE credit_app_loan SET start_date = NULL WHERE id = %s', [existing.pk])
+        # Moving a loan to another year's partition keeps its keys.
+        existing.start_date = date(self.year, 2, 1)
+        existing.save()
+        self.assertEqual(self._rows(partition_name(self.year)), [9001])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._loan(9001, date(self.year - 1, 1, 1))
+
+    def test_new_partition_takes_rows_from_default(self):
+        partition_loan_table(years_ahead=1)
+        self.assertEqual(ensure_loan_partitions(years_ahead=3), [self.year + 2, self.year + 3])
+        self.assertEqual(self._rows(partition_name(self.year + 3)), [9003])
+        self.assertEqual(self._rows(DEFAULT_PARTITION), [])
+
+        moved = Loan.objects.get(loan_id=9003)
+        self.assertEqual(moved.start_date, date(self.year + 3, 1, 1))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._loan(9003, date(self.year, 1, 1))
+        moved.delete()
+        self._loan(9003, date(self.year + 3, 2, 1))
@@ -0,0 +1,123 @@
+"""Tests for the data-driven credit policy."""
+import copy
+import json
+import tempfile
+from io import StringIO
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from credit_app.models import Customer
+from credit_app.services.eligibility import ScoreInputs, check_eligibility
+from credit_app.services.emi import calculate_emi, calculate_emi_batch
+from credit_app.services.policy import (
+    OVER_AFFORDABILITY, RATE_TOO_LOW, SCORE_TOO_LOW, active_policy, compile_policy, publish_policy,
+)
+
+
+class CompiledPolicyTests(TestCase):
+    def setUp(self):
+        self.policy = compile_policy(settings.CREDIT_POLICY)
+
+    def test_slab_boundaries(self):
+        cases = [
+            (10, 20, SCORE_TOO_LOW),
+            (30, 16, RATE_TOO_LOW),
+            (30, 16.5, 0),
+            (50, 12, RATE_TOO_LOW),
+            (50.1, 8, 0),
+        ]
+        for score, rate, reason in cases:
+            decision = self.policy.evaluate(score, 100_000, rate, 12, 0, 100_000)
+            self.assertEqual(decision.reason, reason, (score, rate))
+        over = self.policy.evaluate(80, 600_000, 10, 12, 0, 100_000)
+        self.assertEqual(over.reason, OVER_AFFORDABILITY)
+        self.assertEqual(
+            self.policy.message(over.reason, over.band),
+            'Sum of current EMIs and new EMI exceeds 50% of monthly salary',
+        )
+        self.assertEqual(self.policy.message(RATE_TOO_LOW, 1), 'Interest rate must be > 16% for this credit score')
+
+    def test_batch_matches_single_evaluation(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        scores = rng.uniform(0, 100, n)
+        amounts = rng.integers(10_000, 1_000_000, n)
+        rates = rng.choice([0, 8, 12, 14, 16, 18.5], n)
+        tenures = rng.integers(1, 60, n)
+        active = rng.uniform(0, 40_000, n)
+        salaries = rng.integers(20_000, 150_000, n)
+        batch = self.policy.evaluate_batch(scores, amounts, rates, tenures, active, salaries)
+        for i in range(n):
+            single = self.policy.evaluate(scores[i], amounts[i], rates[i], tenures[i], active[i], salaries[i])
+            self.assertEqual(batch.reason[i], single.reason)
+            self.assertEqual(batch.approval[i], single.approval)
+            self.assertAlmostEqual(batch.corrected_interest_rate[i], single.corrected_interest_rate)
+            self.assertAlmostEqual(batch.monthly_installment[i], single.monthly_installment, places=2)
+
+    def test_score_batch_matches_score(self):
+        inputs = [
+            ScoreInputs(0, 0, 0, 0, 0.0, 0.0),
+            ScoreInputs(3, 36, 30, 1, 450_000.0, 200_000.0),
+            ScoreInputs(12, 120, 120, 5, 9_000_000.0, 5_000_000.0),
+        ]
+        columns = [np.array(col) for col in zip(*inputs)]
+        batch = self.policy.score_batch(*columns, approved_limit=np.full(3, 1_000_000))
+        for got, row in zip(batch, inputs):
+            self.assertAlmostEqual(got, self.policy.score(row, 1_000_000))
+
+    def test_emi_batch_matches_calculate_emi(self):
+        emis = calculate_emi_batch([100_000, 120_000, 5_000], [12, 0, 10], [12, 12, 0])
+        self.assertEqual(list(emis), [calculate_emi(100_000, 12, 12), 10_000.0, 0.0])
+
+    def test_rejects_invalid_policy(self):
+        bad = copy.deepcopy(settings.CREDIT_POLICY)
+        bad['slabs'] = [{'max_score': 50, 'min_rate': 12}, {'max_score': 30, 'min_rate': 16}]
+        with self.assertRaises(ValueError):
+            compile_policy(bad)
+        with self.assertRaises(ValueError):
+            compile_policy({'slabs': []})
+
+
+class PublishedPolicyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Policy",
+            last_name="User",
+            phone_number="9000000007",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_published_version_drives_check_eligibility(self):
+        self.assertEqual(active_policy().version, 0)
+        # A new customer scores 40 (on-time share only): inside the 30-50 slab.
+        self.assertTrue(check_eligibility(self.customer.pk, 100_000, 14, 12).approval)
+
+        stricter = copy.deepcopy(settings.CREDIT_POLICY)
+        stricter['slabs'][1]['min_rate'] = 15
+        publish_policy(stricter, note='raise 30-50 slab')
+        self.assertEqual(active_policy().version, 1)
+        result = check_eligibility(self.customer.pk, 100_000, 14, 12)
+        self.assertFalse(result.approval)
+        self.assertEqual(result.message, 'Interest rate must be > 15% for this credit score')
+
+    def test_command_loads_and_shows_policy(self):
+        rules = copy.deepcopy(settings.CREDIT_POLICY)
+        rules['affordability_ratio'] = 0.4
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(rules, f)
+            f.flush()
+            call_command('credit_policy', load=f.name, stdout=StringIO())
+        out = StringIO()
+        call_command('credit_policy', stdout=out)
+        self.assertIn('version 1', out.getvalue())
+        self.assertEqual(active_policy().affordability_ratio, 0.4)
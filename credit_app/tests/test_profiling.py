@@ -0,0 +1,100 @@
+"""Tests for on-demand request profiling."""
+import io
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan
+from credit_app.services import profiling
+
+
+class ProfilingTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Profiled", last_name="User", phone_number="9000000601",
+            monthly_salary=50_000, approved_limit=1_800_000, age=30,
+        )
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        overrides = override_settings(PROFILE_DIR=self.dir, PROFILE_SAMPLE_RATE=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _get(self, **headers):
+        return self.client.get(f"/view-loans/{self.customer.pk}", **headers)
+
+    def test_signed_header_writes_profile_and_sql_log(self):
+        response = self._get(HTTP_X_PROFILE=profiling.make_token())
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue(os.path.exists(os.path.join(self.dir, profile_id + ".prof")))
+        (meta,) = profiling.load_profiles()
+        self.assertEqual((meta["id"], meta["trigger"], meta["status"]), (profile_id, "header", 200))
+        self.assertTrue(any("credit_app_loan" in query["sql"] for query in meta["queries"]))
+
+    def test_invalid_token_or_no_trigger_is_not_profiled(self):
+        self.assertNotIn("X-Profile-Id", self._get(HTTP_X_PROFILE="forged:token"))
+        self.assertNotIn("X-Profile-Id", self._get())
+        self.assertEqual(profiling.load_profiles(), [])
+
+    def test_sampling_and_retention(self):
+        with override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_KEEP=2):
+            ids = [self._get()["X-Profile-Id"] for _ in range(3)]
+        kept = [meta["id"] for meta in profiling.load_profiles()]
+        self.assertEqual(len(kept), 2)
+        self.assertNotIn(min(ids), kept)
+        self.assertEqual(len(os.listdir(self.dir)), 4)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            profiling.normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x' LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            profiling.normalize_sql('SELECT * FROM t WHERE id IN (%s) OR id in (%s, %s) LIMIT 21'),
+            'SELECT * FROM t WHERE id IN (...) OR id IN (...) LIMIT ?',
+        )
+
+    @mock.patch("credit_app.views.apply_repayment_events.delay")
+    def test_in_lists_of_captured_requests_share_one_shape(self, delay):
+        Loan.objects.create(
+            customer=self.customer, loan_id=7201, loan_amount=Decimal("50000"), tenure=6,
+            interest_rate=Decimal("12"), monthly_repayment=Decimal("8627"),
+        )
+        token = profiling.make_token()
+        for ids in (["p1"], ["p2", "p3", "p4"]):
+            events = [{"event_id": i, "loan_id": 7201, "paid_on": "2024-05-01"} for i in ids]
+            response = self.client.post("/repayments", {"events": events}, format="json", HTTP_X_PROFILE=token)
+            self.assertEqual(response.status_code, 202)
+
+        lookups = [
+            (sql, count) for sql, count, _, _ in profiling.query_summary(profiling.load_profiles())
+            if '"event_id" IN' in sql and sql.startswith("SELECT")
+        ]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(lookups[0][1], 2)
+        self.assertIn("IN (...)", lookups[0][0])
+
+    def test_command_lists_and_summarizes(self):
+        token = profiling.make_token()
+        self._get(HTTP_X_PROFILE=token)
+        self._get(HTTP_X_PROFILE=token)
+
+        out = io.StringIO()
+        call_command("profiles", stdout=out)
+        self.assertEqual(out.getvalue().count("/view-loans/"), 2)
+
+        out = io.StringIO()
+        call_command("profiles", "--summary", "--path", "/view-loans", stdout=out)
+        summary = out.getvalue()
+        self.assertIn("2 profiles", summary)
+        self.assertIn("ncalls", summary)
+        self.assertIn("credit_app_loan", summary)
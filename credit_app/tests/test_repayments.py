@@ -0,0 +1,177 @@
+"""Tests for bulk repayment event recording and batched application."""
+import threading
+import time
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan, RepaymentEvent
+from credit_app.services import repayments
+from credit_app.services.debt import reconcile_customer_totals
+from credit_app.services.repayments import apply_repayment_batch, record_repayment_events
+
+
+def _event(event_id, loan_id, on_time=True):
+    return {"event_id": event_id, "loan_id": loan_id, "paid_on": "2024-05-01", "on_time": on_time}
+
+
+class RepaymentBatchTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Repay",
+            last_name="User",
+            phone_number="9000000002",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+        self.loan = self._loan(7001, tenure=12, emis_paid=0)
+        self.short_loan = self._loan(7002, tenure=2, emis_paid=1)
+
+    def _loan(self, loan_id, tenure, emis_paid):
+        return Loan.objects.create(
+            customer=self.customer,
+            loan_id=loan_id,
+            loan_amount=Decimal("100000"),
+            tenure=tenure,
+            interest_rate=Decimal("12"),
+            monthly_repayment=Decimal("8885"),
+            emis_paid=emis_paid,
+            emis_paid_on_time=emis_paid,
+        )
+
+    def test_increments_are_grouped_per_loan_and_capped_at_tenure(self):
+        record_repayment_events([
+            _event("e1", 7001),
+            _event("e2", 7001, on_time=False),
+            _event("e3", 7001),
+            _event("e4", 7002),
+            _event("e5", 7002),
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            result = apply_repayment_batch()
+        loan_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "credit_app_loan"')]
+        self.assertEqual(len(loan_updates), 1)
+        self.assertEqual((result.events, result.loans), (5, 2))
+        self.assertEqual(result.customer_ids, {self.customer.pk})
+        self.loan.refresh_from_db()
+        self.short_loan.refresh_from_db()
+        self.assertEqual((self.loan.emis_paid, self.loan.emis_paid_on_time), (3, 2))
+        self.assertEqual((self.short_loan.emis_paid, self.short_loan.emis_paid_on_time), (2, 2))
+        self.assertEqual(apply_repayment_batch().events, 0)
+
+    def test_duplicate_event_ids_are_applied_once(self):
+        self.assertEqual(record_repayment_events([_event("dup", 7001), _event("dup", 7001)]), 1)
+        apply_repayment_batch()
+        self.assertEqual(record_repayment_events([_event("dup", 7001)]), 0)
+        apply_repayment_batch()
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.emis_paid, 1)
+
+    def test_batch_size_limits_events_per_batch(self):
+        record_repayment_events([_event(f"b{i}", 7001) for i in range(3)])
+        self.assertEqual(apply_repayment_batch(batch_size=2).events, 2)
+        self.assertEqual(apply_repayment_batch(batch_size=2).events, 1)
+        self.assertFalse(RepaymentEvent.objects.filter(applied_at__isnull=True).exists())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'needs row locks across connections')
+class ConcurrentRepaymentBatchTests(TransactionTestCase):
+    def test_workers_on_same_loan_apply_deltas_in_turn(self):
+        customer = Customer.objects.create(
+            first_name="Race", last_name="User", phone_number="9000000003",
+            monthly_salary=100_000, approved_limit=3_600_000, age=30,
+        )
+        Loan.objects.create(
+            customer=customer, loan_id=7101, loan_amount=Decimal("100000"), tenure=2,
+            interest_rate=Decimal("12"), monthly_repayment=Decimal("8885"), emis_paid=1,
+        )
+        record_repayment_events([_event("r1", 7101), _event("r2", 7101)])
+
+        first_read = threading.Event()
+        real_deltas = repayments.repayment_deltas
+
+        def deltas(before, paid):
+            if threading.current_thread().name == 'first':
+                first_read.set()
+                time.sleep(0.5)  # the second worker reaches the loan lock meanwhile
+            return real_deltas(before, paid)
+
+        def worker():
+            try:
+                apply_repayment_batch(batch_size=1)
+            finally:
+                connections.close_all()
+
+        def second():
+            first_read.wait(5)
+            worker()
+
+        threads = [threading.Thread(target=worker, name='first'), threading.Thread(target=second)]
+        with mock.patch.object(repayments, 'repayment_deltas', deltas):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.active_emi_total, 0)
+        self.assertEqual(customer.current_debt, 0)
+        self.assertEqual(reconcile_customer_totals(dry_run=True), 0)
+        self.assertFalse(RepaymentEvent.objects.filter(applied_at__isnull=True).exists())
+
+
+class RepaymentEventsAPITests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        customer = Customer.objects.create(
+            first_name="Repay",
+            last_name="Api",
+            phone_number="9000000003",
+            monthly_salary=50_000,
+            approved_limit=1_800_000,
+            age=30,
+        )
+        Loan.objects.create(
+            customer=customer,
+            loan_id=7101,
+            loan_amount=Decimal("50000"),
+            tenure=6,
+            interest_rate=Decimal("12"),
+            monthly_repayment=Decimal("8627"),
+        )
+
+    @mock.patch("credit_app.views.apply_repayment_events.delay")
+    def test_post_events_returns_202_and_enqueues(self, delay):
+        response = self.client.post(
+            "/repayments",
+            {"events": [_event("a1", 7101), _event("a1", 7101), _event("a2", 7101)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json(), {"received": 3, "accepted": 2, "duplicates": 1})
+        delay.assert_called_once_with()
+
+    @mock.patch("credit_app.views.apply_repayment_events.delay")
+    def test_oversized_batch_returns_400(self, delay):
+        events = [_event(f"b{i}", 7101) for i in range(settings.REPAYMENT_MAX_BATCH + 1)]
+        with self.assertNumQueries(0):
+            response = self.client.post("/repayments", {"events": events}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("no more than", str(response.json()["events"]))
+        delay.assert_not_called()
+
+    @mock.patch("credit_app.views.apply_repayment_events.delay")
+    def test_unknown_loan_returns_400(self, delay):
+        response = self.client.post("/repayments", {"events": [_event("x1", 99999)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("events", response.json())
+        delay.assert_not_called()
@@ -0,0 +1,64 @@
+"""
+Tests for primary/replica read routing. 'replica' is a test mirror of 'default';
+TransactionTestCase commits fixtures so the mirror connection can see them.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer, Loan
+from credit_app.routers import PrimaryReplicaRouter, is_pinned, read_from_replica
+
+
+@override_settings(READ_REPLICA_ENABLED=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    client_class = APIClient
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Replica",
+            last_name="User",
+            phone_number="9000000004",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+        cache.clear()
+
+    def test_reads_outside_replica_block_use_primary(self):
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Loan), 'default')
+        with read_from_replica():
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Loan), 'replica')
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Loan), 'default')
+
+    @override_settings(READ_REPLICA_ENABLED=False)
+    def test_disabled_replica_keeps_reads_on_primary(self):
+        with read_from_replica() as on_replica:
+            self.assertFalse(on_replica)
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Loan), 'default')
+
+    def test_view_loans_reads_from_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(f"/view-loans/{self.customer.pk}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(replica.captured_queries), 2)
+
+    def test_write_pins_customer_reads_to_primary(self):
+        Loan.objects.create(
+            customer=self.customer,
+            loan_amount=Decimal("50000"),
+            tenure=6,
+            interest_rate=Decimal("12"),
+            monthly_repayment=Decimal("8627"),
+        )
+        self.assertTrue(is_pinned(self.customer.pk))
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(f"/view-loans/{self.customer.pk}")
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(replica.captured_queries, [])
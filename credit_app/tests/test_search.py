@@ -0,0 +1,66 @@
+"""Tests for customer search by phone number and name."""
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from credit_app.models import Customer
+from credit_app.services.search import is_phone_query, normalize_phone, search_customers
+
+
+class PhoneNormalizationTests(SimpleTestCase):
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone("+91 98765-43210"), "9876543210")
+        self.assertEqual(normalize_phone("09876543210"), "9876543210")
+        self.assertEqual(normalize_phone(9876543210), "9876543210")
+        self.assertEqual(normalize_phone(None), "")
+
+    def test_phone_query_detection(self):
+        self.assertTrue(is_phone_query("98765"))
+        self.assertTrue(is_phone_query("(987) 654"))
+        self.assertFalse(is_phone_query("98"))
+        self.assertFalse(is_phone_query("Raj 98"))
+
+
+class CustomerSearchTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customers = [
+            Customer.objects.create(
+                first_name=first, last_name=last, phone_number=phone,
+                monthly_salary=50_000, approved_limit=1_800_000, age=30,
+            )
+            for first, last, phone in [
+                ("Rahul", "Sharma", "+91 9876543210"),
+                ("Priya", "Sharma", "9876500000"),
+                ("Rahul", "Verma", "9123456789"),
+            ]
+        ]
+
+    def test_phone_normalized_on_save(self):
+        self.assertEqual(self.customers[0].phone_normalized, "9876543210")
+        self.customers[0].phone_number = "9000000000"
+        self.customers[0].save()
+        self.assertEqual(Customer.objects.get(pk=self.customers[0].pk).phone_normalized, "9000000000")
+
+    def test_phone_exact_and_prefix(self):
+        self.assertEqual(list(search_customers("098765 43210")), [self.customers[0]])
+        self.assertEqual(list(search_customers("98765")), [self.customers[1], self.customers[0]])
+
+    def test_name_words_must_all_match(self):
+        self.assertEqual(list(search_customers("rahul")), [self.customers[0], self.customers[2]])
+        self.assertEqual(list(search_customers("sharma rah")), [self.customers[0]])
+        self.assertEqual(list(search_customers("nobody")), [])
+
+    def test_endpoint_paginates(self):
+        response = self.client.get("/customers/search", {"q": "sharma", "page_size": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["has_next"])
+        self.assertEqual([r["id"] for r in response.data["results"]], [self.customers[1].pk])
+
+        response = self.client.get("/customers/search", {"q": "sharma", "page_size": 1, "page": 2})
+        self.assertFalse(response.data["has_next"])
+        self.assertEqual([r["id"] for r in response.data["results"]], [self.customers[0].pk])
+
+    def test_endpoint_requires_query(self):
+        self.assertEqual(self.client.get("/customers/search").status_code, 400)
+        self.assertEqual(self.client.get("/customers/search", {"q": "a"}).status_code, 400)
@@ -6,7 +6,7 @@ from django.test import TestCase
 
 from credit_app.models import Customer, Loan
 from credit_app.serializers import approved_limit_from_salary
-from credit_app.services.emi import calculate_emi
+from credit_app.services.emi import amortization_schedule, cached_schedule, calculate_emi
 from credit_app.services.eligibility import check_eligibility, compute_credit_score
 
 
@@ -31,6 +31,31 @@ class EMICalculatorTests(TestCase):
         self.assertEqual(round(emi, 2), emi)
 
 
+class AmortizationScheduleTests(TestCase):
+    """Tests for the month-by-month schedule generator."""
+
+    def test_schedule_is_lazy_generator(self):
+        rows = amortization_schedule(100_000, 12, 12)
+        first = next(rows)
+        self.assertEqual(first.month, 1)
+        self.assertEqual(first.interest, 1000.0)
+        self.assertEqual(first.emi, calculate_emi(100_000, 12, 12))
+
+    def test_balance_amortizes_to_zero(self):
+        rows = list(amortization_schedule(100_000, 12, 12))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[-1].balance, 0.0)
+        self.assertAlmostEqual(sum(r.principal for r in rows), 100_000, places=2)
+
+    def test_zero_interest_schedule(self):
+        rows = list(amortization_schedule(120_000, 0, 12))
+        self.assertTrue(all(r.interest == 0 and r.principal == 10_000 for r in rows))
+
+    def test_cached_schedule_shared_for_identical_terms(self):
+        first = cached_schedule(Decimal("250000.00"), Decimal("11.50"), 24)
+        self.assertIs(cached_schedule(Decimal("250000.00"), Decimal("11.50"), 24), first)
+
+
 class ApprovedLimitTests(TestCase):
     """Tests for approved_limit_from_salary (nearest lakh)."""
 
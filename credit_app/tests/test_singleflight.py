@@ -0,0 +1,105 @@
+"""Tests for coalescing concurrent eligibility computations."""
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from credit_app.models import Customer
+from credit_app.services.eligibility import check_eligibility
+from credit_app.services.singleflight import single_flight
+
+
+def _run_concurrently(target, count):
+    results = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.calls = 0
+
+    def _slow(self, result=42, error=None):
+        def compute():
+            self.calls += 1
+            time.sleep(0.1)
+            if error:
+                raise error
+            return result
+        return compute
+
+    def test_concurrent_callers_share_one_computation(self):
+        results = _run_concurrently(lambda: single_flight('k', self._slow(), share_across_processes=False), 8)
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_error_is_shared(self):
+        error = ValueError('boom')
+        results = _run_concurrently(lambda: single_flight('k', self._slow(error=error), share_across_processes=False), 4)
+        self.assertEqual(results, [error] * 4)
+        self.assertEqual(self.calls, 1)
+
+    def test_later_call_computes_again_in_process(self):
+        single_flight('k', self._slow(), share_across_processes=False)
+        single_flight('k', self._slow(), share_across_processes=False)
+        self.assertEqual(self.calls, 2)
+
+    def test_waits_for_result_published_by_another_worker(self):
+        # Another worker holds the lock and publishes its result shortly.
+        cache.add('single-flight:lock:k', 'other', 2)
+
+        def publish():
+            time.sleep(0.05)
+            cache.set('single-flight:result:k:other', 7, 1)
+            cache.delete('single-flight:lock:k')
+
+        threading.Thread(target=publish).start()
+        self.assertEqual(single_flight('k', self._slow()), 7)
+        self.assertEqual(self.calls, 0)
+
+    def test_finished_computation_is_not_reused(self):
+        self.assertEqual(single_flight('k', self._slow()), 42)
+        self.assertEqual(single_flight('k', self._slow(result=43)), 43)
+        self.assertEqual(self.calls, 2)
+
+    def test_computes_when_other_worker_gives_up(self):
+        cache.add('single-flight:lock:k', 1, 2)
+        threading.Timer(0.05, cache.delete, args=('single-flight:lock:k',)).start()
+        self.assertEqual(single_flight('k', self._slow()), 42)
+        self.assertEqual(self.calls, 1)
+
+
+@override_settings(SINGLE_FLIGHT_RESULT_SECONDS=60)
+class CoalescedEligibilityTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Single", last_name="Flight", phone_number="9000000301",
+            monthly_salary=100_000, approved_limit=3_600_000, age=30,
+        )
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_sequential_checks_see_later_writes(self):
+        check_eligibility(self.customer.pk, 100_000, 14, 12, read_only=True)
+        Customer.objects.filter(pk=self.customer.pk).update(monthly_salary=10_000)
+        result = check_eligibility(self.customer.pk, 100_000, 14, 12, read_only=True)
+        self.assertFalse(result.approval)
+
+    def test_create_loan_path_is_not_coalesced(self):
+        check_eligibility(self.customer.pk, 100_000, 14, 12, read_only=True)
+        with self.assertNumQueries(3):
+            check_eligibility(self.customer.pk, 100_000, 14, 12)
@@ -0,0 +1,103 @@
+"""Tests for the memory-mapped eligibility snapshot."""
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from credit_app.models import Customer, Loan, LoanChangeLog
+from credit_app.services import snapshot
+from credit_app.services.eligibility import check_eligibility, credit_score_inputs
+from credit_app.services.policy import active_policy
+
+
+class EligibilitySnapshotTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(ELIGIBILITY_SNAPSHOT_PATH=os.path.join(tmp.name, 'snapshot.bin'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.customer = Customer.objects.create(
+            first_name="Snapshot",
+            last_name="User",
+            phone_number="9000000008",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=30,
+        )
+        self._loan(6001, emis_paid=5)
+        snapshot.refresh_snapshot(full=True)
+        # Creating the rows pinned the customer to the primary; start unpinned.
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _loan(self, loan_id, emis_paid=0):
+        return Loan.objects.create(
+            customer=self.customer,
+            loan_id=loan_id,
+            loan_amount=Decimal("200000"),
+            tenure=12,
+            interest_rate=Decimal("14"),
+            monthly_repayment=Decimal("17957"),
+            emis_paid=emis_paid,
+            emis_paid_on_time=emis_paid,
+        )
+
+    def test_snapshot_record_matches_database(self):
+        record = snapshot.lookup(self.customer.pk)
+        inputs = credit_score_inputs(self.customer)
+        for field in inputs._fields:
+            self.assertEqual(record[field], getattr(inputs, field), field)
+        self.assertEqual(record['active_emi_total'], 17957)
+
+    def test_check_eligibility_from_snapshot(self):
+        expected = check_eligibility(self.customer.pk, 100_000, 14, 12)
+        active_policy()
+        # Only the change-log check; no customer, loan or rollup queries.
+        with self.assertNumQueries(1):
+            result = check_eligibility(self.customer.pk, 100_000, 14, 12, read_only=True)
+        self.assertEqual(result, expected)
+
+    def test_incremental_refresh_applies_logged_changes(self):
+        self._loan(6002)
+        other = Customer.objects.create(
+            first_name="New", last_name="User", phone_number="9000000009",
+            monthly_salary=50_000, approved_limit=1_800_000, age=25,
+        )
+        self.assertTrue(LoanChangeLog.objects.filter(customer_id=self.customer.pk).exists())
+        meta = snapshot.refresh_snapshot()
+        self.assertFalse(meta['full'])
+        self.assertEqual(meta['customers'], 2)
+        cache.clear()
+        self.assertEqual(snapshot.lookup(self.customer.pk)['loan_count'], 2)
+        self.assertEqual(snapshot.lookup(other.pk)['monthly_salary'], 50_000)
+
+    def test_falls_back_when_stale_pinned_or_missing(self):
+        self.assertIsNotNone(snapshot.lookup(self.customer.pk))
+        with override_settings(ELIGIBILITY_SNAPSHOT_MAX_AGE_SECONDS=-1):
+            self.assertIsNone(snapshot.lookup(self.customer.pk))
+        self.assertIsNone(snapshot.lookup(self.customer.pk + 1000))
+        self._loan(6003)  # pins the customer to the primary
+        self.assertIsNone(snapshot.lookup(self.customer.pk))
+        result = check_eligibility(self.customer.pk + 1000, 100_000, 14, 12, read_only=True)
+        self.assertEqual(result.message, 'Customer not found')
+
+    def test_write_uses_database_until_refresh_covers_it(self):
+        self.assertEqual(snapshot.lookup(self.customer.pk)['loan_count'], 1)
+        self._loan(6005)
+        cache.clear()  # the replica pin has expired; the next refresh has not run yet
+        self.assertIsNone(snapshot.lookup(self.customer.pk))
+        result = check_eligibility(self.customer.pk, 100_000, 14, 12, read_only=True)
+        self.assertEqual(result, check_eligibility(self.customer.pk, 100_000, 14, 12))
+
+        snapshot.refresh_snapshot()
+        self.assertEqual(snapshot.lookup(self.customer.pk)['loan_count'], 2)
+
+    def test_change_log_only_written_when_enabled(self):
+        LoanChangeLog.objects.all().delete()
+        with override_settings(ELIGIBILITY_SNAPSHOT_PATH=''):
+            self._loan(6004)
+        self.assertFalse(LoanChangeLog.objects.exists())
@@ -0,0 +1,22 @@
+"""Guards against heavy imports creeping back into worker startup."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from credit_app.management.commands.profile_imports import parse_importtime
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      3000 |       3120 | json\n"
+        )
+        self.assertEqual(parse_importtime(stderr), [(120, 120, '_io'), (3000, 3120, 'json')])
+
+    def test_pandas_and_numpy_not_imported_at_startup(self):
+        out = StringIO()
+        call_command('profile_imports', forbid='pandas,numpy', top=5, stdout=out)
+        self.assertIn('django', out.getvalue())
@@ -0,0 +1,150 @@
+"""Tests for token-bucket rate limiting and load shedding."""
+import os
+import unittest
+from unittest import mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from credit_app.middleware import IN_FLIGHT_KEY, LoadSheddingMiddleware, MemoryInFlight, RedisInFlight
+from credit_app.models import Customer
+from credit_app.throttling import MemoryBuckets, get_buckets, parse_rate
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('60/min'), (60, 1.0))
+        self.assertEqual(parse_rate('10/s'), (10, 10.0))
+
+    def test_burst_then_refill(self):
+        buckets = MemoryBuckets()
+        with mock.patch('credit_app.throttling.time.monotonic', return_value=100.0):
+            self.assertEqual([buckets.take('k', 3, 1.0)[0] for _ in range(4)], [True, True, True, False])
+            self.assertAlmostEqual(buckets.take('k', 3, 1.0)[1], 1.0)
+        with mock.patch('credit_app.throttling.time.monotonic', return_value=101.5):
+            self.assertTrue(buckets.take('k', 3, 1.0)[0])
+            self.assertFalse(buckets.take('k', 3, 1.0)[0])
+
+
+@override_settings(RATE_LIMIT_BACKEND='memory', RATE_LIMITS={'client': '100/min', 'customer': '2/min'})
+class RateLimitAPITests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        get_buckets().clear()
+        self.addCleanup(get_buckets().clear)
+        self.customers = [
+            Customer.objects.create(
+                first_name="Rate", last_name=str(i), phone_number=f"90000002{i:02d}",
+                monthly_salary=100_000, approved_limit=3_600_000, age=30,
+            )
+            for i in range(2)
+        ]
+
+    def _check(self, customer, **headers):
+        return self.client.post(
+            "/check-eligibility",
+            {"customer_id": customer.pk, "loan_amount": 50_000, "interest_rate": 14, "tenure": 12},
+            format="json",
+            **headers,
+        )
+
+    def test_per_customer_limit_returns_429_with_retry_after(self):
+        self.assertEqual(self._check(self.customers[0]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._check(self.customers[0]).status_code, status.HTTP_200_OK)
+        limited = self._check(self.customers[0])
+        self.assertEqual(limited.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(limited["Retry-After"], "30")
+        self.assertEqual(self._check(self.customers[1]).status_code, status.HTTP_200_OK)
+
+    @override_settings(RATE_LIMITS={'client': '1/min', 'customer': ''})
+    def test_per_client_limit_ignores_untrusted_client_id(self):
+        self.assertEqual(self._check(self.customers[0], HTTP_X_CLIENT_ID="a").status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._check(self.customers[1], HTTP_X_CLIENT_ID="b").status_code, status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        self.assertEqual(
+            self._check(self.customers[1], HTTP_X_FORWARDED_FOR="10.9.9.9").status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        self.assertEqual(self._check(self.customers[1], REMOTE_ADDR="10.0.0.8").status_code, status.HTTP_200_OK)
+
+    @override_settings(RATE_LIMITS={'client': '1/min', 'customer': ''}, RATE_LIMIT_TRUSTED_NETWORKS=['127.0.0.0/8'])
+    def test_trusted_network_splits_bucket_by_client_id(self):
+        self.assertEqual(self._check(self.customers[0], HTTP_X_CLIENT_ID="a").status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._check(self.customers[1], HTTP_X_CLIENT_ID="a").status_code, status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        self.assertEqual(self._check(self.customers[1], HTTP_X_CLIENT_ID="b").status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._check(self.customers[1], HTTP_X_CLIENT_ID="a", REMOTE_ADDR="10.0.0.8").status_code,
+            status.HTTP_200_OK,
+        )
+
+
+@override_settings(LOAD_SHED_CONCURRENCY=2, LOAD_SHED_RESERVED=1, LOAD_SHED_RETRY_AFTER=3)
+class LoadSheddingTests(SimpleTestCase):
+    def setUp(self):
+        self.middleware = LoadSheddingMiddleware(lambda request: HttpResponse("ok"))
+        self.middleware.in_flight = MemoryInFlight()
+        self.factory = RequestFactory()
+
+    def _status(self, path, in_flight):
+        self.middleware.in_flight.count = in_flight
+        return self.middleware(self.factory.get(path)).status_code
+
+    def test_low_priority_shed_first(self):
+        self.assertEqual(self._status("/view-loans/1", 1), 200)
+        self.middleware.in_flight.count = 2
+        response = self.middleware(self.factory.get("/view-loans/1"))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "3")
+
+    def test_reserved_headroom_for_create_loan(self):
+        self.assertEqual(self._status("/check-eligibility", 2), 200)
+        self.assertEqual(self._status("/check-eligibility", 3), 429)
+        self.assertEqual(self._status("/create-loan", 3), 200)
+        self.assertEqual(self._status("/create-loan", 50), 200)
+
+    def test_counter_released_after_response(self):
+        self.middleware(self.factory.get("/view-loans/1"))
+        self.assertEqual(self.middleware.in_flight.count, 0)
+
+    def test_streaming_response_counted_until_closed(self):
+        self.middleware.get_response = lambda request: StreamingHttpResponse(iter([b"a", b"b"]))
+        response = self.middleware(self.factory.get("/export/loans"))
+        self.assertEqual(self.middleware.in_flight.count, 1)
+        self.assertEqual(b"".join(response.streaming_content), b"ab")
+        response.close()
+        response.close()
+        self.assertEqual(self.middleware.in_flight.count, 0)
+
+    @override_settings(LOAD_SHED_CONCURRENCY=0)
+    def test_disabled(self):
+        self.assertEqual(self._status("/view-loans/1", 1000), 200)
+
+
+@unittest.skipUnless(os.environ.get("REDIS_URL"), "needs a Redis server (REDIS_URL)")
+@override_settings(LOAD_SHED_LEASE_SECONDS=60)
+class RedisInFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.counter = RedisInFlight(os.environ["REDIS_URL"])
+        self.counter._client.delete(IN_FLIGHT_KEY)
+        self.addCleanup(self.counter._client.delete, IN_FLIGHT_KEY)
+
+    def test_leases_are_shared_and_released(self):
+        other_worker = RedisInFlight(os.environ["REDIS_URL"])
+        first = self.counter.acquire(2)
+        second = other_worker.acquire(2)
+        self.assertIsNone(self.counter.acquire(2))
+        self.assertIsNotNone(self.counter.acquire(None))
+        other_worker.release(second)
+        self.assertIsNotNone(self.counter.acquire(3))
+        self.assertTrue(first)
+
+    @override_settings(LOAD_SHED_LEASE_SECONDS=0)
+    def test_expired_leases_are_dropped(self):
+        self.counter.acquire(1)
+        self.assertIsNotNone(self.counter.acquire(1))
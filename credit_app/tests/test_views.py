@@ -1,4 +1,6 @@
 """API tests for credit_app endpoints."""
+import json
+from datetime import date
 from decimal import Decimal
 
 from django.test import TestCase
@@ -6,6 +8,8 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from credit_app.models import Customer, Loan
+from credit_app.services.eligibility import compute_credit_score
+from credit_app.services.policy import active_policy
 
 
 class RegisterAPITests(TestCase):
@@ -162,6 +166,26 @@ class ViewLoanAPITests(TestCase):
         response = self.client.get("/view-loan/99999999")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_schedule_streams_json(self):
+        response = self.client.get(f"/view-loan/{self.loan.loan_id}/schedule")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["loan_id"], 1001)
+        self.assertEqual(len(data["schedule"]), 24)
+        self.assertEqual(data["schedule"][-1]["balance"], 0.0)
+
+    def test_schedule_streams_csv(self):
+        response = self.client.get(f"/view-loan/{self.loan.loan_id}/schedule?output=csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "month,emi,principal,interest,balance")
+        self.assertEqual(len(lines), 25)
+
+    def test_schedule_not_found_returns_404(self):
+        response = self.client.get("/view-loan/99999999/schedule")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class ViewLoansAPITests(TestCase):
     client_class = APIClient
@@ -186,3 +210,50 @@ class ViewLoansAPITests(TestCase):
         response = self.client.get("/view-loans/99999999")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn("not found", response.json().get("detail", "").lower())
+
+
+class CustomerSummaryAPITests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Summary",
+            last_name="User",
+            phone_number="6666555533",
+            monthly_salary=100_000,
+            approved_limit=3_600_000,
+            age=40,
+        )
+        loan = dict(loan_amount=Decimal("100000"), interest_rate=Decimal("12"), tenure=12,
+                    monthly_repayment=Decimal("8884.88"), start_date=date(2024, 1, 1))
+        self.active = Loan.objects.create(customer=self.customer, loan_id=9101, emis_paid=4, **loan)
+        Loan.objects.create(customer=self.customer, loan_id=9102, emis_paid=12, emis_paid_on_time=12, **loan)
+        active_policy()  # compiled policy is cached per process
+
+    def test_summary_in_three_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/customers/{self.customer.pk}/summary")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["customer"]["customer_id"], self.customer.pk)
+        self.assertEqual(data["customer"]["monthly_income"], 100_000)
+        self.assertEqual([(loan["loan_id"], loan["repayments_left"]) for loan in data["active_loans"]], [(9101, 8)])
+        self.assertEqual(data["active_emi_total"], 8884.88)
+        self.assertEqual(data["emi_headroom"], round(0.5 * 100_000 - 8884.88, 2))
+        self.assertEqual(data["credit_score"], round(compute_credit_score(self.customer), 2))
+
+    def test_unknown_customer_returns_404(self):
+        self.assertEqual(self.client.get("/customers/99999999/summary").status_code, status.HTTP_404_NOT_FOUND)
+
+
+class HealthAPITests(TestCase):
+    client_class = APIClient
+
+    def test_liveness_returns_200(self):
+        response = self.client.get("/health")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_readiness_checks_database_and_cache(self):
+        response = self.client.get("/health/ready")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["checks"], {"database": "ok", "cache": "ok"})
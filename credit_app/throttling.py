@@ -0,0 +1,184 @@
+"""
+Token-bucket rate limiting per client and per customer_id.
+
+Each bucket holds up to N tokens and refills at N per period (rates use DRF's
+"N/period" format, e.g. "60/min"), so a client may burst N requests and then
+sustains N per period. Buckets live in Redis when RATE_LIMIT_BACKEND is
+'redis' (one Lua script call per check, atomic across workers) and in process
+memory when it is 'memory' (tests, single-process runs). A Redis failure lets
+the request through rather than failing it.
+
+Rejected requests get DRF's 429 with Retry-After set to the time until the
+next token.
+"""
+import ipaddress
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+TOKEN_BUCKET_LUA = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * per_second)
+local wait = 0
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / per_second * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """'60/min' -> (capacity 60, refill 1.0 token per second)."""
+    count, period = rate.split('/')
+    seconds = PERIODS[period.strip().lower()]
+    capacity = int(count)
+    return capacity, capacity / seconds
+
+
+class MemoryBuckets:
+    """Per-process buckets; stands in for Redis in tests and single-process runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key: str, capacity: int, per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            return False, (1 - tokens) / per_second
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBuckets:
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._script = self._client.register_script(TOKEN_BUCKET_LUA)
+
+    def take(self, key: str, capacity: int, per_second: float) -> Tuple[bool, float]:
+        try:
+            allowed, wait = self._script(keys=[key], args=[capacity, per_second])
+        except Exception:
+            logger.warning('Rate limit check failed for %s; allowing request', key, exc_info=True)
+            return True, 0.0
+        return bool(allowed), float(wait)
+
+
+_buckets = None
+_buckets_lock = threading.Lock()
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        with _buckets_lock:
+            if _buckets is None:
+                if settings.RATE_LIMIT_BACKEND == 'redis':
+                    _buckets = RedisBuckets(settings.REDIS_URL)
+                else:
+                    _buckets = MemoryBuckets()
+    return _buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Rate from settings.RATE_LIMITS[scope]; an empty rate disables the throttle."""
+    scope = None
+
+    def get_key(self, request, view) -> Optional[str]:
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = settings.RATE_LIMITS.get(self.scope)
+        if not rate or not settings.RATE_LIMIT_BACKEND:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        capacity, per_second = parse_rate(rate)
+        allowed, self._wait = get_buckets().take(f'ratelimit:{self.scope}:{key}', capacity, per_second)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+@lru_cache(maxsize=8)
+def _networks(spec: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(net.strip(), strict=False) for net in spec if net.strip())
+
+
+def trusts_client_id(remote_addr: str) -> bool:
+    """True if remote_addr is in RATE_LIMIT_TRUSTED_NETWORKS, whose X-Client-Id header is honoured."""
+    networks = _networks(tuple(settings.RATE_LIMIT_TRUSTED_NETWORKS))
+    if not networks or not remote_addr:
+        return False
+    try:
+        addr = ipaddress.ip_address(remote_addr)
+    except ValueError:
+        return False
+    return any(addr in net for net in networks)
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    """
+    Per API client: the remote address. X-Client-Id is unauthenticated, so it
+    only splits the bucket (address plus client id) for callers connecting from
+    RATE_LIMIT_TRUSTED_NETWORKS, e.g. an internal gateway serving many clients;
+    anyone else could rotate it to get a fresh bucket per request.
+    """
+    scope = 'client'
+
+    def get_key(self, request, view):
+        ident = self.get_ident(request)
+        client_id = request.headers.get('X-Client-Id')
+        if client_id and trusts_client_id(request.META.get('REMOTE_ADDR')):
+            return f'{ident}:{client_id}'
+        return ident
+
+
+class CustomerRateThrottle(TokenBucketThrottle):
+    """Per customer_id, from the URL or the request body."""
+    scope = 'customer'
+
+    def get_key(self, request, view):
+        customer_id = view.kwargs.get('customer_id')
+        if customer_id is None and request.method == 'POST':
+            try:
+                customer_id = request.data.get('customer_id')
+            except Exception:
+                return None
+        try:
+            return str(int(customer_id))
+        except (TypeError, ValueError):
+            return None
@@ -6,6 +6,15 @@ urlpatterns = [
     path('register', views.RegisterView.as_view(), name='register'),
     path('check-eligibility', views.CheckEligibilityView.as_view(), name='check-eligibility'),
     path('create-loan', views.CreateLoanView.as_view(), name='create-loan'),
+    path('loan-applications/<int:application_id>', views.LoanApplicationView.as_view(), name='loan-application'),
     path('view-loan/<int:loan_id>', views.ViewLoanView.as_view(), name='view-loan'),
+    path('view-loan/<int:loan_id>/schedule', views.LoanScheduleView.as_view(), name='view-loan-schedule'),
     path('view-loans/<int:customer_id>', views.ViewLoansView.as_view(), name='view-loans'),
+    path('repayments', views.RepaymentEventsView.as_view(), name='repayments'),
+    path('analytics/portfolio', views.PortfolioAnalyticsView.as_view(), name='analytics-portfolio'),
+    path('customers/<int:customer_id>/summary', views.CustomerSummaryView.as_view(), name='customer-summary'),
+    path('customers/search', views.CustomerSearchView.as_view(), name='customer-search'),
+    path('export/<str:dataset>', views.ExportView.as_view(), name='export'),
+    path('health', views.HealthView.as_view(), name='health'),
+    path('health/ready', views.ReadinessView.as_view(), name='health-ready'),
 ]
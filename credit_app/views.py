@@ -1,18 +1,44 @@
-from django.db.models import Q
+import csv
+import json
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Prefetch, Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Customer, Loan
+from .models import ArchivedLoan, Customer, CustomerLoanRollup, Loan, LoanApplication
+from .permissions import WarehouseTokenPermission
+from .routers import read_from_primary, read_from_replica
 from .serializers import (
     CheckEligibilitySerializer,
     CreateLoanSerializer,
+    CustomerNestedSerializer,
+    CustomerProfileSerializer,
+    CustomerSearchSerializer,
     LoanDetailSerializer,
     LoanListItemSerializer,
     RegisterSerializer,
+    RepaymentBatchSerializer,
 )
-from .services.eligibility import check_eligibility
+from .services.analytics import portfolio_exposure
+from .services.eligibility import check_eligibility, credit_score_inputs
+from .services.emi import ScheduleRow, cached_schedule
+from .services.export import DATASETS, FORMATS, export_alias, export_window, stream_export
+from .services.origination import submit_application
+from .services.policy import active_policy
+from .services.search import search_customers
+from .services.repayments import record_repayment_events
+from .tasks import apply_repayment_events, process_loan_applications
+from .throttling import ClientRateThrottle, CustomerRateThrottle
 
 
 class RegisterView(APIView):
@@ -35,17 +61,21 @@ class RegisterView(APIView):
 
 
 class CheckEligibilityView(APIView):
+    throttle_classes = [ClientRateThrottle, CustomerRateThrottle]
+
     def post(self, request):
         serializer = CheckEligibilitySerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         data = serializer.validated_data
-        result = check_eligibility(
-            customer_id=data['customer_id'],
-            loan_amount=float(data['loan_amount']),
-            interest_rate=float(data['interest_rate']),
-            tenure=data['tenure'],
-        )
+        with read_from_replica(data['customer_id']):
+            result = check_eligibility(
+                customer_id=data['customer_id'],
+                loan_amount=float(data['loan_amount']),
+                interest_rate=float(data['interest_rate']),
+                tenure=data['tenure'],
+                read_only=True,
+            )
         return Response(
             {
                 'customer_id': data['customer_id'],
@@ -60,11 +90,25 @@ class CheckEligibilityView(APIView):
 
 
 class CreateLoanView(APIView):
+    throttle_classes = [ClientRateThrottle, CustomerRateThrottle]
+
     def post(self, request):
         serializer = CreateLoanSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         data = serializer.validated_data
+        if settings.LOAN_ORIGINATION_ASYNC:
+            application = submit_application(
+                data['customer_id'], data['loan_amount'], data['interest_rate'], data['tenure'],
+            )
+            process_loan_applications.delay()
+            status_url = reverse('loan-application', args=[application.pk])
+            response = Response(
+                {**_application_payload(application), 'status_url': status_url},
+                status=status.HTTP_202_ACCEPTED,
+            )
+            response['Location'] = status_url
+            return response
         result = check_eligibility(
             customer_id=data['customer_id'],
             loan_amount=float(data['loan_amount']),
@@ -82,26 +126,25 @@ class CreateLoanView(APIView):
                 },
                 status=status.HTTP_200_OK,
             )
-        from datetime import date
-        from dateutil.relativedelta import relativedelta
-
         customer = Customer.objects.get(pk=data['customer_id'])
         monthly_repayment = result.monthly_installment
         start_date = date.today()
         end_date = start_date + relativedelta(months=data['tenure'])
-        loan = Loan.objects.create(
-            customer=customer,
-            loan_amount=data['loan_amount'],
-            tenure=data['tenure'],
-            interest_rate=result.corrected_interest_rate,
-            monthly_repayment=monthly_repayment,
-            emis_paid_on_time=0,
-            emis_paid=0,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        loan.loan_id = loan.pk
-        loan.save(update_fields=['loan_id'])
+        with transaction.atomic():
+            # post_save adds the loan to the customer's current_debt / active_emi_total.
+            loan = Loan.objects.create(
+                customer=customer,
+                loan_amount=data['loan_amount'],
+                tenure=data['tenure'],
+                interest_rate=result.corrected_interest_rate,
+                monthly_repayment=monthly_repayment,
+                emis_paid_on_time=0,
+                emis_paid=0,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            loan.loan_id = loan.pk
+            loan.save(update_fields=['loan_id', 'updated_at'])
         return Response(
             {
                 'loan_id': loan.loan_id or loan.pk,
@@ -114,12 +157,49 @@ class CreateLoanView(APIView):
         )
 
 
+def _application_payload(application):
+    """The /create-loan response fields, with loan_approved None while the application is pending."""
+    decided = application.status != LoanApplication.PENDING
+    return {
+        'application_id': application.pk,
+        'status': application.status,
+        'loan_id': application.loan_id,
+        'customer_id': application.customer_id,
+        'loan_approved': application.status == LoanApplication.APPROVED if decided else None,
+        'message': application.message,
+        'monthly_installment': float(application.monthly_installment) if decided else None,
+    }
+
+
+class LoanApplicationView(APIView):
+    """Outcome of a /create-loan request accepted in async origination mode (read from the primary)."""
+
+    def get(self, request, application_id):
+        try:
+            application = LoanApplication.objects.get(pk=application_id)
+        except LoanApplication.DoesNotExist:
+            return Response(
+                {'detail': 'Loan application not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(_application_payload(application), status=status.HTTP_200_OK)
+
+
+def _find_loan(queryset, loan_id):
+    """Look a loan up by pk or loan_id on the replica, falling back to the primary for fresh loans."""
+    lookup = queryset.filter(Q(pk=loan_id) | Q(loan_id=loan_id))
+    with read_from_replica() as on_replica:
+        loan = lookup.first()
+    if loan is None and on_replica:
+        with read_from_primary():
+            loan = lookup.first()
+    return loan
+
+
 class ViewLoanView(APIView):
     def get(self, request, loan_id):
         try:
-            loan = Loan.objects.select_related('customer').filter(
-                Q(pk=loan_id) | Q(loan_id=loan_id)
-            ).first()
+            loan = _find_loan(Loan.objects.select_related('customer'), loan_id)
             if loan is None:
                 raise Loan.DoesNotExist()
         except Loan.DoesNotExist:
@@ -134,14 +214,226 @@ class ViewLoanView(APIView):
 
 
 class ViewLoansView(APIView):
+    throttle_classes = [ClientRateThrottle, CustomerRateThrottle]
+
     def get(self, request, customer_id):
-        try:
-            Customer.objects.get(pk=customer_id)
-        except Customer.DoesNotExist:
+        with read_from_replica(customer_id):
+            loans = list(Loan.objects.filter(customer_id=customer_id).order_by('-id'))
+            # Only a customer without loans needs the existence check.
+            if not loans and not Customer.objects.filter(pk=customer_id).exists():
+                return Response(
+                    {'detail': 'Customer not found'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            data = LoanListItemSerializer(loans, many=True).data
+            if request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes'):
+                archived = ArchivedLoan.objects.filter(customer_id=customer_id).order_by('-original_id')
+                data += LoanListItemSerializer(archived, many=True).data
+            return Response(data, status=status.HTTP_200_OK)
+
+
+class CustomerSummaryView(APIView):
+    """
+    Profile, active loans, credit score and EMI headroom for one screen. Three
+    queries: the customer joined to its archived-loan rollup, the prefetched
+    active loans, and the score aggregate.
+    """
+    throttle_classes = [ClientRateThrottle, CustomerRateThrottle]
+
+    def get(self, request, customer_id):
+        active_loans = Loan.objects.filter(emis_paid__lt=F('tenure')).order_by('-id')
+        with read_from_replica(customer_id):
+            customer = (
+                Customer.objects.select_related('loan_rollup')
+                .prefetch_related(Prefetch('loans', queryset=active_loans, to_attr='active_loans'))
+                .filter(pk=customer_id)
+                .first()
+            )
+            if customer is None:
+                return Response(
+                    {'detail': 'Customer not found'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            inputs = credit_score_inputs(customer, getattr(customer, 'loan_rollup', None) or CustomerLoanRollup())
+        policy = active_policy()
+        active_emi_total = float(customer.active_emi_total)
+        headroom = policy.affordability_ratio * customer.monthly_salary - active_emi_total
+        return Response(
+            {
+                'customer': CustomerProfileSerializer(customer).data,
+                'credit_score': round(policy.score(inputs, customer.approved_limit), 2),
+                'active_emi_total': active_emi_total,
+                'emi_headroom': round(max(0.0, headroom), 2),
+                'active_loans': LoanListItemSerializer(customer.active_loans, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PortfolioAnalyticsView(APIView):
+    def get(self, request):
+        with read_from_replica():
+            data = portfolio_exposure()
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class RepaymentEventsView(APIView):
+    def post(self, request):
+        serializer = RepaymentBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        events = serializer.validated_data['events']
+        accepted = record_repayment_events(events)
+        if accepted:
+            apply_repayment_events.delay()
+        return Response(
+            {'received': len(events), 'accepted': accepted, 'duplicates': len(events) - accepted},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def _schedule_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ScheduleRow._fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _schedule_json(loan, rows):
+    loan_id = loan.loan_id if loan.loan_id is not None else loan.pk
+    yield f'{{"loan_id": {loan_id}, "schedule": ['
+    for i, row in enumerate(rows):
+        yield (',' if i else '') + json.dumps(row._asdict())
+    yield ']}'
+
+
+class LoanScheduleView(APIView):
+    def get(self, request, loan_id):
+        loan = _find_loan(Loan.objects.all(), loan_id)
+        if loan is None:
             return Response(
-                {'detail': 'Customer not found'},
+                {'detail': 'Loan not found'},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        loans = Loan.objects.filter(customer_id=customer_id).order_by('-id')
-        serializer = LoanListItemSerializer(loans, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        output = request.query_params.get('output', 'json')
+        if output not in ('json', 'csv'):
+            return Response(
+                {'output': ['Must be one of: json, csv']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = cached_schedule(loan.loan_amount, loan.interest_rate, loan.tenure)
+        if output == 'csv':
+            response = StreamingHttpResponse(_schedule_csv(rows), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="loan-{loan_id}-schedule.csv"'
+            return response
+        return StreamingHttpResponse(_schedule_json(loan, rows), content_type='application/json')
+
+
+class CustomerSearchView(APIView):
+    """Find customers by phone number (full or leading digits) or name; paginated without a COUNT."""
+
+    def get(self, request):
+        serializer = CustomerSearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        page, page_size = data['page'], data['page_size']
+        offset = (page - 1) * page_size
+        with read_from_replica():
+            customers = list(search_customers(data['q'])[offset:offset + page_size + 1])
+        return Response(
+            {
+                'page': page,
+                'page_size': page_size,
+                'has_next': len(customers) > page_size,
+                'results': CustomerNestedSerializer(customers[:page_size], many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def _on_replica(chunks):
+    """Run a streamed export's queries on the replica; the body is consumed after the view returns."""
+    with read_from_replica():
+        yield from chunks
+
+
+class ExportView(APIView):
+    """
+    Stream a dataset as csv, ndjson or parquet; ?since= limits it to rows changed after that watermark.
+    Whole-book data, so only for callers holding EXPORT_API_TOKEN (see permissions.py).
+    """
+    authentication_classes = []
+    permission_classes = [WarehouseTokenPermission]
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            return Response(
+                {'detail': f"Unknown dataset; expected one of: {', '.join(DATASETS)}"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        output = request.query_params.get('output', 'csv')
+        if output not in FORMATS:
+            return Response(
+                {'output': [f"Must be one of: {', '.join(FORMATS)}"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response(
+                    {'since': ['Must be an ISO 8601 datetime, e.g. 2024-01-31T00:00:00Z']},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        with read_from_replica():
+            export_alias(DATASETS[dataset].model)  # fail before streaming on a connection without server-side cursors
+        since, until = export_window(since or None)
+        response = StreamingHttpResponse(
+            _on_replica(stream_export(dataset, output, since, until)), content_type=FORMATS[output],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{output}"'
+        response['X-Export-Watermark'] = until.isoformat().replace('+00:00', 'Z')
+        return response
+
+
+class HealthView(APIView):
+    """Liveness: the process is up and serving requests."""
+    throttle_classes = []
+
+    def get(self, request):
+        return Response({'status': 'ok'}, status=status.HTTP_200_OK)
+
+
+class ReadinessView(APIView):
+    """Readiness: the primary database and the cache are reachable."""
+    throttle_classes = []
+
+    def get(self, request):
+        checks = {}
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            checks['database'] = 'ok'
+        except DatabaseError as e:
+            checks['database'] = str(e)
+        try:
+            cache.set('health:ping', 1, 5)
+            checks['cache'] = 'ok' if cache.get('health:ping') == 1 else 'unavailable'
+        except Exception as e:
+            checks['cache'] = str(e)
+        ok = all(v == 'ok' for v in checks.values())
+        return Response(
+            {'status': 'ok' if ok else 'unavailable', 'checks': checks},
+            status=status.HTTP_200_OK if ok else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )